@@ -2,5 +2,6 @@ from .auth import router as auth_router
 from .rooms import router as rooms_router
 from .games import router as games_router
 from .users import router as users_router
+from .archive import router as archive_router
 
-__all__ = ["auth_router", "rooms_router", "games_router", "users_router"] 
\ No newline at end of file
+__all__ = ["auth_router", "rooms_router", "games_router", "users_router", "archive_router"] 
\ No newline at end of file
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import os
+import re
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from ..core.archive import ArchiveReader
+from ..core.canvas import raster_available
+from ..core.thumbnails import ThumbnailRenderer, content_hash, thumbnail_path
+from ..config import settings
+
+router = APIRouter(prefix="/archive", tags=["Archive"])
+
+archive_reader = ArchiveReader(settings.ARCHIVE_DIR)
+thumbnail_renderer = (
+    ThumbnailRenderer(settings.THUMBNAIL_DIR, settings.CANVAS_WIDTH, settings.CANVAS_HEIGHT,
+                      settings.THUMBNAIL_SIZE, settings.THUMBNAIL_WORKERS)
+    if settings.THUMBNAILS_ENABLED and raster_available() else None
+)
+
+# Content-addressed thumbnails never change; per-round URLs are revalidated by ETag
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+ROUND_CACHE = "public, max-age=86400"
+DIGEST_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+def _thumbnail_digest(body: bytes) -> str:
+    return content_hash(body, settings.CANVAS_WIDTH, settings.CANVAS_HEIGHT, settings.THUMBNAIL_SIZE)
+
+
+@router.get("/rooms/{room_id}/rounds")
+def list_archived_rounds(room_id: int):
+    """List a room's archived rounds, newest game first
+
+    Rounds whose thumbnail is already rendered link to its content-addressed URL.
+    """
+    rounds = archive_reader.list_rounds(room_id)
+    for round_info in rounds:
+        url = f"/archive/rooms/{room_id}/games/{round_info['game']}/rounds/{round_info['round']}/thumbnail.png"
+        if thumbnail_renderer:
+            packed = archive_reader.stroke_bytes(room_id, round_info['game'], round_info['round'])
+            if packed and thumbnail_renderer.cached_path(packed[0]):
+                url = f"/archive/thumbnails/{_thumbnail_digest(packed[0])}.png"
+        round_info['thumbnail'] = url if thumbnail_renderer else None
+    return rounds
+
+
+@router.get("/rooms/{room_id}/games/{game}/rounds/{round_number}/strokes")
+def stream_round_strokes(room_id: int, game: int, round_number: int):
+    """Stream an archived round's strokes as NDJSON, one stroke per line"""
+    strokes = archive_reader.iter_strokes(room_id, game, round_number)
+    if strokes is None:
+        raise HTTPException(status_code=404, detail="Round not found")
+    return StreamingResponse(
+        (json.dumps(stroke, separators=(',', ':')) + '\n' for stroke in strokes),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.get("/rooms/{room_id}/games/{game}/rounds/{round_number}/thumbnail.png")
+async def get_round_thumbnail(room_id: int, game: int, round_number: int,
+                              if_none_match: Optional[str] = Header(None)):
+    """PNG thumbnail of an archived round, rendered in the process pool on a cache miss"""
+    if not thumbnail_renderer:
+        raise HTTPException(status_code=503, detail="Thumbnails are not available")
+    packed = archive_reader.stroke_bytes(room_id, game, round_number)
+    if packed is None:
+        raise HTTPException(status_code=404, detail="Round not found")
+
+    body, stroke_count = packed
+    etag = f'"{_thumbnail_digest(body)}"'
+    headers = {"Cache-Control": ROUND_CACHE, "ETag": etag}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+
+    path = thumbnail_renderer.cached_path(body)
+    if path is None:
+        digest = await asyncio.wrap_future(thumbnail_renderer.submit_packed(body, stroke_count))
+        path = thumbnail_path(settings.THUMBNAIL_DIR, digest)
+    return FileResponse(path, media_type="image/png", headers=headers)
+
+
+@router.get("/thumbnails/{digest}.png")
+def get_thumbnail(digest: str):
+    """Cached thumbnail by content hash"""
+    path = thumbnail_path(settings.THUMBNAIL_DIR, digest)
+    if not DIGEST_PATTERN.match(digest) or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+    return FileResponse(path, media_type="image/png", headers={"Cache-Control": IMMUTABLE_CACHE, "ETag": f'"{digest}"'})
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Dict
 from ..database import get_db
 from ..schemas.game_session import DrawingData, ChatMessage, WordGuess
 from ..services.game_service import game_service
+from ..services.game_link import game_link
 from ..core.security import get_current_active_user
 from ..models.user import User
 
@@ -20,6 +22,12 @@ async def start_game(
     return await game_service.start_game(db, room_id)
 
 
+@router.get("/live")
+def get_live_games():
+    """Get the live state of every room on the game server"""
+    return game_service.get_live_games()
+
+
 @router.get("/{room_id}/state")
 def get_game_state(room_id: int):
     """Get current game state"""
@@ -47,6 +55,18 @@ def submit_drawing(
     return {"message": "Drawing data received"}
 
 
+@router.post("/{room_id}/strokes")
+async def upload_strokes(
+    room_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Upload whole strokes at once (JSON array, NDJSON or packed binary) as the current drawer"""
+    strokes = game_service.parse_stroke_batch(await request.body(), request.headers.get("content-type", ""))
+    stroke_ids = await run_in_threadpool(game_link.draw_batch, room_id, current_user.id, strokes)
+    return {"stroke_ids": stroke_ids, "points": sum(len(stroke["points"]) for stroke in strokes)}
+
+
 @router.post("/{room_id}/guess")
 def submit_guess(
     room_id: int,
@@ -59,6 +79,10 @@ def submit_guess(
 
 
 @router.get("/rooms/public")
-def get_public_rooms(db: Session = Depends(get_db)):
-    """Get all public rooms with basic info"""
-    return game_service.get_public_rooms(db) 
\ No newline at end of file
+def get_public_rooms(
+    db: Session = Depends(get_db),
+    after: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200)
+):
+    """Get a page of public rooms with basic info"""
+    return game_service.get_public_rooms(db, after, limit)
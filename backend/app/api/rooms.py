@@ -1,16 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ..database import get_db
-from ..schemas.game_room import GameRoomCreate, GameRoomResponse, GameRoomJoin
+from ..schemas.game_room import GameRoomCreate, GameRoomResponse, GameRoomJoin, QuickPlayResponse
 from ..schemas.game_session import GameSessionResponse
 from ..services.room_service import RoomService
+from ..services.cleanup_service import CleanupService
 from ..core.security import get_current_active_user
 from ..models.user import User
+from ..config import settings
 
 router = APIRouter(prefix="/rooms", tags=["Game Rooms"])
 
 
+def _opaque_tag(etag: str) -> str:
+    """An ETag without its weak W/ prefix"""
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Does an If-None-Match header (a list of ETags, or *) match, by weak comparison"""
+    if not if_none_match:
+        return False
+    tags = [_opaque_tag(tag.strip()) for tag in if_none_match.split(',')]
+    return '*' in tags or _opaque_tag(etag) in tags
+
+
 @router.post("/", response_model=GameRoomResponse)
 def create_room(
     room_data: GameRoomCreate,
@@ -31,6 +46,16 @@ def join_room(
     return RoomService.join_room(db, join_data, current_user.id)
 
 
+@router.post("/quickplay", response_model=QuickPlayResponse)
+def quick_play(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Join the best open public room, creating one if none has a free seat"""
+    session, room, created = RoomService.quick_play(db, current_user.id)
+    return {"session": session, "room": room, "created": created}
+
+
 @router.post("/{room_id}/leave")
 def leave_room(
     room_id: int,
@@ -42,9 +67,28 @@ def leave_room(
 
 
 @router.get("/", response_model=List[GameRoomResponse])
-def get_public_rooms(db: Session = Depends(get_db)):
-    """Get all public rooms"""
-    return RoomService.get_public_rooms(db)
+def get_public_rooms(
+    response: Response,
+    db: Session = Depends(get_db),
+    after: int = Query(0, ge=0, description="Return rooms with an id above this (the previous page's X-Next-Cursor)"),
+    limit: int = Query(50, ge=1, le=200),
+    has_free_seats: bool = True,
+    not_started: bool = False,
+    if_none_match: Optional[str] = Header(None)
+):
+    """Get a page of public rooms
+    
+    The page's ETag changes whenever one of its rooms does, so pollers
+    sending If-None-Match get 304 Not Modified while nothing changed.
+    """
+    rooms, next_after, etag = RoomService.get_public_rooms(db, after, limit, has_free_seats, not_started)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if next_after is not None:
+        headers["X-Next-Cursor"] = str(next_after)
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return rooms
 
 
 @router.get("/{room_code}", response_model=GameRoomResponse)
@@ -65,12 +109,12 @@ def get_room_players(room_id: int, db: Session = Depends(get_db)):
 
 @router.post("/cleanup")
 def cleanup_rooms(db: Session = Depends(get_db)):
-    """Clean up full and old inactive rooms"""
-    full_rooms_deleted = RoomService.delete_full_rooms(db)
-    old_rooms_deleted = RoomService.cleanup_inactive_rooms(db, hours_old=24)
+    """Clean up full and old inactive rooms, and sessions left behind by deleted rooms"""
+    report = CleanupService.cleanup_rooms(db, hours_old=settings.CLEANUP_ROOM_AGE_HOURS)
     
     return {
         "message": "Room cleanup completed",
-        "full_rooms_deleted": full_rooms_deleted,
-        "old_rooms_deleted": old_rooms_deleted
+        "full_rooms_deleted": report['full_rooms_closed'],
+        "old_rooms_deleted": report['old_rooms_deleted'],
+        **report
     } 
\ No newline at end of file
@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List
 from ..database import get_db
-from ..schemas.player_stats import PlayerStatsResponse, LeaderboardEntry
+from ..schemas.player_stats import PlayerStatsResponse, LeaderboardEntry, PlayerRankResponse
 from ..services.user_service import UserService
+from ..services.leaderboard_service import leaderboard_service
 from ..core.security import get_current_active_user
 from ..models.user import User
-from ..models.player_stats import PlayerStats
 
 router = APIRouter(prefix="/users", tags=["User Management"])
 
@@ -24,20 +24,26 @@ def get_user_stats(
 
 
 @router.get("/leaderboard", response_model=List[LeaderboardEntry])
-def get_leaderboard(db: Session = Depends(get_db), limit: int = 10):
-    """Get top players leaderboard"""
-    stats = db.query(PlayerStats).order_by(PlayerStats.total_score.desc()).limit(limit).all()
-    
-    leaderboard = []
-    for i, stat in enumerate(stats):
-        user = UserService.get_user_by_id(db, stat.user_id)
-        if user:
-            leaderboard.append(LeaderboardEntry(
-                username=user.username,
-                total_score=stat.total_score,
-                games_played=stat.games_played,
-                average_score=stat.average_score,
-                rank=i + 1
-            ))
-    
-    return leaderboard 
\ No newline at end of file
+def get_leaderboard(
+    db: Session = Depends(get_db),
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    window: str = Query("all", pattern="^(all|weekly|daily)$")
+):
+    """Get a page of the all-time, weekly or daily leaderboard (top players by default)"""
+    leaderboard_service.refresh(db)
+    return leaderboard_service.page(offset, limit, window)
+
+
+@router.get("/{user_id}/rank", response_model=PlayerRankResponse)
+def get_user_rank(
+    user_id: int,
+    db: Session = Depends(get_db),
+    window: str = Query("all", pattern="^(all|weekly|daily)$")
+):
+    """Get a player's rank on the all-time, weekly or daily leaderboard"""
+    leaderboard_service.refresh(db)
+    entry = leaderboard_service.rank(user_id, window)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Player not ranked")
+    return entry
@@ -12,8 +12,21 @@ class Settings(BaseSettings):
     # Server
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    SOCKET_HOST: str = "localhost"
     SOCKET_PORT: int = 8001
-    
+    SOCKET_BACKLOG: int = 1024  # pending connections queued by the kernel
+    MAX_CONNECTIONS: int = 10000  # clients beyond this are turned away immediately
+    BULK_QUEUE_LIMIT: int = 256  # queued draw frames per client before the oldest are dropped
+    HEARTBEAT_INTERVAL: int = 15  # seconds of silence before a client is pinged
+    HEARTBEAT_TIMEOUT: int = 45  # seconds of silence before a client is reaped
+    CAPTURE_FILE: Optional[str] = None  # record inbound traffic here for benchmarks/replay_capture.py
+
+    # WebSocket Bridge
+    BRIDGE_HOST: str = "localhost"
+    BRIDGE_PORT: int = 8002
+    BRIDGE_WORKERS: int = 1  # >1 forks workers sharing the port via SO_REUSEPORT
+    BRIDGE_HEALTH_INTERVAL: int = 10  # seconds between worker health reports
+
     # Database
     DATABASE_URL: str = "sqlite:///./drawsync.db"
     
@@ -24,12 +37,43 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    INTERNAL_SERVICE_KEY: Optional[str] = None  # API -> socket server link; derived from SECRET_KEY if unset
     
     # Game Settings
     MAX_PLAYERS_PER_ROOM: int = 8
     MIN_PLAYERS_TO_START: int = 2
     DRAWING_TIME_LIMIT: int = 60  # seconds
     ROUNDS_PER_GAME: int = 5
+    ROUND_RESYNC_INTERVAL: int = 15  # seconds between round deadline resync frames
+    RESUME_GRACE_PERIOD: int = 30  # seconds a disconnected player's seat is held
+    RESUME_BUFFER_SIZE: int = 512  # recent room frames kept for session resumption
+    RASTER_CANVAS: bool = False  # keep a server-side raster of each drawing (needs numpy)
+    CANVAS_WIDTH: int = 800
+    CANVAS_HEIGHT: int = 600
+    KEYFRAME_INTERVAL: int = 20  # completed strokes between raster keyframes
+    BULK_STROKE_MAX_POINTS: int = 20000  # points per POST /games/{room_id}/strokes request
+    
+    LIVE_STATE_BACKEND: str = "shm"  # where room states are published for the API: "shm" (files) or "memory" (same process)
+    LIVE_STATE_DIR: Optional[str] = None  # defaults to /dev/shm/drawsync-state
+    DIRECTORY_REFRESH_INTERVAL: float = 2.0  # seconds between pulls of rooms changed by the other process
+    LOBBY_FLUSH_INTERVAL: float = 0.25  # lobby deltas are coalesced and pushed this often
+    ROSTER_CACHE_TTL: float = 2.0  # seconds a room's player list is served from memory
+    LEADERBOARD_REFRESH_INTERVAL: int = 5  # seconds between pulls of stats written by other processes
+    SCORE_BUCKET_RETENTION_DAYS: int = 14  # daily score buckets kept for the daily/weekly leaderboards (at least 7)
+    CLEANUP_INTERVAL: int = 300  # seconds between room cleanup runs
+    CLEANUP_ROOM_AGE_HOURS: int = 24  # inactive rooms older than this are deleted with their sessions
+    CLEANUP_CHUNK_SIZE: int = 500  # rows changed per cleanup transaction
+    CLEANUP_CHUNK_PAUSE: float = 0.05  # seconds between cleanup transactions, so other writers get in
+    SESSION_ARCHIVE_DAYS: int = 7  # closed game sessions older than this move to game_session_archive
+    
+    # Round Archive
+    ARCHIVE_ENABLED: bool = True  # append finished rounds' strokes to the archive
+    ARCHIVE_DIR: str = "archive"  # daily segment files and their indexes
+    ARCHIVE_RETENTION_DAYS: int = 30  # segments older than this are deleted
+    THUMBNAILS_ENABLED: bool = True  # render archived rounds to PNG thumbnails (needs numpy)
+    THUMBNAIL_DIR: str = "thumbnails"  # content-addressed thumbnail cache
+    THUMBNAIL_SIZE: int = 160  # longest side in pixels
+    THUMBNAIL_WORKERS: int = 2  # render processes per server
     
     # Words Database
     WORDS_FILE: str = "words.txt"
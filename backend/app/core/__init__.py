@@ -1,4 +1,5 @@
 from .security import get_password_hash, verify_password, create_access_token, get_current_user
 from .words import WordManager
+from .scheduler import Scheduler, VirtualScheduler
 
-__all__ = ["get_password_hash", "verify_password", "create_access_token", "get_current_user", "WordManager"] 
\ No newline at end of file
+__all__ = ["get_password_hash", "verify_password", "create_access_token", "get_current_user", "WordManager", "Scheduler", "VirtualScheduler"] 
\ No newline at end of file
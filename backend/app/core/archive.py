@@ -0,0 +1,385 @@
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Segment files hold round records back to back:
+#   ROUND_HEADER, meta JSON, then stroke_count strokes of
+#   STROKE_HEADER followed by point_count POINT pairs
+ROUND_MAGIC = b'DSR1'
+ROUND_HEADER = struct.Struct('<4sIIIIII')  # magic, room_id, game, round, meta length, stroke count, strokes length
+STROKE_HEADER = struct.Struct('<IIIBI')  # stroke id, user id, 0xRRGGBB, brush size, point count
+POINT = struct.Struct('<hh')
+
+# Index files (one per segment) map rounds to their record
+INDEX_ENTRY = struct.Struct('<IIIQI')  # room_id, game, round, offset, length
+
+RoundKey = Tuple[int, int, int]  # (room_id, game, round)
+
+
+def segment_name(day: datetime) -> str:
+    return f"strokes-{day:%Y%m%d}.seg"
+
+
+def _color_value(color: str) -> int:
+    try:
+        value = color.lstrip('#')
+        if len(value) == 3:
+            value = ''.join(c * 2 for c in value)
+        return int(value, 16) & 0xFFFFFF
+    except (AttributeError, ValueError):
+        return 0
+
+
+def _clamp(value) -> int:
+    return max(-32768, min(32767, int(round(value or 0))))
+
+
+def encode_strokes(strokes: Iterable[Dict]) -> Tuple[bytes, int]:
+    """Pack StrokeTable strokes as STROKE_HEADER + POINT records; returns (bytes, stroke count)"""
+    parts = []
+    stroke_count = 0
+    for stroke in strokes:
+        points = [(_clamp(point['x']), _clamp(point['y'])) for point in stroke['points']
+                  if point.get('is_drawing') and point.get('x') is not None and point.get('y') is not None]
+        parts.append(STROKE_HEADER.pack(stroke['id'], stroke['user_id'] or 0, _color_value(stroke['color']),
+                                         min(255, int(stroke.get('brush_size') or 2)), len(points)))
+        parts.append(b''.join(POINT.pack(x, y) for x, y in points))
+        stroke_count += 1
+    return b''.join(parts), stroke_count
+
+
+def decode_strokes(buffer, position: int, stroke_count: int) -> Iterator[Dict]:
+    """Unpack stroke_count packed strokes from a bytes-like buffer (or mmap), one at a time"""
+    for _ in range(stroke_count):
+        stroke_id, user_id, color, brush_size, point_count = STROKE_HEADER.unpack_from(buffer, position)
+        position += STROKE_HEADER.size
+        points = [list(point) for point in POINT.iter_unpack(buffer[position:position + point_count * POINT.size])]
+        position += point_count * POINT.size
+        yield {
+            'id': stroke_id,
+            'user_id': user_id,
+            'color': f"#{color:06x}",
+            'brush_size': brush_size,
+            'points': points
+        }
+
+
+def encode_round(room_id: int, game: int, round_number: int, strokes: Iterable[Dict], meta: Dict) -> bytes:
+    """Pack a finished round into one segment record"""
+    body, stroke_count = encode_strokes(strokes)
+    meta_bytes = json.dumps(meta, separators=(',', ':')).encode('utf-8')
+    header = ROUND_HEADER.pack(ROUND_MAGIC, room_id, game, round_number, len(meta_bytes), stroke_count, len(body))
+    return header + meta_bytes + body
+
+
+class ArchiveWriter:
+    """Appends finished rounds to daily segment files from a background thread
+
+    submit() only queues the round, so the game thread never touches the
+    disk. The writer drains whatever is queued, writes it in one go, then
+    appends the index entries.
+    """
+
+    def __init__(self, directory: str, flush_interval: float = 1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = None
+        self.running = False
+        self.rounds_written = 0
+        os.makedirs(directory, exist_ok=True)
+
+        # Game numbers continue from what is already archived, since in-memory rooms restart at 1
+        self.last_game: Dict[int, int] = {}
+        for room_id, game, _ in ArchiveIndex(directory).keys():
+            self.last_game[room_id] = max(self.last_game.get(room_id, 0), game)
+
+    def next_game_number(self, room_id: int) -> int:
+        """Number for a new game in a room, unique within the archive"""
+        game = self.last_game.get(room_id, 0) + 1
+        self.last_game[room_id] = game
+        return game
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="drawsync-archive", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Write what is still queued and stop"""
+        self.running = False
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join(timeout=10)
+
+    def submit(self, room_id: int, game: int, round_number: int, strokes: List[Dict], meta: Dict):
+        """Queue a finished round for archiving"""
+        self._queue.put((room_id, game, round_number, strokes, meta))
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if not self.running:
+                    return
+                continue
+
+            batch = [item]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            try:
+                self._write_batch([entry for entry in batch if entry is not None])
+            except Exception as e:
+                print(f"❌ Archive write error: {e}")
+            if stop:
+                return
+
+    def _write_batch(self, batch: List[Tuple]):
+        """Encode and append a batch, grouped by day segment"""
+        by_segment: Dict[str, List[Tuple[RoundKey, bytes]]] = {}
+        for room_id, game, round_number, strokes, meta in batch:
+            name = segment_name(datetime.fromtimestamp(meta['ended_at'], timezone.utc))
+            record = encode_round(room_id, game, round_number, strokes, meta)
+            by_segment.setdefault(name, []).append(((room_id, game, round_number), record))
+
+        for name, records in by_segment.items():
+            path = os.path.join(self.directory, name)
+            with open(path, 'ab') as segment:
+                offset = segment.tell()
+                entries = []
+                for key, record in records:
+                    entries.append(INDEX_ENTRY.pack(*key, offset, len(record)))
+                    offset += len(record)
+                segment.write(b''.join(record for _, record in records))
+            # Index after the data, so readers never see an entry for unwritten bytes
+            with open(path[:-4] + '.idx', 'ab') as index:
+                index.write(b''.join(entries))
+            self.rounds_written += len(records)
+
+
+class ArchiveIndex:
+    """(room_id, game, round) -> (segment, offset, length), read from the .idx files
+
+    refresh() reads only what was appended since the last call, so a reader in
+    another process (the API) keeps up with the socket server's writer cheaply.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.entries: Dict[RoundKey, Tuple[str, int, int]] = {}
+        self._positions: Dict[str, int] = {}  # index file -> bytes consumed
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        if not os.path.isdir(self.directory):
+            return
+        with self._lock:
+            present = set()
+            for name in sorted(os.listdir(self.directory)):
+                if not name.endswith('.idx'):
+                    continue
+                present.add(name)
+                path = os.path.join(self.directory, name)
+                size = os.path.getsize(path)
+                position = self._positions.get(name, 0)
+                if size < position:
+                    # Rewritten by compaction: reload this segment's entries
+                    self._drop_segment(name[:-4] + '.seg')
+                    position = 0
+                if size == position:
+                    continue
+                with open(path, 'rb') as index:
+                    index.seek(position)
+                    data = index.read(size - position)
+                usable = len(data) - len(data) % INDEX_ENTRY.size
+                segment = name[:-4] + '.seg'
+                for room_id, game, round_number, offset, length in INDEX_ENTRY.iter_unpack(data[:usable]):
+                    self.entries[(room_id, game, round_number)] = (segment, offset, length)
+                self._positions[name] = position + usable
+
+            # Segments removed by retention
+            for name in set(self._positions) - present:
+                del self._positions[name]
+                self._drop_segment(name[:-4] + '.seg')
+
+    def _drop_segment(self, segment: str):
+        for key in [key for key, entry in self.entries.items() if entry[0] == segment]:
+            del self.entries[key]
+
+    def keys(self) -> List[RoundKey]:
+        with self._lock:
+            return list(self.entries)
+
+    def get(self, key: RoundKey) -> Optional[Tuple[str, int, int]]:
+        with self._lock:
+            return self.entries.get(key)
+
+
+class ArchiveReader:
+    """Reads archived rounds through mmap without loading whole segments"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.index = ArchiveIndex(directory)
+        self._maps: Dict[str, Tuple[mmap.mmap, int]] = {}  # segment -> (mapping, inode)
+        self._lock = threading.Lock()
+
+    def _map(self, segment: str, end: int) -> mmap.mmap:
+        """Map a segment, remapping if it grew past the mapping or was replaced by compaction"""
+        path = os.path.join(self.directory, segment)
+        inode = os.stat(path).st_ino
+        with self._lock:
+            mapped, mapped_inode = self._maps.get(segment, (None, None))
+            if mapped is None or mapped_inode != inode or len(mapped) < end:
+                if mapped is not None:
+                    mapped.close()
+                with open(path, 'rb') as segment_file:
+                    mapped = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+                    inode = os.fstat(segment_file.fileno()).st_ino
+                self._maps[segment] = (mapped, inode)
+            return mapped
+
+    def _record(self, key: RoundKey) -> Optional[Tuple[mmap.mmap, int, Tuple]]:
+        entry = self.index.get(key)
+        if entry is None:
+            self.index.refresh()
+            entry = self.index.get(key)
+            if entry is None:
+                return None
+        segment, offset, length = entry
+        try:
+            mapped = self._map(segment, offset + length)
+        except (OSError, ValueError):
+            return None
+        header = ROUND_HEADER.unpack_from(mapped, offset)
+        if header[:4] != (ROUND_MAGIC, *key):
+            return None
+        return mapped, offset, header
+
+    def list_rounds(self, room_id: int) -> List[Dict]:
+        """Archived rounds of a room, newest game first"""
+        self.index.refresh()
+        rounds = []
+        for key in sorted((key for key in self.index.keys() if key[0] == room_id), reverse=True):
+            record = self._record(key)
+            if not record:
+                continue
+            mapped, offset, (_, _, game, round_number, meta_length, stroke_count, _) = record
+            start = offset + ROUND_HEADER.size
+            meta = json.loads(mapped[start:start + meta_length])
+            rounds.append({'room_id': room_id, 'game': game, 'round': round_number,
+                           'strokes': stroke_count, **meta})
+        return rounds
+
+    def iter_strokes(self, room_id: int, game: int, round_number: int) -> Optional[Iterator[Dict]]:
+        """Strokes of one round, decoded one at a time from the mapped segment"""
+        record = self._record((room_id, game, round_number))
+        if not record:
+            return None
+        mapped, offset, (_, _, _, _, meta_length, stroke_count, _) = record
+        return decode_strokes(mapped, offset + ROUND_HEADER.size + meta_length, stroke_count)
+
+    def stroke_bytes(self, room_id: int, game: int, round_number: int) -> Optional[Tuple[bytes, int]]:
+        """A round's packed strokes as (bytes, stroke count), e.g. for thumbnail rendering"""
+        record = self._record((room_id, game, round_number))
+        if not record:
+            return None
+        mapped, offset, (_, _, _, _, meta_length, stroke_count, body_length) = record
+        start = offset + ROUND_HEADER.size + meta_length
+        return mapped[start:start + body_length], stroke_count
+
+    def close(self):
+        with self._lock:
+            for mapped, _ in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+
+
+def apply_retention(directory: str, retention_days: int, now: Optional[datetime] = None) -> int:
+    """Delete segments (and their indexes) older than the retention window; returns segments removed"""
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = ((now or datetime.now(timezone.utc)) - timedelta(days=retention_days)).strftime('%Y%m%d')
+    removed = 0
+    for name in os.listdir(directory):
+        if name.startswith('strokes-') and name.endswith('.seg') and name[8:16] < cutoff:
+            for path in (name, name[:-4] + '.idx'):
+                try:
+                    os.remove(os.path.join(directory, path))
+                except FileNotFoundError:
+                    pass
+            removed += 1
+    return removed
+
+
+def compact_segment(directory: str, segment: str) -> int:
+    """Rewrite a closed segment keeping only the latest record per round; returns bytes reclaimed
+
+    Only for segments no longer written to (see run_maintenance). Records are
+    superseded when a round is archived twice, e.g. after a server restart.
+    Temp files are named per process, so API workers compacting the same
+    segment don't write into each other's.
+    """
+    segment_path = os.path.join(directory, segment)
+    index_path = segment_path[:-4] + '.idx'
+    suffix = f".{os.getpid()}.tmp"
+    with open(index_path, 'rb') as index:
+        data = index.read()
+    latest: Dict[RoundKey, Tuple[int, int]] = {}
+    usable = len(data) - len(data) % INDEX_ENTRY.size
+    for room_id, game, round_number, offset, length in INDEX_ENTRY.iter_unpack(data[:usable]):
+        latest[(room_id, game, round_number)] = (offset, length)
+
+    original_size = os.path.getsize(segment_path)
+    if sum(length for _, length in latest.values()) == original_size:
+        return 0
+
+    entries = []
+    with open(segment_path, 'rb') as source, open(segment_path + suffix, 'wb') as target:
+        mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for key, (offset, length) in sorted(latest.items(), key=lambda item: item[1][0]):
+                entries.append(INDEX_ENTRY.pack(*key, target.tell(), length))
+                target.write(mapped[offset:offset + length])
+        finally:
+            mapped.close()
+    with open(index_path + suffix, 'wb') as index:
+        index.write(b''.join(entries))
+
+    os.replace(segment_path + suffix, segment_path)
+    os.replace(index_path + suffix, index_path)
+    return original_size - os.path.getsize(segment_path)
+
+
+def run_maintenance(directory: str, retention_days: int) -> Dict[str, int]:
+    """Retention plus compaction of every closed segment
+
+    A round that ends just before midnight (UTC) can still be flushed into
+    that day's segment after it, so only segments at least a full day old
+    count as closed.
+    """
+    removed = apply_retention(directory, retention_days)
+    closed_before = segment_name(datetime.now(timezone.utc) - timedelta(days=1))
+    reclaimed = 0
+    if os.path.isdir(directory):
+        for name in sorted(os.listdir(directory)):
+            if name.startswith('strokes-') and name.endswith('.seg') and name < closed_before:
+                try:
+                    reclaimed += compact_segment(directory, name)
+                except (OSError, struct.error) as e:
+                    print(f"❌ Archive compaction error for {name}: {e}")
+    return {'segments_removed': removed, 'bytes_reclaimed': reclaimed}
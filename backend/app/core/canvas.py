@@ -0,0 +1,161 @@
+import base64
+import struct
+import zlib
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Raster canvases are optional; rooms fall back to vector-only snapshots
+    np = None
+
+WHITE = (255, 255, 255)
+
+
+def raster_available() -> bool:
+    """True if numpy is installed"""
+    return np is not None
+
+
+def parse_color(color: str) -> Tuple[int, int, int]:
+    """'#rrggbb' (or '#rgb') to an RGB tuple; anything else is black"""
+    try:
+        value = color.lstrip('#')
+        if len(value) == 3:
+            value = ''.join(c * 2 for c in value)
+        if len(value) != 6:
+            raise ValueError(color)
+        return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+    except (AttributeError, ValueError):
+        return (0, 0, 0)
+
+
+def encode_png(pixels) -> bytes:
+    """Encode an HxWx3 uint8 array as a PNG (no Pillow needed)"""
+    height, width, _ = pixels.shape
+    # Filter type 0 (none) at the start of every scanline
+    raw = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 0] = 0
+    raw[:, 1:] = pixels.reshape(height, width * 3)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)  # 8-bit RGB
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+            + chunk(b'IDAT', zlib.compress(raw.tobytes(), 6)) + chunk(b'IEND', b''))
+
+
+class RasterCanvas:
+    """NumPy raster of a room's drawing with periodic PNG keyframes
+
+    Completed strokes are rasterized as they finish. Every keyframe_interval
+    strokes the raster is cut into a PNG keyframe, so a late joiner gets one
+    image plus the few strokes drawn since instead of the whole drawing.
+    Undoing a stroke that is already in the raster rebuilds it from the
+    visible strokes and drops a keyframe that contained it.
+    """
+
+    def __init__(self, width: int, height: int, keyframe_interval: int = 20):
+        if np is None:
+            raise RuntimeError("numpy is required for raster canvases")
+        self.width = width
+        self.height = height
+        self.keyframe_interval = keyframe_interval
+        self.pixels = np.full((height, width, 3), 255, dtype=np.uint8)
+        self.drawn = set()  # stroke ids in the raster
+        self.keyframe: Optional[Dict] = None  # {'png': bytes, 'stroke_ids': frozenset}
+        self.strokes_since_keyframe = 0
+
+    def draw_stroke(self, stroke: Dict):
+        """Rasterize a completed stroke"""
+        points = [(point['x'], point['y']) for point in stroke['points']
+                  if point.get('is_drawing') and point.get('x') is not None and point.get('y') is not None]
+        self.draw_path(points, stroke['color'], stroke.get('brush_size'))
+        self.drawn.add(stroke['id'])
+        self.strokes_since_keyframe += 1
+
+    def draw_path(self, points, color: str, brush_size):
+        """Paint a polyline of (x, y) points with a round brush"""
+        if not points:
+            return
+        rgb = parse_color(color)
+        radius = max(0.5, float(brush_size or 2) / 2)
+        if len(points) == 1:
+            self._draw_segment(points[0], points[0], radius, rgb)
+        for start, end in zip(points, points[1:]):
+            self._draw_segment(start, end, radius, rgb)
+
+    def _draw_segment(self, start, end, radius: float, color):
+        """Paint every pixel within radius of the segment (a round-capped line)"""
+        x0, y0 = float(start[0]), float(start[1])
+        x1, y1 = float(end[0]), float(end[1])
+        left = max(0, int(min(x0, x1) - radius))
+        right = min(self.width, int(max(x0, x1) + radius) + 1)
+        top = max(0, int(min(y0, y1) - radius))
+        bottom = min(self.height, int(max(y0, y1) + radius) + 1)
+        if left >= right or top >= bottom:
+            return
+
+        ys, xs = np.ogrid[top:bottom, left:right]
+        dx, dy = x1 - x0, y1 - y0
+        length_sq = dx * dx + dy * dy
+        if length_sq == 0:
+            dist_sq = (xs - x0) ** 2 + (ys - y0) ** 2
+        else:
+            t = np.clip(((xs - x0) * dx + (ys - y0) * dy) / length_sq, 0.0, 1.0)
+            dist_sq = (xs - (x0 + t * dx)) ** 2 + (ys - (y0 + t * dy)) ** 2
+        self.pixels[top:bottom, left:right][dist_sq <= radius * radius] = color
+
+    def needs_keyframe(self) -> bool:
+        return self.strokes_since_keyframe >= self.keyframe_interval
+
+    def cut_keyframe(self):
+        """Encode the raster as the new keyframe"""
+        self.keyframe = {'png': encode_png(self.pixels), 'stroke_ids': frozenset(self.drawn)}
+        self.strokes_since_keyframe = 0
+
+    def remove_stroke(self, stroke_id: int, visible_strokes: Iterable[Dict]) -> bool:
+        """Drop an undone stroke, rebuilding the raster if it was drawn; True if rebuilt"""
+        if stroke_id not in self.drawn:
+            return False
+        if self.keyframe and stroke_id in self.keyframe['stroke_ids']:
+            self.keyframe = None
+        self.rebuild(visible_strokes)
+        return True
+
+    def rebuild(self, strokes: Iterable[Dict]):
+        """Redraw from scratch from completed strokes (keeps the keyframe if still valid)"""
+        keyframe = self.keyframe
+        self.clear()
+        self.keyframe = keyframe
+        for stroke in strokes:
+            self.draw_stroke(stroke)
+        self.strokes_since_keyframe = len(self.drawn - keyframe['stroke_ids']) if keyframe else len(self.drawn)
+
+    def clear(self):
+        self.pixels.fill(255)
+        self.drawn.clear()
+        self.keyframe = None
+        self.strokes_since_keyframe = 0
+
+    def keyframe_payload(self) -> Optional[Dict]:
+        """Keyframe as sent in canvas_snapshot, or None"""
+        if not self.keyframe:
+            return None
+        return {
+            'png': base64.b64encode(self.keyframe['png']).decode('ascii'),
+            'width': self.width,
+            'height': self.height
+        }
+
+    def thumbnail(self, max_size: int = 160) -> bytes:
+        """PNG of the raster scaled down by block averaging to fit max_size"""
+        factor = max(1, -(-max(self.width, self.height) // max_size))
+        height = self.height // factor * factor
+        width = self.width // factor * factor
+        blocks = self.pixels[:height, :width].reshape(height // factor, factor, width // factor, factor, 3)
+        return encode_png(blocks.mean(axis=(1, 3)).astype(np.uint8))
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the raster and its keyframe"""
+        return self.pixels.nbytes + (len(self.keyframe['png']) if self.keyframe else 0)
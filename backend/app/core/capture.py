@@ -0,0 +1,73 @@
+import os
+import struct
+import threading
+import time
+from typing import Callable, Iterator, Tuple
+
+# File layout: CAPTURE_MAGIC, then records of RECORD_HEADER followed by the payload
+CAPTURE_MAGIC = b'DSCAP1\n'
+RECORD_HEADER = struct.Struct('<QIBI')  # monotonic ns, connection id, kind, payload length
+
+# Record kinds
+SESSION = 0  # A server process started capturing; payload is its wall clock start time
+OPEN = 1  # Connection accepted
+MESSAGE = 2  # One inbound message line (without the newline)
+CLOSE = 3  # Connection closed
+
+
+class TrafficCapture:
+    """Append-only binary capture of inbound client traffic
+
+    Each server run starts with a SESSION record, since monotonic timestamps and
+    connection ids restart with the process. Writes are buffered; call close()
+    to make sure everything reaches the file.
+    """
+
+    def __init__(self, path: str, clock: Callable[[], int] = time.monotonic_ns):
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'ab', buffering=1 << 16)
+        if is_new:
+            self._file.write(CAPTURE_MAGIC)
+        self.record(0, SESSION, repr(time.time()).encode('ascii'))
+
+    def record(self, conn_id: int, kind: int, payload: bytes = b''):
+        """Append one record"""
+        header = RECORD_HEADER.pack(self.clock(), conn_id, kind, len(payload))
+        with self._lock:
+            if self._file:
+                self._file.write(header)
+                self._file.write(payload)
+
+    def flush(self):
+        with self._lock:
+            if self._file:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+def read_capture(path: str) -> Iterator[Tuple[int, int, int, bytes]]:
+    """Yield (monotonic_ns, conn_id, kind, payload) records from a capture file
+
+    A record cut short (e.g. the server was killed mid-write) ends the stream.
+    """
+    with open(path, 'rb') as capture_file:
+        if capture_file.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError(f"{path} is not a DrawSync capture file")
+
+        while True:
+            header = capture_file.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            timestamp, conn_id, kind, length = RECORD_HEADER.unpack(header)
+            payload = capture_file.read(length)
+            if len(payload) < length:
+                return
+            yield timestamp, conn_id, kind, payload
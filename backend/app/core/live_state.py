@@ -0,0 +1,195 @@
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from itertools import count
+from typing import Dict, List, Optional
+
+# A file store's states are ignored once its server has not beaten for this long
+HEARTBEAT_STALE_AFTER = 15.0
+
+
+def default_state_dir() -> str:
+    """tmpfs when available, so state files never touch the disk"""
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(base, 'drawsync-state')
+
+
+def with_time_remaining(state: Dict) -> Dict:
+    """Copy of a stored state with time_remaining as of now
+
+    round_deadline is on the game server's scheduler clock; updated_at and
+    server_time record when the state was written, on the wall clock and the
+    scheduler clock, so readers in other processes can work out what is left.
+    """
+    state = dict(state)
+    deadline = state.get('round_deadline')
+    if deadline is None:
+        state['time_remaining'] = state.get('time_remaining', 0)
+    else:
+        elapsed = time.time() - state['updated_at']
+        state['time_remaining'] = max(0, math.ceil(deadline - state['server_time'] - elapsed))
+    return state
+
+
+class MemoryStateStore:
+    """Live room states in this process, for when the API and game server share one"""
+
+    def __init__(self):
+        self.states: Dict[int, Dict] = {}
+        self.roster_versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._versions = count(1)
+
+    def put(self, room_id: int, state: Dict):
+        with self._lock:
+            self.states[room_id] = state
+
+    def remove(self, room_id: int):
+        with self._lock:
+            self.states.pop(room_id, None)
+            self.roster_versions.pop(room_id, None)
+
+    def roster_changed(self, room_id: int):
+        """Mark a room's players (game sessions) as changed"""
+        with self._lock:
+            self.roster_versions[room_id] = next(self._versions)
+
+    def roster_version(self, room_id: int) -> Optional[int]:
+        return self.roster_versions.get(room_id)
+
+    def get(self, room_id: int) -> Optional[Dict]:
+        with self._lock:
+            state = self.states.get(room_id)
+        return with_time_remaining(state) if state else None
+
+    def all(self) -> List[Dict]:
+        with self._lock:
+            states = list(self.states.values())
+        return [with_time_remaining(state) for state in states]
+
+    def heartbeat(self):
+        pass
+
+    def clear(self):
+        with self._lock:
+            self.states.clear()
+            self.roster_versions.clear()
+
+
+class FileStateStore:
+    """Live room states as one JSON file per room, shared between processes
+
+    The game server replaces room-<id>.json with os.replace on every state
+    change, so readers only ever see complete files. Readers keep the parsed
+    state keyed by the file's mtime and re-parse only when it changes. A
+    heartbeat file written by the server lets readers ignore the states of a
+    server that died without cleaning up. roster-<id> files are replaced
+    whenever a room's game sessions change; their inode and mtime are the
+    roster version.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._cache: Dict[str, tuple] = {}  # file name -> (mtime_ns, state)
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _write(self, name: str, payload: Dict):
+        temp_path = self._path(f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temp_path, 'w') as temp_file:
+            json.dump(payload, temp_file, separators=(',', ':'))
+        os.replace(temp_path, self._path(name))
+
+    def put(self, room_id: int, state: Dict):
+        self._write(f"room-{room_id}.json", state)
+
+    def remove(self, room_id: int):
+        for name in (f"room-{room_id}.json", f"roster-{room_id}"):
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+
+    def roster_changed(self, room_id: int):
+        """Mark a room's players (game sessions) as changed, for every process"""
+        self._write(f"roster-{room_id}", {'time': time.time()})
+
+    def roster_version(self, room_id: int) -> Optional[tuple]:
+        try:
+            stat = os.stat(self._path(f"roster-{room_id}"))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def heartbeat(self):
+        """Mark the writing server as alive (call every few seconds)"""
+        self._write('server.json', {'pid': os.getpid(), 'time': time.time()})
+
+    def clear(self):
+        """Remove every state file and the heartbeat (server start and stop)"""
+        for name in os.listdir(self.directory):
+            if name.startswith(('room-', 'roster-')) or name == 'server.json':
+                try:
+                    os.remove(self._path(name))
+                except FileNotFoundError:
+                    pass
+
+    def server_alive(self) -> bool:
+        try:
+            with open(self._path('server.json')) as heartbeat_file:
+                return time.time() - json.load(heartbeat_file)['time'] < HEARTBEAT_STALE_AFTER
+        except (OSError, ValueError, KeyError):
+            return False
+
+    def _read(self, name: str) -> Optional[Dict]:
+        try:
+            mtime = os.stat(self._path(name)).st_mtime_ns
+        except FileNotFoundError:
+            with self._lock:
+                self._cache.pop(name, None)
+            return None
+        with self._lock:
+            cached = self._cache.get(name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(self._path(name)) as state_file:
+                state = json.load(state_file)
+        except (FileNotFoundError, ValueError):
+            return None
+        with self._lock:
+            self._cache[name] = (mtime, state)
+        return state
+
+    def get(self, room_id: int) -> Optional[Dict]:
+        if not self.server_alive():
+            return None
+        state = self._read(f"room-{room_id}.json")
+        return with_time_remaining(state) if state else None
+
+    def all(self) -> List[Dict]:
+        if not self.server_alive():
+            return []
+        states = []
+        for name in sorted(os.listdir(self.directory)):
+            if name.startswith('room-') and name.endswith('.json'):
+                state = self._read(name)
+                if state:
+                    states.append(with_time_remaining(state))
+        return states
+
+
+_memory_store = MemoryStateStore()
+
+
+def create_state_store(backend: str, directory: Optional[str] = None):
+    """State store for LIVE_STATE_BACKEND: 'memory' (shared within this process) or 'shm' (files)"""
+    if backend == 'memory':
+        return _memory_store
+    return FileStateStore(directory or default_state_dir())
@@ -0,0 +1,99 @@
+import bisect
+import threading
+from typing import Dict, List, Sequence
+
+
+class Counter:
+    """Monotonically increasing counter"""
+
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> Dict:
+        return {'type': 'counter', 'value': self.value}
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative counts per upper bound, like Prometheus)"""
+
+    def __init__(self, name: str, description: str = "", buckets: Sequence[float] = ()):
+        self.name = name
+        self.description = description
+        self.buckets: List[float] = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile: the upper bound of the bucket holding it"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets + [float('inf')], self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return bound
+        return float('inf')
+
+    def snapshot(self) -> Dict:
+        cumulative = []
+        seen = 0
+        for bound, bucket_count in zip(self.buckets + ['+Inf'], self.counts):
+            seen += bucket_count
+            cumulative.append([bound, seen])
+        return {
+            'type': 'histogram',
+            'count': self.count,
+            'sum': self.sum,
+            'buckets': cumulative,
+            'p50': self.quantile(0.5),
+            'p99': self.quantile(0.99)
+        }
+
+
+class MetricsRegistry:
+    """Named counters and histograms for a server process"""
+
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        """Get or create a counter"""
+        with self._lock:
+            if name not in self.metrics:
+                self.metrics[name] = Counter(name, description)
+            return self.metrics[name]
+
+    def histogram(self, name: str, description: str = "", buckets: Sequence[float] = ()) -> Histogram:
+        """Get or create a histogram"""
+        with self._lock:
+            if name not in self.metrics:
+                self.metrics[name] = Histogram(name, description, buckets)
+            return self.metrics[name]
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """JSON-serializable view of every metric"""
+        with self._lock:
+            metrics = list(self.metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+
+# Latency buckets in seconds, from 1 ms to 10 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
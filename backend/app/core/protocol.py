@@ -0,0 +1,74 @@
+from collections import deque
+from typing import Optional
+
+# Outbound priority lanes: control frames go out before queued bulk frames,
+# except barriers (control frames that change the canvas), which must not
+# overtake the draw frames queued before them
+CONTROL = 0
+BULK = 1
+BARRIER = 2
+
+# Lane per message type, shared by the socket server and the WebSocket bridge.
+# Anything not listed is a control frame. Bulk frames may be dropped when a
+# connection falls behind (the canvas is then resent with a canvas_snapshot),
+# so only list types that are safe to lose.
+MESSAGE_LANES = {
+    'draw_data': BULK,
+    'draw_batch': BULK,
+    'frame_skipped': BULK,
+    'canvas_cleared': BARRIER,
+    'round_started': BARRIER,
+    'stroke_undone': BARRIER,
+    'stroke_redone': BARRIER,
+    'canvas_snapshot': BARRIER,
+}
+
+
+def lane_for(message_type: Optional[str]) -> int:
+    """Priority lane for a message type"""
+    return MESSAGE_LANES.get(message_type, CONTROL)
+
+
+class LaneQueue:
+    """Outbound frame queue for one connection with a control and a bulk lane
+
+    pop() drains the control lane first. A barrier frame first moves the
+    queued bulk frames to the control lane, so they still go out before it.
+    The bulk lane is capped; when a slow connection falls behind, every
+    queued bulk frame is dropped and the caller resends the canvas (a
+    canvas_snapshot, itself a barrier) in their place.
+    """
+
+    __slots__ = ('lanes', 'bulk_limit')
+
+    def __init__(self, bulk_limit: int):
+        self.lanes = (deque(), deque())
+        self.bulk_limit = bulk_limit
+
+    def push(self, frame, lane: int = CONTROL) -> int:
+        """Queue a frame and return how many bulk frames were dropped (the frame included)"""
+        control, bulk = self.lanes
+        if lane == BULK:
+            bulk.append(frame)
+            if len(bulk) > self.bulk_limit:
+                dropped = len(bulk)
+                bulk.clear()
+                return dropped
+            return 0
+        if lane == BARRIER:
+            control.extend(bulk)
+            bulk.clear()
+        control.append(frame)
+        return 0
+
+    def pop(self):
+        """Next frame to send, or None when both lanes are empty"""
+        control, bulk = self.lanes
+        if control:
+            return control.popleft()
+        if bulk:
+            return bulk.popleft()
+        return None
+
+    def __len__(self) -> int:
+        return len(self.lanes[CONTROL]) + len(self.lanes[BULK])
@@ -0,0 +1,153 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, List, Tuple
+
+
+class TimerHandle:
+    """Handle for a scheduled callback that can be cancelled"""
+
+    __slots__ = ('when', 'callback', 'args', 'cancelled')
+
+    def __init__(self, when: float, callback: Callable, args: tuple):
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """Cancel the callback (it is dropped lazily when its deadline comes up)"""
+        self.cancelled = True
+
+
+class Scheduler:
+    """Runs timed callbacks for the game server on a single thread
+
+    Callbacks only fire at their deadlines, so rooms don't need one sleeping
+    thread each. Times are on the scheduler's clock (monotonic by default).
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._queue: List[Tuple[float, int, TimerHandle]] = []  # heap of (when, seq, handle)
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self.running = False
+
+    def time(self) -> float:
+        """Current time on the scheduler clock"""
+        return self.clock()
+
+    def call_at(self, when: float, callback: Callable, *args) -> TimerHandle:
+        """Schedule a callback at an absolute scheduler time"""
+        handle = TimerHandle(when, callback, args)
+        with self._condition:
+            heapq.heappush(self._queue, (when, next(self._counter), handle))
+            self._condition.notify()
+        return handle
+
+    def call_later(self, delay: float, callback: Callable, *args) -> TimerHandle:
+        """Schedule a callback after a delay in seconds"""
+        return self.call_at(self.time() + delay, callback, *args)
+
+    def pending(self) -> int:
+        """Number of scheduled callbacks that have not been cancelled"""
+        with self._condition:
+            return sum(1 for _, _, handle in self._queue if not handle.cancelled)
+
+    def start(self):
+        """Start the scheduler thread"""
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="drawsync-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread and drop pending callbacks"""
+        with self._condition:
+            self.running = False
+            self._queue.clear()
+            self._condition.notify()
+
+    def _run(self):
+        """Wait for the earliest deadline and run its callback"""
+        while self.running:
+            with self._condition:
+                while self.running:
+                    if not self._queue:
+                        self._condition.wait()
+                        continue
+                    delay = self._queue[0][0] - self.time()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+
+                if not self.running:
+                    return
+                _, _, handle = heapq.heappop(self._queue)
+
+            if handle.cancelled:
+                continue
+
+            self._run_callback(handle)
+
+    def _run_callback(self, handle: TimerHandle):
+        """Run one due callback, logging instead of raising its errors"""
+        try:
+            handle.callback(*handle.args)
+        except Exception as e:
+            print(f"❌ Scheduled callback error: {e}")
+
+
+class VirtualScheduler(Scheduler):
+    """Scheduler on a virtual clock for simulations and tests
+
+    Nothing runs by itself: advance() moves the clock forward and runs every
+    callback that falls due, in deadline order, on the calling thread. A
+    60 second round takes as long as its callbacks take to run.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        super().__init__(clock=lambda: self.now)
+
+    def start(self):
+        """No thread to start; callbacks run from advance()"""
+        self.running = True
+
+    def advance(self, seconds: float) -> int:
+        """Move the clock forward and run the callbacks that fell due"""
+        return self.run_until(self.now + seconds)
+
+    def run_until(self, when: float) -> int:
+        """Run callbacks due up to an absolute time and leave the clock there"""
+        ran = 0
+        while True:
+            with self._condition:
+                if not self._queue or self._queue[0][0] > when:
+                    break
+                due, _, handle = heapq.heappop(self._queue)
+
+            self.now = max(self.now, due)
+            if handle.cancelled:
+                continue
+            self._run_callback(handle)
+            ran += 1
+
+        self.now = max(self.now, when)
+        return ran
+
+    def run_until_idle(self, max_time: float = 86400.0) -> int:
+        """Jump from deadline to deadline until nothing is scheduled (or max_time virtual seconds pass)"""
+        limit = self.now + max_time
+        ran = 0
+        while True:
+            with self._condition:
+                if not self._queue or self._queue[0][0] > limit:
+                    break
+                next_due = self._queue[0][0]
+            ran += self.run_until(next_due)
+        return ran
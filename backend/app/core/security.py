@@ -1,3 +1,5 @@
+import hashlib
+import hmac
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -53,6 +55,17 @@ def verify_token(token: str) -> Optional[str]:
         return None
 
 
+def internal_service_key() -> str:
+    """Shared key the API uses to open a service connection to the socket server"""
+    if settings.INTERNAL_SERVICE_KEY:
+        return settings.INTERNAL_SERVICE_KEY
+    return hmac.new(settings.SECRET_KEY.encode('utf-8'), b'drawsync-internal-service', hashlib.sha256).hexdigest()
+
+
+def verify_internal_service_key(key) -> bool:
+    return isinstance(key, str) and hmac.compare_digest(key, internal_service_key())
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     """Get current authenticated user"""
     credentials_exception = HTTPException(
@@ -0,0 +1,115 @@
+from typing import AbstractSet, Dict, Iterator, List, Optional
+
+
+class StrokeTable:
+    """Strokes drawn on a room's canvas, indexed by stroke id
+
+    A stroke starts at an is_first_point and collects points until its
+    is_drawing=False end point. Undo hides the newest visible stroke and redo
+    brings back the last undone one; both are O(1) and keep the points, so
+    clients only need the stroke id. Snapshots contain visible strokes only.
+    """
+
+    def __init__(self):
+        self.strokes: Dict[int, Dict] = {}  # stroke_id -> stroke
+        self.visible: Dict[int, None] = {}  # Visible stroke ids in drawing order (dict as ordered set)
+        self.redo_stack: List[int] = []
+        self.active: Dict[int, int] = {}  # user_id -> stroke_id being drawn
+        self.next_stroke_id = 1
+
+    def add_point(self, point: Dict) -> Optional[int]:
+        """Add a draw point and return its stroke id (None for a stray end point)"""
+        user_id = point['user_id']
+        stroke_id = self.active.get(user_id)
+
+        if point.get('is_first_point') or (stroke_id is None and point.get('is_drawing')):
+            stroke_id = self._begin_stroke(point)
+        elif stroke_id is None:
+            return None
+
+        self.strokes[stroke_id]['points'].append(point)
+        if not point.get('is_drawing'):
+            # Pen lifted: the stroke is complete
+            del self.active[user_id]
+        return stroke_id
+
+    def _begin_stroke(self, point: Dict) -> int:
+        stroke_id = self.next_stroke_id
+        self.next_stroke_id += 1
+        self.strokes[stroke_id] = {
+            'id': stroke_id,
+            'user_id': point['user_id'],
+            'color': point.get('color', '#000000'),
+            'brush_size': point.get('brush_size', 2),
+            'points': []
+        }
+        self.visible[stroke_id] = None
+        self.active[point['user_id']] = stroke_id
+        # A new stroke makes undone strokes unreachable, as in any editor
+        for undone_id in self.redo_stack:
+            del self.strokes[undone_id]
+        self.redo_stack.clear()
+        return stroke_id
+
+    def undo(self) -> Optional[int]:
+        """Hide the newest visible stroke and return its id"""
+        if not self.visible:
+            return None
+        stroke_id = next(reversed(self.visible))
+        del self.visible[stroke_id]
+        self.redo_stack.append(stroke_id)
+        # Undoing a stroke still being drawn ends it
+        user_id = self.strokes[stroke_id]['user_id']
+        if self.active.get(user_id) == stroke_id:
+            del self.active[user_id]
+        return stroke_id
+
+    def redo(self) -> Optional[int]:
+        """Show the most recently undone stroke again and return its id"""
+        if not self.redo_stack:
+            return None
+        stroke_id = self.redo_stack.pop()
+        self.visible[stroke_id] = None
+        return stroke_id
+
+    def is_complete(self, stroke_id: int) -> bool:
+        """True once the stroke's end point arrived"""
+        points = self.strokes[stroke_id]['points']
+        return bool(points) and not points[-1].get('is_drawing')
+
+    def completed_strokes(self) -> Iterator[Dict]:
+        """Visible, finished strokes in drawing order"""
+        for stroke_id in self.visible:
+            if self.is_complete(stroke_id):
+                yield self.strokes[stroke_id]
+
+    def clear(self):
+        """Remove every stroke (new round or clear_canvas)"""
+        self.strokes.clear()
+        self.visible.clear()
+        self.redo_stack.clear()
+        self.active.clear()
+
+    def snapshot(self, exclude: AbstractSet[int] = frozenset()) -> List[Dict]:
+        """Visible strokes in drawing order, with points packed as [x, y] pairs
+
+        exclude skips strokes the client gets another way (e.g. in a raster keyframe).
+        """
+        snapshot = []
+        for stroke_id in self.visible:
+            if stroke_id in exclude:
+                continue
+            stroke = self.strokes[stroke_id]
+            points = stroke['points']
+            snapshot.append({
+                'id': stroke_id,
+                'user_id': stroke['user_id'],
+                'color': stroke['color'],
+                'brush_size': stroke['brush_size'],
+                'points': [[point['x'], point['y']] for point in points if point.get('is_drawing')],
+                'complete': bool(points) and not points[-1].get('is_drawing')
+            })
+        return snapshot
+
+    def __len__(self) -> int:
+        return len(self.visible)
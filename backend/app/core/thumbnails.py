@@ -0,0 +1,154 @@
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from .archive import decode_strokes, encode_strokes
+from .canvas import RasterCanvas, np, parse_color, raster_available
+
+
+def content_hash(body: bytes, width: int, height: int, max_size: int) -> str:
+    """Cache key of a thumbnail: packed strokes plus the render geometry"""
+    digest = hashlib.sha256(f"{width}x{height}@{max_size}:".encode('ascii'))
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def thumbnail_path(directory: str, digest: str) -> str:
+    return os.path.join(directory, digest[:2], f"{digest}.png")
+
+
+# Strokes are rasterized at this multiple of the thumbnail size, then block averaged down
+SUPERSAMPLE = 2
+
+
+def stamp_path(pixels, points, rgb, radius: float):
+    """Paint a polyline by stamping a disk along it, one vectorized assignment per stroke
+
+    Coarser than RasterCanvas.draw_path (stamp centres snap to whole pixels)
+    but without its per-segment overhead, which dominates at thumbnail scale.
+    """
+    height, width, _ = pixels.shape
+    path = np.asarray(points, dtype=np.float64)
+    if len(path) > 1:
+        deltas = np.diff(path, axis=0)
+        # Stamps no further apart than half the radius, so lines stay solid
+        steps = np.maximum(1, np.ceil(np.hypot(deltas[:, 0], deltas[:, 1]) / max(radius / 2, 0.5))).astype(np.int64)
+        offsets = np.arange(steps.sum()) - np.repeat(np.cumsum(steps) - steps, steps)
+        t = (offsets / np.repeat(steps, steps))[:, None]
+        path = np.vstack((np.repeat(path[:-1], steps, axis=0) + np.repeat(deltas, steps, axis=0) * t, path[-1:]))
+
+    reach = int(np.ceil(radius))
+    dy, dx = np.mgrid[-reach:reach + 1, -reach:reach + 1]
+    inside = dx * dx + dy * dy <= max(radius * radius, 0.25)
+    centres = np.rint(path).astype(np.int64)
+    xs = (centres[:, 0:1] + dx[inside]).ravel()
+    ys = (centres[:, 1:2] + dy[inside]).ravel()
+    visible = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    pixels[ys[visible], xs[visible]] = rgb
+
+
+def render_png(body: bytes, stroke_count: int, width: int, height: int, max_size: int) -> bytes:
+    """Rasterize packed strokes straight at thumbnail scale and encode them as a PNG"""
+    scale = min(1.0, SUPERSAMPLE * max_size / max(width, height))
+    canvas = RasterCanvas(max(1, round(width * scale)), max(1, round(height * scale)))
+    for stroke in decode_strokes(body, 0, stroke_count):
+        if stroke['points']:
+            stamp_path(canvas.pixels, np.asarray(stroke['points']) * scale, parse_color(stroke['color']),
+                       max(0.5, stroke['brush_size'] * scale / 2))
+    return canvas.thumbnail(max_size)
+
+
+def render_to_cache(directory: str, body: bytes, stroke_count: int, width: int, height: int, max_size: int) -> str:
+    """Render into the content-addressed cache unless already there; returns the content hash
+
+    Runs in a worker process. Concurrent renders of the same drawing write
+    the same bytes, and os.replace makes whichever lands last win cleanly.
+    """
+    digest = content_hash(body, width, height, max_size)
+    path = thumbnail_path(directory, digest)
+    if not os.path.exists(path):
+        png = render_png(body, stroke_count, width, height, max_size)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as temp_file:
+            temp_file.write(png)
+        os.replace(temp_path, path)
+    return digest
+
+
+def render_strokes_to_cache(directory: str, strokes: List[Dict], width: int, height: int, max_size: int) -> str:
+    """render_to_cache for StrokeTable strokes; packing happens in the worker, not the caller"""
+    body, stroke_count = encode_strokes(strokes)
+    return render_to_cache(directory, body, stroke_count, width, height, max_size)
+
+
+class ThumbnailRenderer:
+    """Renders drawing thumbnails in a process pool, cached on disk by content hash
+
+    Workers are spawned rather than forked, since both the socket server and
+    the API run threads. The pool is created on first use.
+    """
+
+    def __init__(self, directory: str, width: int, height: int, max_size: int = 160, workers: int = 2):
+        if not raster_available():
+            raise RuntimeError("numpy is required for thumbnails")
+        self.directory = directory
+        self.width = width
+        self.height = height
+        self.max_size = max_size
+        self.workers = workers
+        self.rendered = 0
+        self.failed = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def warm_up(self):
+        """Start the worker processes now, so the first renders don't pay for spawning them on the caller's thread"""
+        for future in [self._executor().submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+
+    def submit_strokes(self, strokes: List[Dict]) -> Future:
+        """Queue a render of StrokeTable strokes; the future resolves to the content hash"""
+        future = self._executor().submit(render_strokes_to_cache, self.directory, strokes,
+                                         self.width, self.height, self.max_size)
+        future.add_done_callback(self._count)
+        return future
+
+    def submit_packed(self, body: bytes, stroke_count: int) -> Future:
+        """Queue a render of packed (archived) strokes; the future resolves to the content hash"""
+        future = self._executor().submit(render_to_cache, self.directory, body, stroke_count,
+                                         self.width, self.height, self.max_size)
+        future.add_done_callback(self._count)
+        return future
+
+    def _count(self, future: Future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error:
+            self.failed += 1
+            print(f"❌ Thumbnail render error: {error}")
+        else:
+            self.rendered += 1
+
+    def cached_path(self, body: bytes) -> Optional[str]:
+        """Path of the cached thumbnail for packed strokes, or None if not rendered yet"""
+        path = thumbnail_path(self.directory, content_hash(body, self.width, self.height, self.max_size))
+        return path if os.path.exists(path) else None
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
@@ -3,19 +3,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.background import BackgroundTasks
 import asyncio
-import threading
-import time
-from .database import engine, SessionLocal
-from .models import user, game_room, game_session, player_stats
-from .api import auth_router, rooms_router, games_router, users_router
-from .services.room_service import RoomService
+from .database import run_migrations
+from .api import auth_router, rooms_router, games_router, users_router, archive_router
+from .core.archive import run_maintenance
+from .services.cleanup_service import CleanupService
+from .services.stats_service import StatsService
+from .services.leaderboard_service import WINDOW_DAYS
 from .config import settings
 
-# Create database tables
-user.Base.metadata.create_all(bind=engine)
-game_room.Base.metadata.create_all(bind=engine)
-game_session.Base.metadata.create_all(bind=engine)
-player_stats.Base.metadata.create_all(bind=engine)
+# Create or upgrade the database tables (migrations/)
+run_migrations()
 
 # Create FastAPI app
 app = FastAPI(
@@ -33,6 +30,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 # Include routers
@@ -40,37 +38,66 @@ app.include_router(auth_router)
 app.include_router(rooms_router)
 app.include_router(games_router)
 app.include_router(users_router)
+app.include_router(archive_router)
 
 
-def cleanup_rooms_background():
-    """Background task to periodically clean up rooms"""
+async def cleanup_rooms_background():
+    """Background task to periodically clean up rooms, one short transaction at a time"""
     while True:
         try:
-            db = SessionLocal()
-            try:
-                # Clean up full rooms
-                full_rooms_deleted = RoomService.delete_full_rooms(db)
-                # Clean up old inactive rooms (older than 24 hours)
-                old_rooms_deleted = RoomService.cleanup_inactive_rooms(db, hours_old=24)
-                
-                if full_rooms_deleted > 0 or old_rooms_deleted > 0:
-                    print(f"Background cleanup: {full_rooms_deleted} full rooms, {old_rooms_deleted} old rooms cleaned")
-            finally:
-                db.close()
+            report = await CleanupService.cleanup_rooms_async(hours_old=settings.CLEANUP_ROOM_AGE_HOURS)
+            if report['chunks'] > 0:
+                print(f"Background cleanup: {report['full_rooms_closed']} full rooms, "
+                      f"{report['old_rooms_deleted']} old rooms, {report['sessions_archived']} sessions archived "
+                      f"({report['rows_per_second']} rows/s, write lock held {report['lock_seconds']}s, "
+                      f"longest {report['max_lock_ms']}ms)")
         except Exception as e:
             print(f"Error in background room cleanup: {e}")
         
-        # Run cleanup every 5 minutes
-        time.sleep(300)
+        await asyncio.sleep(settings.CLEANUP_INTERVAL)
+
+
+async def archive_maintenance_background():
+    """Background task to apply archive retention and compact closed segments"""
+    while True:
+        try:
+            result = await asyncio.to_thread(run_maintenance, settings.ARCHIVE_DIR, settings.ARCHIVE_RETENTION_DAYS)
+            if result['segments_removed'] > 0 or result['bytes_reclaimed'] > 0:
+                print(f"Archive maintenance: {result['segments_removed']} segments expired, {result['bytes_reclaimed']} bytes reclaimed")
+        except Exception as e:
+            print(f"Error in archive maintenance: {e}")
+        
+        # Run maintenance every hour
+        await asyncio.sleep(3600)
+
+
+async def score_bucket_compaction_background():
+    """Background task to delete score buckets older than every leaderboard window"""
+    keep_days = max(settings.SCORE_BUCKET_RETENTION_DAYS, max(WINDOW_DAYS.values()))
+    while True:
+        try:
+            deleted = await StatsService.compact_score_buckets_async(keep_days)
+            if deleted > 0:
+                print(f"Score bucket compaction: {deleted} expired buckets deleted")
+        except Exception as e:
+            print(f"Error in score bucket compaction: {e}")
+        
+        # Run compaction every hour
+        await asyncio.sleep(3600)
 
 
 @app.on_event("startup")
 async def startup_event():
     """Start background tasks on startup"""
-    # Start room cleanup in background thread
-    cleanup_thread = threading.Thread(target=cleanup_rooms_background, daemon=True)
-    cleanup_thread.start()
+    # Start room cleanup on the event loop
+    app.state.cleanup_task = asyncio.create_task(cleanup_rooms_background())
     print("🚀 Background room cleanup started")
+    
+    app.state.compaction_task = asyncio.create_task(score_bucket_compaction_background())
+    
+    if settings.ARCHIVE_ENABLED:
+        app.state.archive_task = asyncio.create_task(archive_maintenance_background())
+        print("🗄️ Archive maintenance started")
 
 
 @app.get("/")
@@ -2,5 +2,8 @@ from .user import User
 from .game_room import GameRoom
 from .game_session import GameSession
 from .player_stats import PlayerStats
+from .score_bucket import ScoreBucket
+from .archived_session import ArchivedSession
+from .session_totals import SessionTotals
 
-__all__ = ["User", "GameRoom", "GameSession", "PlayerStats"] 
\ No newline at end of file
+__all__ = ["User", "GameRoom", "GameSession", "PlayerStats", "ScoreBucket", "ArchivedSession", "SessionTotals"] 
\ No newline at end of file
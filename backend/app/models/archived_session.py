@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, DateTime
+from ..database import Base
+
+
+class ArchivedSession(Base):
+    """A closed game session moved out of game_sessions by the archival job
+
+    Keeps only what history needs (no token or ready flag), and no foreign
+    keys, so rooms can be deleted without touching the archive.
+    """
+    __tablename__ = "game_session_archive"
+    
+    id = Column(Integer, primary_key=True)  # the session's id in game_sessions
+    user_id = Column(Integer, nullable=False, index=True)
+    room_id = Column(Integer, nullable=False)
+    score = Column(Integer, default=0, nullable=False)
+    joined_at = Column(DateTime(timezone=True), nullable=True)
+    left_at = Column(DateTime(timezone=True), nullable=True)
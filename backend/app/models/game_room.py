@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -6,6 +6,14 @@ from ..database import Base
 
 class GameRoom(Base):
     __tablename__ = "game_rooms"
+    __table_args__ = (
+        # Loading the public room directory (is_private = false, is_active = true)
+        Index("ix_game_rooms_public_listing", "is_private", "is_active", "current_players"),
+        # Cleanup: full active rooms, and inactive rooms by age
+        Index("ix_game_rooms_active_created_at", "is_active", "created_at"),
+        # Room directory refresh: rooms changed since the last pull
+        Index("ix_game_rooms_updated_at", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     room_code = Column(String, unique=True, index=True, nullable=False)
@@ -1,11 +1,21 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index
+from sqlalchemy.sql import func, text
 from sqlalchemy.orm import relationship
 from ..database import Base
 
 
 class GameSession(Base):
     __tablename__ = "game_sessions"
+    __table_args__ = (
+        # A room's open sessions (left_at IS NULL), read by every roster query
+        Index("ix_game_sessions_room_id_left_at", "room_id", "left_at"),
+        # Open sessions only: the membership check on join and a user's open rooms
+        Index("ix_game_sessions_open_user_room", "user_id", "room_id",
+              sqlite_where=text("left_at IS NULL"), postgresql_where=text("left_at IS NULL")),
+        # Closed sessions by when they closed, for the archival job
+        Index("ix_game_sessions_closed_left_at", "left_at",
+              sqlite_where=text("left_at IS NOT NULL"), postgresql_where=text("left_at IS NOT NULL")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -23,4 +23,10 @@ class PlayerStats(Base):
     last_played = Column(DateTime(timezone=True), nullable=True)
     
     # Relationships
-    user = relationship("User", back_populates="stats") 
\ No newline at end of file
+    user = relationship("User", back_populates="stats")
+
+
+# The leaderboard load reads players best first, so it comes back already in rank order
+Index("ix_player_stats_total_score", PlayerStats.total_score.desc(), PlayerStats.user_id)
+# Leaderboard refresh: stats written since the last pull
+Index("ix_player_stats_last_played", PlayerStats.last_played)
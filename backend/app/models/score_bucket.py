@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, UniqueConstraint
+from ..database import Base
+
+
+class ScoreBucket(Base):
+    """A player's score over one UTC day, for the daily and weekly leaderboards"""
+    __tablename__ = "score_buckets"
+    __table_args__ = (UniqueConstraint("user_id", "day", name="uq_score_buckets_user_day"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    day = Column(Date, nullable=False, index=True)
+    score = Column(Integer, default=0, nullable=False)
+    games_played = Column(Integer, default=0, nullable=False)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from ..database import Base
+
+
+class SessionTotals(Base):
+    """A player's archived game sessions, summed up when they are archived"""
+    __tablename__ = "session_totals"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    sessions = Column(Integer, default=0, nullable=False)
+    seconds_in_rooms = Column(Integer, default=0, nullable=False)
+    total_score = Column(Integer, default=0, nullable=False)
+    last_left_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,10 +1,10 @@
 from .user import UserCreate, UserLogin, UserResponse, Token
-from .game_room import GameRoomCreate, GameRoomResponse, GameRoomJoin
+from .game_room import GameRoomCreate, GameRoomResponse, GameRoomJoin, QuickPlayResponse
 from .game_session import GameSessionResponse
 from .player_stats import PlayerStatsResponse
 
 __all__ = [
     "UserCreate", "UserLogin", "UserResponse", "Token",
-    "GameRoomCreate", "GameRoomResponse", "GameRoomJoin",
+    "GameRoomCreate", "GameRoomResponse", "GameRoomJoin", "QuickPlayResponse",
     "GameSessionResponse", "PlayerStatsResponse"
 ] 
\ No newline at end of file
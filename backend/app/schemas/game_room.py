@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
+from .game_session import GameSessionResponse
 
 
 class GameRoomBase(BaseModel):
@@ -37,6 +38,12 @@ class GameRoomResponse(GameRoomBase):
         from_attributes = True
 
 
+class QuickPlayResponse(BaseModel):
+    session: GameSessionResponse
+    room: GameRoomResponse
+    created: bool  # no open room had a seat, so a new one was made
+
+
 class GameState(BaseModel):
     room_id: int
     current_word: Optional[str] = None
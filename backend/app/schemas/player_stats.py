@@ -27,4 +27,9 @@ class LeaderboardEntry(BaseModel):
     total_score: int
     games_played: int
     average_score: int
-    rank: int 
\ No newline at end of file
+    rank: int
+
+
+class PlayerRankResponse(LeaderboardEntry):
+    user_id: int
+    total_players: int
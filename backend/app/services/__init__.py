@@ -1,5 +1,9 @@
 from .game_service import GameService
 from .room_service import RoomService
 from .user_service import UserService
+from .game_link import GameServerLink
+from .stats_service import StatsService, StatsWriter
+from .leaderboard_service import LeaderboardService
+from .cleanup_service import CleanupService
 
-__all__ = ["GameService", "RoomService", "UserService"] 
\ No newline at end of file
+__all__ = ["GameService", "RoomService", "UserService", "GameServerLink", "StatsService", "StatsWriter", "LeaderboardService", "CleanupService"] 
\ No newline at end of file
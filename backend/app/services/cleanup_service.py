@@ -0,0 +1,251 @@
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List
+from sqlalchemy import bindparam, delete, exists, insert, select, update
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+from ..models.game_room import GameRoom
+from ..models.game_session import GameSession
+from ..models.archived_session import ArchivedSession
+from ..models.session_totals import SessionTotals
+from .room_directory import room_directory
+from ..config import settings
+
+rooms_table = GameRoom.__table__
+sessions_table = GameSession.__table__
+archive_table = ArchivedSession.__table__
+totals_table = SessionTotals.__table__
+
+# Cleanup steps, run in this order until each finds nothing left
+STEPS = ('close_full_rooms', 'delete_old_rooms', 'archive_closed_sessions', 'archive_orphaned_sessions')
+
+ARCHIVE_COLUMNS = ('id', 'user_id', 'room_id', 'score', 'joined_at', 'left_at')
+
+# Adds one chunk's archived sessions to a player's totals, run as an executemany
+APPLY_TOTALS = (
+    update(totals_table)
+    .where(totals_table.c.user_id == bindparam('p_user_id'))
+    .values(
+        sessions=totals_table.c.sessions + bindparam('p_sessions'),
+        seconds_in_rooms=totals_table.c.seconds_in_rooms + bindparam('p_seconds'),
+        total_score=totals_table.c.total_score + bindparam('p_score'),
+        last_left_at=bindparam('p_last_left_at')
+    )
+)
+
+
+def new_report() -> Dict:
+    return {
+        'full_rooms_closed': 0,
+        'old_rooms_deleted': 0,
+        'sessions_archived': 0,
+        'chunks': 0,
+        'seconds': 0.0,
+        'lock_seconds': 0.0,  # time spent inside write transactions
+        'max_lock_ms': 0.0,  # longest single write transaction
+        'rows_per_second': 0
+    }
+
+
+class CleanupService:
+    """Set-based room cleanup in short, bounded transactions
+
+    Every step picks at most `chunk_size` rows, changes them with a few
+    bulk statements and commits, so a writer (e.g. the socket server on
+    SQLite) never waits on cleanup for longer than one chunk. Each chunk
+    re-selects what is still left, so a step ends when a chunk comes back
+    short (ties on left_at can make an archival chunk a little longer).
+
+    - close_full_rooms: full, active rooms are deactivated (so they leave
+      the public list)
+    - delete_old_rooms: inactive rooms older than the rooms cutoff are
+      deleted, their game sessions archived
+    - archive_closed_sessions: sessions closed before the sessions cutoff
+    - archive_orphaned_sessions: sessions whose room no longer exists
+
+    Archiving moves sessions from game_sessions to game_session_archive
+    and adds them to the players' SessionTotals, in the same transaction,
+    so game_sessions only holds open and recently closed sessions.
+    """
+
+    @staticmethod
+    def _write(db: Session, report: Dict, statements: List) -> List[int]:
+        """Run write statements in one transaction, timing how long it holds the write lock
+
+        An entry is a statement or a (statement, parameter list) pair run as
+        an executemany. Returns each statement's row count.
+        """
+        started = time.perf_counter()
+        try:
+            counts = [
+                db.execute(*statement).rowcount if isinstance(statement, tuple) else db.execute(statement).rowcount
+                for statement in statements
+            ]
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        held = time.perf_counter() - started
+        report['chunks'] += 1
+        report['lock_seconds'] += held
+        report['max_lock_ms'] = max(report['max_lock_ms'], held * 1e3)
+        return counts
+
+    @staticmethod
+    def _archive_statements(db: Session, where) -> List:
+        """Statements moving the sessions matching `where` to the archive; [] if there are none"""
+        rows = db.execute(
+            select(sessions_table.c.user_id, sessions_table.c.score, sessions_table.c.joined_at, sessions_table.c.left_at)
+            .where(where)
+        ).all()
+        if not rows:
+            return []
+        
+        totals = defaultdict(lambda: {'p_sessions': 0, 'p_seconds': 0, 'p_score': 0, 'p_last_left_at': None})
+        for row in rows:
+            total = totals[row.user_id]
+            total['p_sessions'] += 1
+            total['p_score'] += row.score or 0
+            if row.joined_at and row.left_at:
+                total['p_seconds'] += max(0, int((row.left_at - row.joined_at).total_seconds()))
+            if row.left_at and (total['p_last_left_at'] is None or row.left_at > total['p_last_left_at']):
+                total['p_last_left_at'] = row.left_at
+        
+        existing = dict(db.execute(
+            select(totals_table.c.user_id, totals_table.c.last_left_at).where(totals_table.c.user_id.in_(list(totals)))
+        ).all())
+        for user_id, total in totals.items():
+            last_left_at = existing.get(user_id)
+            if last_left_at and (total['p_last_left_at'] is None or last_left_at > total['p_last_left_at']):
+                total['p_last_left_at'] = last_left_at
+        
+        # Rows are copied by the database, not round-tripped through Python
+        statements = [insert(archive_table).from_select(
+            ARCHIVE_COLUMNS, select(*(sessions_table.c[column] for column in ARCHIVE_COLUMNS)).where(where)
+        )]
+        missing = [user_id for user_id in totals if user_id not in existing]
+        if missing:
+            statements.append((insert(totals_table), [
+                {'user_id': user_id, 'sessions': 0, 'seconds_in_rooms': 0, 'total_score': 0} for user_id in missing
+            ]))
+        statements.append((APPLY_TOTALS, [{'p_user_id': user_id, **total} for user_id, total in totals.items()]))
+        statements.append(delete(sessions_table).where(where))
+        return statements
+    
+    @staticmethod
+    def close_full_rooms(db: Session, chunk_size: int, cutoffs: Dict, report: Dict) -> int:
+        room_ids = db.execute(
+            select(rooms_table.c.id)
+            .where(rooms_table.c.is_active == True, rooms_table.c.current_players >= rooms_table.c.max_players)
+            .limit(chunk_size)
+        ).scalars().all()
+        if room_ids:
+            # Still full: a player may have left since the select
+            closed, = CleanupService._write(db, report, [
+                update(rooms_table)
+                .where(rooms_table.c.id.in_(room_ids), rooms_table.c.current_players >= rooms_table.c.max_players)
+                .values(is_active=False)
+            ])
+            for room_id in room_ids:
+                room_directory.room_deleted(room_id)
+            report['full_rooms_closed'] += closed
+        return len(room_ids)
+
+    @staticmethod
+    def delete_old_rooms(db: Session, chunk_size: int, cutoffs: Dict, report: Dict) -> int:
+        room_ids = db.execute(
+            select(rooms_table.c.id)
+            .where(rooms_table.c.is_active == False, rooms_table.c.created_at < cutoffs['rooms'])
+            .limit(chunk_size)
+        ).scalars().all()
+        if room_ids:
+            archive = CleanupService._archive_statements(db, sessions_table.c.room_id.in_(room_ids))
+            counts = CleanupService._write(db, report, archive + [delete(rooms_table).where(rooms_table.c.id.in_(room_ids))])
+            for room_id in room_ids:
+                room_directory.room_deleted(room_id)
+            report['old_rooms_deleted'] += len(room_ids)
+            report['sessions_archived'] += counts[0] if archive else 0
+        return len(room_ids)
+
+    @staticmethod
+    def _archive(db: Session, where, report: Dict) -> int:
+        archive = CleanupService._archive_statements(db, where)
+        archived = CleanupService._write(db, report, archive)[0] if archive else 0
+        report['sessions_archived'] += archived
+        return archived
+
+    @staticmethod
+    def archive_closed_sessions(db: Session, chunk_size: int, cutoffs: Dict, report: Dict) -> int:
+        # The chunk is the sessions closed up to the chunk_size-th oldest left_at (a range
+        # on the closed-sessions index), so no id list has to be sent with every statement
+        boundary = db.execute(
+            select(sessions_table.c.left_at)
+            .where(sessions_table.c.left_at < cutoffs['sessions'])
+            .order_by(sessions_table.c.left_at)
+            .offset(chunk_size - 1)
+            .limit(1)
+        ).scalar()
+        if boundary is None:
+            return CleanupService._archive(db, sessions_table.c.left_at < cutoffs['sessions'], report)
+        return CleanupService._archive(db, sessions_table.c.left_at <= boundary, report)
+
+    @staticmethod
+    def archive_orphaned_sessions(db: Session, chunk_size: int, cutoffs: Dict, report: Dict) -> int:
+        session_ids = db.execute(
+            select(sessions_table.c.id)
+            .where(~exists().where(rooms_table.c.id == sessions_table.c.room_id))
+            .limit(chunk_size)
+        ).scalars().all()
+        if not session_ids:
+            return 0
+        return CleanupService._archive(db, sessions_table.c.id.in_(session_ids), report)
+
+    @staticmethod
+    def finish_report(report: Dict, started: float) -> Dict:
+        report['seconds'] = round(time.perf_counter() - started, 3)
+        rows = report['full_rooms_closed'] + report['old_rooms_deleted'] + report['sessions_archived']
+        report['rows_per_second'] = round(rows / report['seconds']) if report['seconds'] else 0
+        report['lock_seconds'] = round(report['lock_seconds'], 3)
+        report['max_lock_ms'] = round(report['max_lock_ms'], 2)
+        return report
+
+    @staticmethod
+    def cutoffs(hours_old: int, archive_days: int = None) -> Dict:
+        """Rooms created, and sessions closed, before these are cleaned up"""
+        now = datetime.utcnow()
+        archive_days = settings.SESSION_ARCHIVE_DAYS if archive_days is None else archive_days
+        return {'rooms': now - timedelta(hours=hours_old), 'sessions': now - timedelta(days=archive_days)}
+
+    @staticmethod
+    def cleanup_rooms(db: Session, hours_old: int = 24, chunk_size: int = None, archive_days: int = None) -> Dict:
+        """Run every step to completion, back to back; returns the report"""
+        chunk_size = chunk_size or settings.CLEANUP_CHUNK_SIZE
+        cutoffs = CleanupService.cutoffs(hours_old, archive_days)
+        report = new_report()
+        started = time.perf_counter()
+        for step in STEPS:
+            while getattr(CleanupService, step)(db, chunk_size, cutoffs, report) >= chunk_size:
+                pass
+        return CleanupService.finish_report(report, started)
+
+    @staticmethod
+    async def cleanup_rooms_async(hours_old: int = 24, chunk_size: int = None, pause: float = None,
+                                  archive_days: int = None) -> Dict:
+        """Like cleanup_rooms, but each chunk runs in a worker thread and the
+        event loop sleeps `pause` seconds between chunks, so other writers get the lock"""
+        chunk_size = chunk_size or settings.CLEANUP_CHUNK_SIZE
+        pause = settings.CLEANUP_CHUNK_PAUSE if pause is None else pause
+        cutoffs = CleanupService.cutoffs(hours_old, archive_days)
+        report = new_report()
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            for step in STEPS:
+                run_chunk = getattr(CleanupService, step)
+                while await asyncio.to_thread(run_chunk, db, chunk_size, cutoffs, report) >= chunk_size:
+                    await asyncio.sleep(pause)
+        finally:
+            db.close()
+        return CleanupService.finish_report(report, started)
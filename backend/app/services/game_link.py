@@ -0,0 +1,118 @@
+import json
+import select
+import socket
+import threading
+from itertools import count
+from typing import Dict, List, Optional
+from fastapi import HTTPException, status
+from ..core.security import internal_service_key
+from ..config import settings
+
+
+class GameServerLink:
+    """The REST API's service connection to the socket server
+
+    One persistent, authenticated TCP connection carries requests that must
+    reach a live room (e.g. uploaded strokes). Requests are serialized and
+    each waits for its reply. A connection found broken before the request
+    went out (e.g. after a server restart) is re-opened and the request sent
+    again, once. A request that was sent is never repeated: the server may
+    already have applied it (strokes would be added twice).
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, timeout: float = 5.0):
+        self.host = host or settings.SOCKET_HOST
+        self.port = port or settings.SOCKET_PORT
+        self.timeout = timeout
+        self.sock: Optional[socket.socket] = None
+        self.reader = None
+        self.lock = threading.Lock()
+        self._request_ids = count(1)
+
+    def _connect(self):
+        self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile('rb')
+        self._send({'type': 'service_auth', 'key': internal_service_key()})
+        reply = self._read_until(lambda frame: frame.get('type') in ('service_authenticated', 'error'))
+        if reply.get('type') != 'service_authenticated':
+            self._close()
+            raise ConnectionError(reply.get('message', 'Service authentication failed'))
+
+    def _close(self):
+        if self.sock:
+            try:
+                self.reader.close()
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+        self.reader = None
+
+    def _alive(self) -> bool:
+        """False if the server has closed the idle connection (peeks, consumes nothing)"""
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+            return not readable or self.sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) != b''
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+
+    def _send(self, message: Dict):
+        self.sock.sendall((json.dumps(message, separators=(',', ':')) + '\n').encode('utf-8'))
+
+    def _read_until(self, matches) -> Dict:
+        while True:
+            line = self.reader.readline()
+            if not line:
+                raise ConnectionError("Socket server closed the connection")
+            frame = json.loads(line)
+            if frame.get('type') == 'ping':
+                self._send({'type': 'pong', 'server_time': frame.get('server_time')})
+            elif matches(frame):
+                return frame
+
+    def request(self, message: Dict, reply_type: str) -> Dict:
+        """Send a message and wait for the reply of reply_type with the same request_id"""
+        with self.lock:
+            for attempt in range(2):
+                sent = False
+                try:
+                    if self.sock is not None and not self._alive():
+                        self._close()
+                    if self.sock is None:
+                        self._connect()
+                    request_id = next(self._request_ids)
+                    self._send({**message, 'request_id': request_id})
+                    sent = True
+                    return self._read_until(lambda frame: frame.get('type') == reply_type
+                                            and frame.get('request_id') == request_id)
+                except socket.timeout:
+                    # The request may still be applied, so it is not retried
+                    self._close()
+                    raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Game server did not reply")
+                except (OSError, ConnectionError, ValueError) as e:
+                    self._close()
+                    # Only a request that never fully went out is safe to send again
+                    if attempt or sent:
+                        raise HTTPException(
+                            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail=f"Game server unavailable: {e}"
+                        )
+
+    def draw_batch(self, room_id: int, user_id: int, strokes: List[Dict]) -> List[int]:
+        """Add strokes to a live room for its current drawer; returns their stroke ids"""
+        result = self.request({
+            'type': 'draw_batch',
+            'room_id': room_id,
+            'user_id': user_id,
+            'strokes': strokes
+        }, 'draw_batch_result')
+        if result.get('error'):
+            raise HTTPException(status_code=result.get('status', 409), detail=result['error'])
+        return result['stroke_ids']
+
+
+# Global link to the socket server, opened on first use
+game_link = GameServerLink()
@@ -1,4 +1,7 @@
 import asyncio
+import math
+import re
+import struct
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
@@ -6,11 +9,18 @@ from ..models.game_room import GameRoom
 from ..models.game_session import GameSession
 from ..models.player_stats import PlayerStats
 from ..core.words import word_manager
+from ..core.live_state import create_state_store
+from ..core.archive import STROKE_HEADER, POINT
+from .stats_service import StatsService
+from .room_directory import room_directory
 from ..config import settings
 from ..database import SessionLocal
 from typing import List, Dict, Optional
 import json
 
+COLOR_PATTERN = re.compile(r'^#[0-9a-fA-F]{3}([0-9a-fA-F]{3})?$')
+MAX_BRUSH_SIZE = 50
+
 
 class GameService:
     """Service for game logic and state management"""
@@ -18,6 +28,7 @@ class GameService:
     def __init__(self):
         self.active_games = {}  # room_id -> game_state
         self.game_timers = {}   # room_id -> timer_task
+        self.live_states = create_state_store(settings.LIVE_STATE_BACKEND, settings.LIVE_STATE_DIR)  # Published by the socket server
     
     def serialize_game_state(self, game_state: Dict) -> Dict:
         """Serialize game state for sending to clients (removes datetime objects)"""
@@ -51,6 +62,10 @@ class GameService:
         if not room:
             raise HTTPException(status_code=404, detail="Room not found")
         
+        live_state = self.live_states.get(room_id)
+        if live_state and live_state.get("game_started"):
+            raise HTTPException(status_code=409, detail="A game is already running in this room")
+        
         # Get all players in the room
         players = db.query(GameSession).filter(
             GameSession.room_id == room_id,
@@ -74,8 +89,10 @@ class GameService:
             "time_remaining": room.time_limit,
             "game_started": True,
             "round_start_time": datetime.utcnow(),
+            "game_start_time": datetime.utcnow(),
             "guessed_players": set(),
-            "drawing_data": []
+            "drawing_data": [],
+            "counters": {}  # user_id -> words guessed/drawn, saved at game end
         }
         
         self.active_games[room_id] = game_state
@@ -84,6 +101,7 @@ class GameService:
         room.game_started = True
         room.round_number = 1
         db.commit()
+        room_directory.room_changed(room)
         
         # Start first round
         await self.start_round(db, room_id)
@@ -192,8 +210,13 @@ class GameService:
         game_state = self.active_games[room_id]
         time_elapsed = (datetime.utcnow() - game_state["round_start_time"]).total_seconds()
         
+        counters = game_state["counters"]
+        drawer_id = game_state["players"][game_state["current_drawer_index"]]["id"]
+        counters.setdefault(drawer_id, {"words_guessed": 0, "words_drawn": 0})["words_drawn"] += 1
+        
         # Calculate scores based on time taken to guess
         for player_id in game_state["guessed_players"]:
+            counters.setdefault(player_id, {"words_guessed": 0, "words_drawn": 0})["words_guessed"] += 1
             # Score decreases as time increases
             time_bonus = max(0, game_state["time_remaining"] - time_elapsed)
             score = int(100 + time_bonus)
@@ -211,11 +234,23 @@ class GameService:
         
         game_state = self.active_games[room_id]
         
-        # This would typically update the database
-        # For now, we'll just log the final scores
         print(f"Game ended for room {room_id}")
         for player in game_state["players"]:
             print(f"Player {player['id']}: {player['score']} points")
+        
+        play_minutes = int((datetime.utcnow() - game_state["game_start_time"]).total_seconds() // 60)
+        results = StatsService.game_results(game_state["players"], game_state["counters"], play_minutes)
+        await asyncio.to_thread(self._save_player_stats, results)
+    
+    @staticmethod
+    def _save_player_stats(results: List[Dict]):
+        db = SessionLocal()
+        try:
+            StatsService.apply_game_results(db, results)
+        except Exception as e:
+            print(f"❌ Error saving player stats: {e}")
+        finally:
+            db.close()
     
     def submit_guess(self, room_id: int, user_id: int, guess: str) -> Dict:
         """Submit a word guess"""
@@ -247,28 +282,114 @@ class GameService:
         game_state = self.active_games[room_id]
         game_state["drawing_data"].append(drawing_data)
     
+    @staticmethod
+    def parse_stroke_batch(body: bytes, content_type: str) -> List[Dict]:
+        """Parse and validate uploaded strokes
+        
+        Accepts a JSON stroke or array of strokes, NDJSON (one stroke per line),
+        or application/octet-stream with strokes packed as in the round archive
+        (STROKE_HEADER + POINT pairs; the id fields are ignored). A stroke is
+        {"points": [[x, y], ...], "color": "#rrggbb", "brush_size": n}.
+        Points are checked with plain type tests rather than a model per point.
+        """
+        max_points = settings.BULK_STROKE_MAX_POINTS
+        too_large = HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {max_points} points per request"
+        )
+        if len(body) > max_points * 64:
+            raise too_large
+        
+        try:
+            if 'octet-stream' in content_type:
+                raw_strokes = GameService._unpack_strokes(body)
+            elif 'ndjson' in content_type:
+                raw_strokes = [json.loads(line) for line in body.splitlines() if line.strip()]
+            else:
+                raw_strokes = json.loads(body)
+                if isinstance(raw_strokes, dict):
+                    raw_strokes = [raw_strokes]
+            if not isinstance(raw_strokes, list) or not raw_strokes:
+                raise ValueError("expected one or more strokes")
+            
+            strokes = []
+            total_points = 0
+            for raw in raw_strokes:
+                stroke = GameService._validate_stroke(raw)
+                total_points += len(stroke['points'])
+                if total_points > max_points:
+                    raise too_large
+                strokes.append(stroke)
+            return strokes
+        except (ValueError, TypeError, struct.error) as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid strokes: {e}")
+    
+    @staticmethod
+    def _validate_stroke(raw) -> Dict:
+        if not isinstance(raw, dict):
+            raise ValueError("each stroke must be an object")
+        points = raw.get('points')
+        if not isinstance(points, list) or not points:
+            raise ValueError("each stroke needs a non-empty points list")
+        for point in points:
+            if type(point) is not list or len(point) != 2:
+                raise ValueError("points must be [x, y] pairs")
+            x, y = point
+            if type(x) not in (int, float) or type(y) not in (int, float) or not (math.isfinite(x) and math.isfinite(y)):
+                raise ValueError("point coordinates must be finite numbers")
+        
+        color = raw.get('color', '#000000')
+        if not isinstance(color, str) or not COLOR_PATTERN.match(color):
+            raise ValueError("color must be #rgb or #rrggbb")
+        brush_size = raw.get('brush_size', 2)
+        if type(brush_size) is not int or not 1 <= brush_size <= MAX_BRUSH_SIZE:
+            raise ValueError(f"brush_size must be an integer from 1 to {MAX_BRUSH_SIZE}")
+        return {'points': points, 'color': color, 'brush_size': brush_size}
+    
+    @staticmethod
+    def _unpack_strokes(body: bytes) -> List[Dict]:
+        strokes = []
+        position = 0
+        while position < len(body):
+            _, _, color, brush_size, point_count = STROKE_HEADER.unpack_from(body, position)
+            position += STROKE_HEADER.size
+            end = position + point_count * POINT.size
+            if end > len(body):
+                raise ValueError("truncated stroke")
+            strokes.append({
+                'points': [list(point) for point in POINT.iter_unpack(body[position:end])],
+                'color': f"#{color:06x}",
+                'brush_size': brush_size
+            })
+            position = end
+        return strokes
+    
     def get_game_state(self, room_id: int) -> Optional[Dict]:
-        """Get current game state"""
+        """Get current game state, from the socket server's live state when the room is there"""
+        live_state = self.live_states.get(room_id)
+        if live_state:
+            return live_state
         game_state = self.active_games.get(room_id)
         if game_state:
             return self.serialize_game_state(game_state)
         return None
     
-    def get_public_rooms(self, db: Session) -> List[Dict]:
-        """Get all public rooms with basic info"""
-        rooms = db.query(GameRoom).filter(
-            GameRoom.is_private == False,
-            GameRoom.is_active == True
-        ).all()
-        
+    def get_live_games(self) -> List[Dict]:
+        """Live state of every room on the socket server"""
+        return self.live_states.all()
+    
+    def get_public_rooms(self, db: Session, after: int = 0, limit: int = 50) -> List[Dict]:
+        """Get a page of public rooms with basic info"""
+        room_directory.refresh(db)
+        rooms, _, _ = room_directory.page(after, limit)
         return [
             {
-                "id": room.id,
-                "name": room.name,
-                "room_code": room.room_code,
-                "current_players": room.current_players,
-                "max_players": room.max_players,
-                "game_started": room.game_started
+                "id": room["id"],
+                "name": room["name"],
+                "room_code": room["room_code"],
+                "current_players": room["current_players"],
+                "max_players": room["max_players"],
+                "game_started": room["game_started"]
             }
             for room in rooms
         ]
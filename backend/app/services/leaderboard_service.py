@@ -0,0 +1,318 @@
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from sortedcontainers import SortedList
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models.player_stats import PlayerStats
+from ..models.score_bucket import ScoreBucket
+from ..models.user import User
+
+# Stats committed this long after the game they record still show up in a refresh
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+# Rolling windows, in UTC days including today, built from ScoreBucket rows
+WINDOW_DAYS = {'daily': 1, 'weekly': 7}
+WINDOWS = ('all', *WINDOW_DAYS)
+
+LEADERBOARD_COLUMNS = (
+    PlayerStats.id,
+    PlayerStats.user_id,
+    User.username,
+    PlayerStats.total_score,
+    PlayerStats.games_played,
+    PlayerStats.average_score,
+    PlayerStats.last_played
+)
+
+BUCKET_COLUMNS = (ScoreBucket.user_id, ScoreBucket.day, ScoreBucket.score, ScoreBucket.games_played)
+
+
+def utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+class RankedScores:
+    """Players ordered by score: rank and a page at any offset in O(log n)
+
+    Players on the same score share a rank (1, 2, 2, 4).
+    """
+
+    def __init__(self, scores: Optional[Dict[int, int]] = None):
+        self.scores: Dict[int, int] = dict(scores or {})
+        # One sort of the whole list rather than n inserts
+        self.order = SortedList((-score, user_id) for user_id, score in self.scores.items())
+
+    def set(self, user_id: int, score: Optional[int]):
+        """Place a player at a score, or drop them with None"""
+        previous = self.scores.get(user_id)
+        if previous is not None:
+            self.order.remove((-previous, user_id))
+        if score is None:
+            self.scores.pop(user_id, None)
+        else:
+            self.scores[user_id] = score
+            self.order.add((-score, user_id))
+
+    def rank_of_score(self, score: int) -> int:
+        # Everyone strictly ahead sorts before (-score,), whatever their user_id
+        return self.order.bisect_left((-score,)) + 1
+
+    def rank(self, user_id: int) -> Optional[int]:
+        score = self.scores.get(user_id)
+        return None if score is None else self.rank_of_score(score)
+
+    def page(self, offset: int, limit: int) -> List[Tuple[int, int, int]]:
+        """(user_id, score, rank) for positions offset .. offset+limit-1"""
+        return [
+            (user_id, -negative_score, self.rank_of_score(-negative_score))
+            for negative_score, user_id in self.order.islice(offset, offset + limit)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+
+class WindowScores:
+    """Per-player score and games over the last `days` day buckets"""
+
+    def __init__(self, days: int):
+        self.days = days
+        self.ranked = RankedScores()
+        self.games: Dict[int, int] = {}
+
+    def covers(self, day: date, today: date) -> bool:
+        return today - timedelta(days=self.days) < day <= today
+
+    def add(self, user_id: int, score: int, games: int):
+        """Merge a bucket's contribution (negative to take it back out)"""
+        if not score and not games:
+            return
+        total_games = self.games.get(user_id, 0) + games
+        if total_games <= 0:
+            self.games.pop(user_id, None)
+            self.ranked.set(user_id, None)
+        else:
+            self.games[user_id] = total_games
+            self.ranked.set(user_id, self.ranked.scores.get(user_id, 0) + score)
+
+
+class LeaderboardService:
+    """All-time, weekly and daily leaderboards, kept in memory
+
+    All-time ranks come from PlayerStats. The rolling windows are merged
+    from per-day ScoreBucket rows: a bucket's score is added to every window
+    covering its day and taken back out when the day rolls past the window,
+    so a rollover costs the size of one day's bucket, however long the
+    history. Only the buckets of the longest window are held.
+
+    Everything is loaded by two queries on first use. After that, stats
+    written in this process are applied as they commit, and at most every
+    LEADERBOARD_REFRESH_INTERVAL seconds a read pulls the rows played since
+    the last one, which covers stats written by the socket server process.
+    """
+
+    def __init__(self, refresh_interval: Optional[float] = None):
+        self.refresh_interval = settings.LEADERBOARD_REFRESH_INTERVAL if refresh_interval is None else refresh_interval
+        self.all_time = RankedScores()
+        self.entries: Dict[int, tuple] = {}  # user_id -> (username, total_score, games_played, average_score)
+        self.windows = {name: WindowScores(days) for name, days in WINDOW_DAYS.items()}
+        self.buckets: Dict[date, Dict[int, Tuple[int, int]]] = {}  # day -> user_id -> (score, games)
+        self.today: Optional[date] = None
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._refreshed_at = 0.0
+        self._last_played: Optional[datetime] = None
+        self._max_stats_id = 0
+
+    @property
+    def first_day(self) -> date:
+        """Oldest day any window still covers"""
+        return self.today - timedelta(days=max(WINDOW_DAYS.values()) - 1)
+
+    def _put(self, row):
+        """Insert or move one player; row has the LEADERBOARD_COLUMNS fields"""
+        total_score = row.total_score or 0
+        self.entries[row.user_id] = (row.username, total_score, row.games_played or 0, row.average_score or 0)
+        self.all_time.set(row.user_id, total_score)
+        self._max_stats_id = max(self._max_stats_id, row.id)
+        if row.last_played is not None and (self._last_played is None or row.last_played > self._last_played):
+            self._last_played = row.last_played
+
+    def _set_bucket(self, user_id: int, day: date, score: int, games: int):
+        """Set one bucket to its stored value, merging the difference into the windows"""
+        if day < self.first_day:
+            return
+        bucket = self.buckets.setdefault(day, {})
+        previous_score, previous_games = bucket.get(user_id, (0, 0))
+        bucket[user_id] = (score, games)
+        for window in self.windows.values():
+            if window.covers(day, self.today):
+                window.add(user_id, score - previous_score, games - previous_games)
+
+    def roll(self, today: Optional[date] = None):
+        """Move the windows to a new day (today by default)"""
+        with self._lock:
+            self._roll(today or utc_today())
+
+    def _roll(self, today: date):
+        """Move the windows to a new day: buckets leaving a window are subtracted from it"""
+        if today == self.today:
+            return
+        previous, self.today = self.today, today
+        for window in self.windows.values():
+            moved = [(day, window.covers(day, today)) for day in self.buckets
+                     if window.covers(day, previous) != window.covers(day, today)]
+            if sum(len(self.buckets[day]) for day, _ in moved) * 2 > len(window.ranked):
+                # Most of the window changes (e.g. daily at midnight): re-merge it in one pass
+                self._rebuild(window)
+                continue
+            for day, entering in moved:
+                sign = 1 if entering else -1
+                for user_id, (score, games) in self.buckets[day].items():
+                    window.add(user_id, sign * score, sign * games)
+        for day in [day for day in self.buckets if day < self.first_day]:
+            del self.buckets[day]
+
+    def _rebuild(self, window: WindowScores):
+        """Re-merge a window from the buckets it covers, sorting once"""
+        scores: Dict[int, int] = {}
+        games: Dict[int, int] = {}
+        for day, bucket in self.buckets.items():
+            if window.covers(day, self.today):
+                for user_id, (score, count) in bucket.items():
+                    scores[user_id] = scores.get(user_id, 0) + score
+                    games[user_id] = games.get(user_id, 0) + count
+        window.games = {user_id: count for user_id, count in games.items() if count > 0}
+        window.ranked = RankedScores({user_id: scores[user_id] for user_id in window.games})
+
+    def load_rows(self, stats_rows: Iterable, bucket_rows: Iterable, today: Optional[date] = None):
+        """(Re)build the index from LEADERBOARD_COLUMNS and BUCKET_COLUMNS rows"""
+        stats_rows = list(stats_rows)
+        with self._lock:
+            self.entries = {
+                row.user_id: (row.username, row.total_score or 0, row.games_played or 0, row.average_score or 0)
+                for row in stats_rows
+            }
+            self.all_time = RankedScores({user_id: entry[1] for user_id, entry in self.entries.items()})
+            self._last_played = max((row.last_played for row in stats_rows if row.last_played is not None), default=None)
+            self._max_stats_id = max((row.id for row in stats_rows), default=0)
+
+            self.today = today or utc_today()
+            self.buckets = {}
+            for row in bucket_rows:
+                if row.day >= self.first_day:
+                    self.buckets.setdefault(row.day, {})[row.user_id] = (row.score, row.games_played)
+            for window in self.windows.values():
+                self._rebuild(window)
+
+            self.loaded = True
+            self._refreshed_at = time.monotonic()
+
+    def _stats_query(self, user_ids: Optional[Iterable[int]] = None, since: bool = False):
+        query = select(*LEADERBOARD_COLUMNS).join(User, User.id == PlayerStats.user_id)
+        if user_ids is not None:
+            query = query.where(PlayerStats.user_id.in_(list(user_ids)))
+        elif since:
+            changed = PlayerStats.id > self._max_stats_id
+            if self._last_played is not None:
+                changed = or_(changed, PlayerStats.last_played > self._last_played - REFRESH_OVERLAP)
+            query = query.where(changed)
+        return query
+
+    @staticmethod
+    def _bucket_query(first_day: date, user_ids: Optional[Iterable[int]] = None):
+        query = select(*BUCKET_COLUMNS).where(ScoreBucket.day >= first_day)
+        if user_ids is not None:
+            query = query.where(ScoreBucket.user_id.in_(list(user_ids)))
+        return query
+
+    def load(self, db: Session):
+        """(Re)build the index from the database"""
+        today = utc_today()
+        first_day = today - timedelta(days=max(WINDOW_DAYS.values()) - 1)
+        # In rank order (off ix_player_stats_total_score), so building the sorted index is one cheap pass
+        stats_query = self._stats_query().order_by(PlayerStats.total_score.desc(), PlayerStats.user_id)
+        self.load_rows(db.execute(stats_query), db.execute(self._bucket_query(first_day)), today)
+
+    def _apply(self, db: Session, stats_rows: List):
+        """Apply re-read stats rows, then re-read and apply those players' buckets"""
+        if not stats_rows:
+            return
+        with self._lock:
+            self._roll(utc_today())
+            first_day = self.first_day
+        bucket_rows = db.execute(self._bucket_query(first_day, [row.user_id for row in stats_rows])).all()
+        self.apply_rows(stats_rows, bucket_rows)
+
+    def apply_rows(self, stats_rows: Iterable, bucket_rows: Iterable):
+        """Update players from re-read LEADERBOARD_COLUMNS and BUCKET_COLUMNS rows"""
+        with self._lock:
+            self._roll(utc_today())
+            for row in stats_rows:
+                self._put(row)
+            for row in bucket_rows:
+                self._set_bucket(row.user_id, row.day, row.score, row.games_played)
+
+    def refresh(self, db: Session, force: bool = False):
+        """Load on first use, then pull stats changed since the last refresh when it is due"""
+        if not self.loaded:
+            self.load(db)
+            return
+        if not force and time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return
+        self._apply(db, db.execute(self._stats_query(since=True)).all())
+        self._refreshed_at = time.monotonic()
+
+    def apply_committed(self, db: Session, user_ids: Iterable[int]):
+        """Re-read just these players after their stats were committed (no-op until loaded)"""
+        if not self.loaded:
+            return
+        self._apply(db, db.execute(self._stats_query(user_ids=user_ids)).all())
+
+    def _ranked(self, window: str) -> Tuple[RankedScores, Optional[Dict[int, int]]]:
+        if window == 'all':
+            return self.all_time, None
+        self._roll(utc_today())
+        return self.windows[window].ranked, self.windows[window].games
+
+    def _entry(self, user_id: int, score: int, rank: int, games: Optional[Dict[int, int]]) -> Dict:
+        username, _, games_played, average_score = self.entries.get(user_id, (None, 0, 0, 0))
+        if games is not None:
+            games_played = games[user_id]
+            average_score = score // games_played
+        return {
+            'user_id': user_id,
+            'username': username,
+            'total_score': score,
+            'games_played': games_played,
+            'average_score': average_score,
+            'rank': rank
+        }
+
+    def page(self, offset: int = 0, limit: int = 10, window: str = 'all') -> List[Dict]:
+        """Entries at positions offset .. offset+limit-1 of a window, with their ranks"""
+        with self._lock:
+            ranked, games = self._ranked(window)
+            return [self._entry(user_id, score, rank, games) for user_id, score, rank in ranked.page(offset, limit)]
+
+    def top(self, limit: int = 10, window: str = 'all') -> List[Dict]:
+        return self.page(0, limit, window)
+
+    def rank(self, user_id: int, window: str = 'all') -> Optional[Dict]:
+        """A player's entry with their rank and the number of ranked players, or None if unranked"""
+        with self._lock:
+            ranked, games = self._ranked(window)
+            rank = ranked.rank(user_id)
+            if rank is None:
+                return None
+            return {**self._entry(user_id, ranked.scores[user_id], rank, games), 'total_players': len(ranked)}
+
+    def __len__(self) -> int:
+        return len(self.all_time)
+
+
+# Global leaderboard instance
+leaderboard_service = LeaderboardService()
@@ -0,0 +1,228 @@
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from sortedcontainers import SortedList
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models.game_room import GameRoom
+
+# Rooms updated this long before the newest change seen so far are re-read by a refresh
+REFRESH_OVERLAP = timedelta(seconds=5)
+
+DIRECTORY_FIELDS = (
+    'id', 'room_code', 'name', 'is_private', 'password', 'max_players', 'current_players',
+    'is_active', 'created_by', 'created_at', 'current_word', 'current_drawer_id',
+    'round_number', 'max_rounds', 'time_limit', 'game_started'
+)
+DIRECTORY_COLUMNS = tuple(getattr(GameRoom, field) for field in DIRECTORY_FIELDS) + (GameRoom.updated_at,)
+
+# (has_free_seats, not_started) filter -> does a room pass it
+FILTERS = [(free, not_started) for free in (False, True) for not_started in (False, True)]
+
+
+def room_filters(room: Dict) -> List[Tuple[bool, bool]]:
+    """The filter combinations a room shows up under"""
+    has_free_seats = (room['current_players'] or 0) < (room['max_players'] or 0)
+    return [
+        (free, not_started) for free, not_started in FILTERS
+        if (has_free_seats or not free) and (not room['game_started'] or not not_started)
+    ]
+
+
+def seat_key(room: Dict, reserved: int = 0) -> Optional[Tuple[bool, int, int]]:
+    """Quick-play order of a room, or None when it has no seat left
+
+    Rooms waiting to start come before games in progress, then the fewest
+    free seats (so rooms fill up and start), then the oldest room.
+    """
+    free_seats = (room['max_players'] or 0) - (room['current_players'] or 0) - reserved
+    if free_seats <= 0:
+        return None
+    return bool(room['game_started']), free_seats, room['id']
+
+
+def room_stamp(room: Dict) -> bytes:
+    """Hash of the fields the directory serves for a room, the same in every process"""
+    return hashlib.blake2b(repr(tuple(room[field] for field in DIRECTORY_FIELDS)).encode(), digest_size=8).digest()
+
+
+class RoomDirectory:
+    """Public, active rooms kept in memory for the lobby
+
+    Each filter combination (has free seats, not started) has its own sorted
+    list of room ids, so a page after any room id is an O(log n) seek plus
+    the page itself, and the database is not touched by reads. Each room is
+    stamped with a hash of its fields, and a page's ETag is a hash of its
+    rooms' stamps, so an unchanged page has the same ETag across reloads and
+    API workers and can be answered with 304.
+
+    RoomService and GameService report the rooms they change. Rooms changed
+    by the socket server process (player counts) are pulled at most every
+    DIRECTORY_REFRESH_INTERVAL seconds by a read, from updated_at.
+
+    listener, when set, is called with the id of every room added, changed
+    or dropped (under the directory's lock, so it must not call back in).
+
+    Rooms with a free seat are also kept in quick-play order (see seat_key).
+    reserve_seat takes the best one and holds a seat in it until
+    release_seat, so concurrent quick-plays in this process are spread over
+    rooms instead of all racing for the last seat of the same one.
+    """
+
+    def __init__(self, refresh_interval: Optional[float] = None, listener: Optional[Callable[[int], None]] = None):
+        self.refresh_interval = settings.DIRECTORY_REFRESH_INTERVAL if refresh_interval is None else refresh_interval
+        self.listener = listener
+        self.rooms: Dict[int, Dict] = {}
+        self.stamps: Dict[int, bytes] = {}
+        self.indexes = {key: SortedList() for key in FILTERS}
+        self.seats = SortedList()
+        self.seat_keys: Dict[int, tuple] = {}
+        self.reserved: Dict[int, int] = {}
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._refreshed_at = 0.0
+        self._last_updated: Optional[datetime] = None
+        self._max_room_id = 0
+
+    def _put(self, room: Dict, updated_at: Optional[datetime] = None):
+        """Insert, update or drop one room (dropped once private, inactive or gone)"""
+        room_id = room['id']
+        previous = self.rooms.get(room_id)
+        self._max_room_id = max(self._max_room_id, room_id)
+        if updated_at is not None and (self._last_updated is None or updated_at > self._last_updated):
+            self._last_updated = updated_at
+        if previous == room:
+            return
+        if previous is not None:
+            for key in room_filters(previous):
+                self.indexes[key].remove(room_id)
+        if room['is_private'] or not room['is_active']:
+            self.rooms.pop(room_id, None)
+            self.stamps.pop(room_id, None)
+        else:
+            self.rooms[room_id] = room
+            self.stamps[room_id] = room_stamp(room)
+            for key in room_filters(room):
+                self.indexes[key].add(room_id)
+        self._reseat(room_id)
+        if self.listener and (previous is not None or room_id in self.rooms):
+            self.listener(room_id)
+
+    def _remove(self, room_id: int):
+        previous = self.rooms.pop(room_id, None)
+        self.stamps.pop(room_id, None)
+        if previous is not None:
+            for key in room_filters(previous):
+                self.indexes[key].remove(room_id)
+            self._reseat(room_id)
+            if self.listener:
+                self.listener(room_id)
+
+    def _reseat(self, room_id: int):
+        """Move a room to its current place in quick-play order"""
+        previous = self.seat_keys.pop(room_id, None)
+        if previous is not None:
+            self.seats.remove(previous)
+        room = self.rooms.get(room_id)
+        key = seat_key(room, self.reserved.get(room_id, 0)) if room else None
+        if key is not None:
+            self.seats.add(key)
+            self.seat_keys[room_id] = key
+
+    def load(self, db: Session):
+        """(Re)build the directory from the database"""
+        self.load_rows(db.execute(
+            select(*DIRECTORY_COLUMNS).where(GameRoom.is_private == False, GameRoom.is_active == True)
+        ).all())
+
+    def load_rows(self, rows):
+        """(Re)build the directory from rows of DIRECTORY_COLUMNS"""
+        with self._lock:
+            self.rooms = {}
+            self.stamps = {}
+            self.indexes = {key: SortedList() for key in FILTERS}
+            self.seats = SortedList()
+            self.seat_keys = {}
+            self._last_updated = None
+            self._max_room_id = 0
+            for row in rows:
+                self._put(dict(zip(DIRECTORY_FIELDS, row)), row[-1])
+            self.loaded = True
+            self._refreshed_at = time.monotonic()
+
+    def refresh(self, db: Session, force: bool = False):
+        """Load on first use, then pull rooms changed since the last refresh when it is due"""
+        if not self.loaded:
+            self.load(db)
+            return
+        if not force and time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return
+        changed = GameRoom.id > self._max_room_id
+        if self._last_updated is not None:
+            changed = or_(changed, GameRoom.updated_at > self._last_updated - REFRESH_OVERLAP)
+        rows = db.execute(select(*DIRECTORY_COLUMNS).where(changed)).all()
+        with self._lock:
+            for row in rows:
+                self._put(dict(zip(DIRECTORY_FIELDS, row)), row.updated_at)
+            self._refreshed_at = time.monotonic()
+
+    def room_changed(self, room: GameRoom):
+        """Report a room created or changed in this process (after commit)"""
+        if not self.loaded:
+            return
+        with self._lock:
+            self._put({field: getattr(room, field) for field in DIRECTORY_FIELDS}, room.updated_at)
+
+    def room_deleted(self, room_id: int):
+        if not self.loaded:
+            return
+        with self._lock:
+            self._remove(room_id)
+
+    def reserve_seat(self, exclude=()) -> Optional[int]:
+        """Hold a seat in the best room with one free (skipping `exclude`); returns its id
+
+        The seat counts as taken until release_seat, which must follow
+        whether or not the join went through.
+        """
+        with self._lock:
+            for key in self.seats:
+                room_id = key[2]
+                if room_id not in exclude:
+                    self.reserved[room_id] = self.reserved.get(room_id, 0) + 1
+                    self._reseat(room_id)
+                    return room_id
+        return None
+
+    def release_seat(self, room_id: int):
+        """Give back a seat held by reserve_seat (after the join was reported with room_changed)"""
+        with self._lock:
+            reserved = self.reserved.pop(room_id, 0) - 1
+            if reserved > 0:
+                self.reserved[room_id] = reserved
+            self._reseat(room_id)
+
+    def page(self, after: int = 0, limit: int = 50, has_free_seats: bool = False,
+             not_started: bool = False) -> Tuple[List[Dict], Optional[int], str]:
+        """Rooms with an id above `after` passing the filters, the next cursor and the page's ETag"""
+        with self._lock:
+            index = self.indexes[(has_free_seats, not_started)]
+            start = index.bisect_right(after)
+            room_ids = list(index.islice(start, start + limit))
+            rooms = [self.rooms[room_id] for room_id in room_ids]
+            next_after = room_ids[-1] if len(room_ids) == limit and start + limit < len(index) else None
+            digest = hashlib.blake2b(digest_size=12)
+            for room_id in room_ids:
+                digest.update(self.stamps[room_id])
+            digest.update(b'next:%d' % (next_after or 0))
+        return rooms, next_after, f'W/"{digest.hexdigest()}"'
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+
+# Global room directory instance
+room_directory = RoomDirectory()
@@ -1,13 +1,63 @@
 import random
 import string
+import threading
+import time
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from ..models.game_room import GameRoom
 from ..models.game_session import GameSession
 from ..models.user import User
 from ..schemas.game_room import GameRoomCreate, GameRoomJoin
+from ..core.live_state import create_state_store
+from .room_directory import room_directory
 from ..config import settings
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+
+# Rooms tried by one quick-play before it opens a room of its own
+QUICK_PLAY_ATTEMPTS = 5
+
+
+class RosterCache:
+    """Short-lived per-room player lists for clients polling GET /rooms/{room_id}/players
+
+    An entry is served for at most ttl seconds, and only while the room's
+    roster version in the live state store is the one it was read at.
+    RoomService and the socket server bump that version on every join,
+    leave and ready change, so other processes drop their entries too.
+    """
+
+    def __init__(self, ttl: float, state_store):
+        self.ttl = ttl
+        self.state_store = state_store
+        self.entries: Dict[int, tuple] = {}  # room_id -> (version, expires_at, players)
+        self._lock = threading.Lock()
+
+    def version(self, room_id: int):
+        return self.state_store.roster_version(room_id)
+
+    def get(self, room_id: int, version) -> Optional[List[dict]]:
+        entry = self.entries.get(room_id)
+        if entry and entry[0] == version and time.monotonic() < entry[1]:
+            return entry[2]
+        return None
+
+    def put(self, room_id: int, version, players: List[dict]):
+        now = time.monotonic()
+        with self._lock:
+            if len(self.entries) >= 1024:
+                self.entries = {key: entry for key, entry in self.entries.items() if entry[1] > now}
+            self.entries[room_id] = (version, now + self.ttl, players)
+
+    def invalidate(self, room_id: int):
+        with self._lock:
+            self.entries.pop(room_id, None)
+        self.state_store.roster_changed(room_id)
+
+
+# Global roster cache, sharing the live state store with the socket server
+roster_cache = RosterCache(settings.ROSTER_CACHE_TTL,
+                           create_state_store(settings.LIVE_STATE_BACKEND, settings.LIVE_STATE_DIR))
 
 
 class RoomService:
@@ -40,6 +90,7 @@ class RoomService:
         db.add(db_room)
         db.commit()
         db.refresh(db_room)
+        room_directory.room_changed(db_room)
         return db_room
     
     @staticmethod
@@ -95,9 +146,89 @@ class RoomService:
         room.current_players += 1
         db.commit()
         db.refresh(db_session)
+        roster_cache.invalidate(room.id)
+        room_directory.room_changed(room)
         
         return db_session
     
+    @staticmethod
+    def quick_play(db: Session, user_id: int) -> Tuple[GameSession, GameRoom, bool]:
+        """Seat a user in the best open public room, or in a new one if none has a seat
+        
+        The room comes from the room directory's quick-play order (rooms
+        waiting to start first, then the fullest), with a seat held there
+        while joining. The join itself only goes through if the room still
+        has a seat in the database, so another process can't oversubscribe
+        it either; a room found full is corrected in the directory and the
+        next one tried. Returns the session, the room and whether it was created.
+        """
+        room_directory.refresh(db)
+        tried = set(db.execute(
+            select(GameSession.room_id).where(GameSession.user_id == user_id, GameSession.left_at.is_(None))
+        ).scalars())
+        
+        for _ in range(QUICK_PLAY_ATTEMPTS):
+            room_id = room_directory.reserve_seat(exclude=tried)
+            if room_id is None:
+                break
+            try:
+                seated = RoomService._take_seat(db, room_id, user_id)
+            finally:
+                room_directory.release_seat(room_id)
+            if seated:
+                return seated + (False,)
+            tried.add(room_id)
+        
+        room = RoomService.create_room(db, GameRoomCreate(name="Quick Play"), user_id)
+        seated = RoomService._take_seat(db, room.id, user_id)
+        if not seated:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="No room available, try again"
+            )
+        return seated + (True,)
+    
+    @staticmethod
+    def _take_seat(db: Session, room_id: int, user_id: int) -> Optional[Tuple[GameSession, GameRoom]]:
+        """Join a public room if it still has a free seat; None (and the directory corrected) if not"""
+        import secrets
+        
+        try:
+            taken = db.execute(
+                update(GameRoom)
+                .where(
+                    GameRoom.id == room_id,
+                    GameRoom.is_active == True,
+                    GameRoom.is_private == False,
+                    GameRoom.current_players < GameRoom.max_players
+                )
+                .values(current_players=GameRoom.current_players + 1)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if taken:
+                db_session = GameSession(
+                    user_id=user_id,
+                    room_id=room_id,
+                    session_token=secrets.token_urlsafe(32)
+                )
+                db.add(db_session)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        room = db.get(GameRoom, room_id)
+        if not taken:
+            if room:
+                room_directory.room_changed(room)
+            else:
+                room_directory.room_deleted(room_id)
+            return None
+        db.refresh(db_session)
+        roster_cache.invalidate(room_id)
+        room_directory.room_changed(room)
+        return db_session, room
+    
     @staticmethod
     def leave_room(db: Session, user_id: int, room_id: int):
         """Leave a game room"""
@@ -123,6 +254,9 @@ class RoomService:
             room.current_players -= 1
         
         db.commit()
+        roster_cache.invalidate(room_id)
+        if room:
+            room_directory.room_changed(room)
         return {"message": "Left room successfully"}
     
     @staticmethod
@@ -136,40 +270,40 @@ class RoomService:
         return db.query(GameRoom).filter(GameRoom.id == room_id).first()
     
     @staticmethod
-    def get_public_rooms(db: Session) -> List[GameRoom]:
-        """Get all public rooms that are not full"""
-        # First, clean up full rooms
-        RoomService.delete_full_rooms(db)
-        
-        # Return only active, public rooms that are not full
-        return db.query(GameRoom).filter(
-            GameRoom.is_private == False,
-            GameRoom.is_active == True,
-            GameRoom.current_players < GameRoom.max_players
-        ).all()
+    def get_public_rooms(db: Session, after: int = 0, limit: int = 50, has_free_seats: bool = True,
+                         not_started: bool = False):
+        """Get a page of active public rooms from the room directory
+        
+        Returns the rooms, the cursor for the next page (None on the last page) and the page's ETag.
+        """
+        room_directory.refresh(db)
+        return room_directory.page(after, limit, has_free_seats, not_started)
     
     @staticmethod
     def get_room_players(db: Session, room_id: int) -> List[dict]:
         """Get all players in a room with user information"""
-        sessions = db.query(GameSession).filter(
-            GameSession.room_id == room_id,
-            GameSession.left_at.is_(None)
-        ).all()
+        # Read the version first, so a change during the query is not cached as current
+        version = roster_cache.version(room_id)
+        players = roster_cache.get(room_id, version)
+        if players is not None:
+            return players
         
-        players = []
-        for session in sessions:
-            # Get user information
-            user = db.query(User).filter(User.id == session.user_id).first()
-            if user:
-                players.append({
-                    'id': session.id,
-                    'user_id': session.user_id,
-                    'username': user.username,
-                    'is_ready': session.is_ready,
-                    'score': session.score,
-                    'joined_at': session.joined_at
-                })
+        rows = db.execute(
+            select(
+                GameSession.id,
+                GameSession.user_id,
+                User.username,
+                GameSession.is_ready,
+                GameSession.score,
+                GameSession.joined_at
+            )
+            .join(User, User.id == GameSession.user_id)
+            .where(GameSession.room_id == room_id, GameSession.left_at.is_(None))
+            .order_by(GameSession.id)
+        ).all()
+        players = [dict(row._mapping) for row in rows]
         
+        roster_cache.put(room_id, version, players)
         return players
     
     @staticmethod
@@ -182,46 +316,5 @@ class RoomService:
                     setattr(room, key, value)
             db.commit()
             db.refresh(room)
+            room_directory.room_changed(room)
         return room
-
-    @staticmethod
-    def delete_full_rooms(db: Session):
-        """Delete rooms that are at maximum capacity"""
-        full_rooms = db.query(GameRoom).filter(
-            GameRoom.current_players >= GameRoom.max_players,
-            GameRoom.is_active == True
-        ).all()
-        
-        deleted_count = 0
-        for room in full_rooms:
-            # Mark room as inactive instead of deleting to preserve data
-            room.is_active = False
-            deleted_count += 1
-        
-        if deleted_count > 0:
-            db.commit()
-            print(f"Auto-deleted {deleted_count} full rooms")
-        
-        return deleted_count
-
-    @staticmethod
-    def cleanup_inactive_rooms(db: Session, hours_old: int = 24):
-        """Delete inactive rooms that are older than specified hours"""
-        from datetime import datetime, timedelta
-        
-        cutoff_time = datetime.utcnow() - timedelta(hours=hours_old)
-        inactive_rooms = db.query(GameRoom).filter(
-            GameRoom.is_active == False,
-            GameRoom.created_at < cutoff_time
-        ).all()
-        
-        deleted_count = 0
-        for room in inactive_rooms:
-            db.delete(room)
-            deleted_count += 1
-        
-        if deleted_count > 0:
-            db.commit()
-            print(f"Cleaned up {deleted_count} old inactive rooms")
-        
-        return deleted_count 
\ No newline at end of file
@@ -0,0 +1,226 @@
+import asyncio
+import queue
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+from ..models.player_stats import PlayerStats
+from ..models.score_bucket import ScoreBucket
+from .leaderboard_service import leaderboard_service
+
+stats_table = PlayerStats.__table__
+buckets_table = ScoreBucket.__table__
+
+# One statement for every player of a game (or of several games), run as an executemany.
+# The right-hand sides see the row's old values, so average_score uses the new totals.
+APPLY_RESULT = (
+    update(stats_table)
+    .where(stats_table.c.user_id == bindparam('p_user_id'))
+    .values(
+        games_played=stats_table.c.games_played + 1,
+        games_won=stats_table.c.games_won + bindparam('p_won'),
+        total_score=stats_table.c.total_score + bindparam('p_score'),
+        words_guessed=stats_table.c.words_guessed + bindparam('p_words_guessed'),
+        words_drawn=stats_table.c.words_drawn + bindparam('p_words_drawn'),
+        total_play_time=stats_table.c.total_play_time + bindparam('p_play_minutes'),
+        average_score=(stats_table.c.total_score + bindparam('p_score')) // (stats_table.c.games_played + 1),
+        last_played=bindparam('p_played_at')
+    )
+)
+
+# Adds one player's games of one day to that day's score bucket
+APPLY_BUCKET = (
+    update(buckets_table)
+    .where(buckets_table.c.user_id == bindparam('p_user_id'))
+    .where(buckets_table.c.day == bindparam('p_day'))
+    .values(
+        score=buckets_table.c.score + bindparam('p_score'),
+        games_played=buckets_table.c.games_played + bindparam('p_games')
+    )
+)
+
+
+class StatsService:
+    """Service for persisting end-of-game player statistics"""
+
+    @staticmethod
+    def game_results(players: List[Dict], counters: Dict[int, Dict], play_minutes: int) -> List[Dict]:
+        """Per-player results of one game: final score, win flag and the game's counters
+
+        Everyone on the top score wins, as long as it is above zero.
+        """
+        top_score = max((player['score'] for player in players), default=0)
+        return [
+            {
+                'user_id': player['id'],
+                'score': player['score'],
+                'won': top_score > 0 and player['score'] == top_score,
+                'words_guessed': counters.get(player['id'], {}).get('words_guessed', 0),
+                'words_drawn': counters.get(player['id'], {}).get('words_drawn', 0),
+                'play_minutes': play_minutes
+            }
+            for player in players
+        ]
+
+    @staticmethod
+    def apply_game_results(db: Session, results: List[Dict], played_at: datetime = None):
+        """Apply game results to PlayerStats in one transaction
+
+        Missing stats rows are created with one bulk INSERT, then every player is
+        updated by one executemany UPDATE. A player in several games of the batch
+        gets one row of parameters per game. A result's own played_at (the game's
+        end) wins over the played_at argument. Each game's score is also added to
+        the player's ScoreBucket for its UTC day. The in-memory leaderboard picks
+        the new totals up once committed.
+        """
+        if not results:
+            return
+        played_at = played_at or datetime.now(timezone.utc)
+        user_ids = {result['user_id'] for result in results}
+
+        try:
+            existing = set(db.execute(
+                select(stats_table.c.user_id).where(stats_table.c.user_id.in_(user_ids))
+            ).scalars())
+            missing = user_ids - existing
+            if missing:
+                db.execute(insert(stats_table), [
+                    {'user_id': user_id, 'games_played': 0, 'games_won': 0, 'total_score': 0,
+                     'words_guessed': 0, 'words_drawn': 0, 'average_score': 0, 'total_play_time': 0}
+                    for user_id in missing
+                ])
+
+            db.execute(APPLY_RESULT, [
+                {
+                    'p_user_id': result['user_id'],
+                    'p_won': int(result['won']),
+                    'p_score': result['score'],
+                    'p_words_guessed': result['words_guessed'],
+                    'p_words_drawn': result['words_drawn'],
+                    'p_play_minutes': result['play_minutes'],
+                    'p_played_at': result.get('played_at', played_at)
+                }
+                for result in results
+            ])
+            StatsService._apply_score_buckets(db, results, played_at)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        leaderboard_service.apply_committed(db, user_ids)
+
+    @staticmethod
+    def _apply_score_buckets(db: Session, results: List[Dict], played_at: datetime):
+        """Add results to their day buckets: one bulk INSERT of new buckets, one executemany UPDATE"""
+        totals = defaultdict(lambda: [0, 0])
+        for result in results:
+            day = result.get('played_at', played_at).astimezone(timezone.utc).date()
+            total = totals[(result['user_id'], day)]
+            total[0] += result['score']
+            total[1] += 1
+
+        # Two plain IN lists seek the (user_id, day) key, where a row-value IN reads every
+        # bucket; the few extra pairs they can match are just never looked up
+        existing = set(db.execute(
+            select(buckets_table.c.user_id, buckets_table.c.day)
+            .where(
+                buckets_table.c.user_id.in_({user_id for user_id, _ in totals}),
+                buckets_table.c.day.in_({day for _, day in totals})
+            )
+        ).all())
+        missing = [key for key in totals if key not in existing]
+        if missing:
+            db.execute(insert(buckets_table), [
+                {'user_id': user_id, 'day': day, 'score': 0, 'games_played': 0} for user_id, day in missing
+            ])
+        db.execute(APPLY_BUCKET, [
+            {'p_user_id': user_id, 'p_day': day, 'p_score': score, 'p_games': games}
+            for (user_id, day), (score, games) in totals.items()
+        ])
+
+    @staticmethod
+    def compact_score_buckets(db: Session, keep_days: int) -> int:
+        """Delete day buckets no leaderboard window reaches any more; returns how many
+
+        Their scores stay counted in PlayerStats.total_score.
+        """
+        cutoff = datetime.now(timezone.utc).date() - timedelta(days=keep_days)
+        try:
+            deleted = db.execute(delete(buckets_table).where(buckets_table.c.day < cutoff)).rowcount
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return deleted
+
+    @staticmethod
+    async def compact_score_buckets_async(keep_days: int) -> int:
+        """Like compact_score_buckets, but the delete runs in a worker thread off the event loop"""
+        db = SessionLocal()
+        try:
+            return await asyncio.to_thread(StatsService.compact_score_buckets, db, keep_days)
+        finally:
+            db.close()
+
+
+class StatsWriter:
+    """Applies finished games' stats from a background thread
+
+    submit() only queues the results, so the game thread never waits on the
+    database. Games that finish close together are written in one transaction.
+    """
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = None
+        self.games_written = 0
+        self.failed = 0
+
+    def start(self):
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._run, name="drawsync-stats", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Write what is still queued and stop"""
+        if self._thread:
+            self._queue.put(None)
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def submit(self, results: List[Dict]):
+        """Queue one game's results (from StatsService.game_results)"""
+        self._queue.put((results, datetime.now(timezone.utc)))
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            games = [game for game in batch if game is not None]
+            if games:
+                self._write(games)
+            if None in batch:
+                return
+
+    def _write(self, games: List[tuple]):
+        db = SessionLocal()
+        try:
+            # Each game keeps its own end time as last_played
+            StatsService.apply_game_results(db, [
+                {**result, 'played_at': played_at} for results, played_at in games for result in results
+            ])
+            self.games_written += len(games)
+        except Exception as e:
+            self.failed += len(games)
+            print(f"❌ Error saving player stats: {e}")
+        finally:
+            db.close()
@@ -4,6 +4,7 @@ from ..models.user import User
 from ..models.player_stats import PlayerStats
 from ..schemas.user import UserCreate, UserLogin
 from ..core.security import get_password_hash, verify_password, create_access_token
+from .leaderboard_service import leaderboard_service
 from typing import Optional
 
 
@@ -42,6 +43,7 @@ class UserService:
         player_stats = PlayerStats(user_id=db_user.id)
         db.add(player_stats)
         db.commit()
+        leaderboard_service.apply_committed(db, [db_user.id])
         
         return db_user
     
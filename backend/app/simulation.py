@@ -0,0 +1,170 @@
+import contextlib
+import json
+import os
+import random
+from typing import Dict, List, Optional
+
+from .socket_server import DrawSyncSocketServer
+from .core.scheduler import VirtualScheduler
+
+
+class FakeTransport:
+    """In-memory stand-in for a client socket
+
+    Every frame the server writes is kept (or just counted with keep_frames=False,
+    for large runs). Sends never block, so the server's outbox drains immediately.
+    """
+
+    def __init__(self, keep_frames: bool = True):
+        self.keep_frames = keep_frames
+        self.data: List[bytes] = []
+        self.bytes_sent = 0
+        self.closed = False
+
+    def setblocking(self, flag: bool):
+        pass
+
+    def send(self, data) -> int:
+        if self.closed:
+            raise OSError("Transport closed")
+        if self.keep_frames:
+            self.data.append(bytes(data))
+        self.bytes_sent += len(data)
+        return len(data)
+
+    def close(self):
+        self.closed = True
+
+    def messages(self) -> List[Dict]:
+        """Decode every frame received so far"""
+        return [json.loads(line) for line in b''.join(self.data).split(b'\n') if line]
+
+
+class SimulatedClient:
+    """A connected, authenticated player driven by the simulation"""
+
+    def __init__(self, simulation: 'GameSimulation', client_id: str, user_id: int,
+                 username: str, transport: FakeTransport):
+        self.simulation = simulation
+        self.client_id = client_id
+        self.user_id = user_id
+        self.username = username
+        self.transport = transport
+
+    def send(self, message: Dict):
+        """Deliver a message to the server as if it arrived on the socket"""
+        self.simulation.deliver(self.client_id, message)
+
+    def messages(self, message_type: Optional[str] = None) -> List[Dict]:
+        """Messages received so far, optionally of one type"""
+        messages = self.transport.messages()
+        if message_type is None:
+            return messages
+        return [message for message in messages if message.get('type') == message_type]
+
+    def join(self, room_id: int):
+        self.send({'type': 'join_room', 'room_id': room_id})
+
+    def disconnect(self):
+        with self.simulation.quiet():
+            self.simulation.server._disconnect_client(self.client_id)
+
+
+class GameSimulation:
+    """Runs the game server in-process on a virtual clock
+
+    No sockets, threads or database: clients are fake transports and round
+    timers fire from VirtualScheduler.advance(), so whole games play out in
+    milliseconds and the same seed gives the same run.
+
+        sim = GameSimulation(seed=1)
+        players = sim.create_room(1, players=4)
+        sim.start_game(1)
+        sim.advance(60)  # first round times out
+    """
+
+    def __init__(self, seed: int = 0, keep_frames: bool = True, verbose: bool = False):
+        random.seed(seed)  # Word choice
+        self.keep_frames = keep_frames
+        self.verbose = verbose
+        self.scheduler = VirtualScheduler()
+        with self.quiet():
+            self.server = DrawSyncSocketServer(scheduler=self.scheduler, use_database=False)
+        self.server.running = True
+        self.scheduler.start()
+        self.clients: Dict[str, SimulatedClient] = {}
+        self._next_user_id = 1
+
+    @contextlib.contextmanager
+    def quiet(self):
+        """Silence the server's per-event logging unless verbose"""
+        if self.verbose:
+            yield
+            return
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            yield
+
+    def connect(self, username: Optional[str] = None) -> SimulatedClient:
+        """Connect and authenticate a new player"""
+        user_id = self._next_user_id
+        self._next_user_id += 1
+        username = username or f"player{user_id}"
+
+        transport = FakeTransport(self.keep_frames)
+        with self.quiet():
+            client_id = self.server._register_client(transport, ('sim', user_id), watch=False)
+        client_info = self.server.clients[client_id]
+        client_info['user_id'] = user_id
+        client_info['username'] = username
+
+        client = SimulatedClient(self, client_id, user_id, username, transport)
+        self.clients[client_id] = client
+        return client
+
+    def deliver(self, client_id: str, message: Dict):
+        """Hand a message to the server's dispatcher"""
+        with self.quiet():
+            self.server._process_message(client_id, message)
+
+    def create_room(self, room_id: int, players: int = 2) -> List[SimulatedClient]:
+        """Connect players and seat them in a room"""
+        clients = [self.connect() for _ in range(players)]
+        for client in clients:
+            client.join(room_id)
+        return clients
+
+    def start_game(self, room_id: int):
+        """Start the game in a room on behalf of its first player"""
+        room_info = self.server.rooms[room_id]
+        client_id = next(iter(room_info['clients']))
+        self.deliver(client_id, {'type': 'start_game'})
+
+    def guess_all(self, room_id: int) -> int:
+        """Have every player except the drawer guess the current word; returns correct guesses"""
+        room_info = self.server.rooms.get(room_id)
+        if not room_info or not room_info['round_active']:
+            return 0
+
+        drawer = self.server._get_current_drawer(room_info)
+        word = room_info['current_word']
+        guessed = 0
+        for client_id in list(room_info['clients']):
+            client_info = self.server.clients[client_id]
+            if drawer and client_info['user_id'] == drawer['id']:
+                continue
+            self.deliver(client_id, {'type': 'chat_message', 'message': word})
+            guessed += 1
+        return guessed
+
+    def advance(self, seconds: float) -> int:
+        """Move virtual time forward, running due round events; returns callbacks run"""
+        with self.quiet():
+            return self.scheduler.advance(seconds)
+
+    def run_until_idle(self, max_time: float = 86400.0) -> int:
+        """Run until no timers are pending, e.g. until every game has ended"""
+        with self.quiet():
+            return self.scheduler.run_until_idle(max_time)
+
+    def now(self) -> float:
+        return self.scheduler.time()
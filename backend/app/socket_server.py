@@ -3,30 +3,77 @@ import threading
 import json
 import time
 import select
+import selectors
+import math
+import secrets
+from collections import deque
+from itertools import count, islice
 from typing import Dict, List, Set, Optional
 from .config import settings
 from .database import SessionLocal
 from .models.user import User
 from .models.game_session import GameSession
-from .core.security import verify_token
+from .core.security import verify_token, verify_internal_service_key
 from .core.words import word_manager
+from .core.scheduler import Scheduler
+from .core.metrics import MetricsRegistry, LATENCY_BUCKETS
+from .core.protocol import BARRIER, CONTROL, LaneQueue, lane_for
+from .core.capture import TrafficCapture, OPEN, MESSAGE, CLOSE
+from .core.strokes import StrokeTable
+from .core.canvas import RasterCanvas, raster_available
+from .core.archive import ArchiveWriter
+from .core.thumbnails import ThumbnailRenderer
+from .core.live_state import MemoryStateStore, create_state_store
+from .services.stats_service import StatsService, StatsWriter
+from .services.room_directory import RoomDirectory
+
+# Sent to connections turned away by the admission limit
+SERVER_FULL_MESSAGE = (json.dumps({'type': 'error', 'message': 'Server is full, try again later'}) + '\n').encode('utf-8')
 
 class DrawSyncSocketServer:
     """Raw Python socket server for DrawSync game - Fixed version"""
     
-    def __init__(self, host='localhost', port=8001):
-        self.host = host
-        self.port = port
+    def __init__(self, host=None, port=None, scheduler: Optional[Scheduler] = None, use_database: bool = True):
+        self.host = host or settings.SOCKET_HOST
+        self.port = port or settings.SOCKET_PORT
         self.server_socket = None
         self.clients: Dict[str, Dict] = {}  # client_id -> client_info
         self.rooms: Dict[int, Dict] = {}  # room_id -> room_info
         self.running = False
         self.client_lock = threading.Lock()
+        self.selector = selectors.DefaultSelector()  # Readable client sockets, data = client_id
+        self.selector_lock = threading.Lock()
         
         # Game state management
         self.active_games = {}  # room_id -> game_state
-        self.game_timers = {}   # room_id -> timer_thread
-        self.timer_stop_flags = {}  # room_id -> stop_flag
+        self.game_timers = {}   # room_id -> round deadline TimerHandle
+        self.scheduler = scheduler or Scheduler()  # Fires round deadlines and delayed game events
+        self.use_database = use_database  # False for in-process simulations (see app/simulation.py)
+        self.resume_tokens: Dict[str, tuple] = {}  # resume_token -> (room_id, user_id)
+        
+        # Metrics
+        self.metrics = MetricsRegistry()
+        self.heartbeat_pings = self.metrics.counter('heartbeat_pings_total', 'Heartbeat pings sent to idle clients')
+        self.heartbeat_reaped = self.metrics.counter('heartbeat_reaped_total', 'Clients disconnected for not answering heartbeats')
+        self.heartbeat_rtt = self.metrics.histogram('heartbeat_rtt_seconds', 'Heartbeat ping/pong round trip time', LATENCY_BUCKETS)
+        self.connections_accepted = self.metrics.counter('connections_accepted_total', 'Client connections accepted')
+        self.connections_rejected = self.metrics.counter('connections_rejected_total', 'Client connections turned away at MAX_CONNECTIONS')
+        self.bulk_dropped = self.metrics.counter('bulk_frames_dropped_total', 'Bulk frames dropped for connections that fell behind')
+        self.capture: Optional[TrafficCapture] = None  # Inbound traffic recorder when CAPTURE_FILE is set
+        self.archive: Optional[ArchiveWriter] = None  # Finished rounds' strokes (ARCHIVE_ENABLED)
+        self.thumbnails: Optional[ThumbnailRenderer] = None  # Renders finished rounds off the game loop
+        self.stats_writer: Optional[StatsWriter] = None  # Saves end-of-game player stats off the game loop
+        # Live room states for the REST API (simulations keep theirs private)
+        self.state_store = (create_state_store(settings.LIVE_STATE_BACKEND, settings.LIVE_STATE_DIR)
+                            if use_database else MemoryStateStore())
+        self._conn_ids = count(1)
+        # Lobby: public rooms from the database, pushed to subscribed clients as deltas
+        self.lobby = RoomDirectory(listener=self._lobby_room_changed)
+        self.lobby_clients: Set[str] = set()
+        self.lobby_sent: Dict[int, Dict] = {}  # room_id -> room view as last pushed to subscribers
+        self.lobby_pending: Set[int] = set()
+        self.lobby_flush_handle = None
+        self.lobby_refreshing = False
         
     def start(self):
         """Start the socket server"""
@@ -35,10 +82,30 @@ class DrawSyncSocketServer:
             self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.server_socket.bind((self.host, self.port))
-            self.server_socket.listen(5)
+            self.server_socket.listen(settings.SOCKET_BACKLOG)
             self.server_socket.setblocking(False)
             
             self.running = True
+            self.scheduler.start()
+            self.scheduler.call_later(settings.HEARTBEAT_INTERVAL, self._heartbeat_tick)
+            self.state_store.clear()  # States left behind by a previous run
+            self._state_heartbeat()
+            if settings.CAPTURE_FILE:
+                self.capture = TrafficCapture(settings.CAPTURE_FILE)
+                self.scheduler.call_later(1.0, self._flush_capture)
+                print(f"📼 Capturing inbound traffic to {settings.CAPTURE_FILE}")
+            if self.use_database:
+                self.stats_writer = StatsWriter()
+                self.stats_writer.start()
+            if settings.ARCHIVE_ENABLED and self.use_database:
+                self.archive = ArchiveWriter(settings.ARCHIVE_DIR)
+                self.archive.start()
+                if settings.THUMBNAILS_ENABLED and raster_available():
+                    self.thumbnails = ThumbnailRenderer(settings.THUMBNAIL_DIR, settings.CANVAS_WIDTH, settings.CANVAS_HEIGHT,
+                                                        settings.THUMBNAIL_SIZE, settings.THUMBNAIL_WORKERS)
+                    self.thumbnails.warm_up()
+            if settings.RASTER_CANVAS and not raster_available():
+                print("⚠️ RASTER_CANVAS is set but numpy is not installed; using vector-only canvas snapshots")
             print(f"🎮 DrawSync Socket Server started on {self.host}:{self.port}")
             
             # Start client handler thread
@@ -52,23 +119,7 @@ class DrawSyncSocketServer:
                     # Accept new connections
                     ready_to_read, _, _ = select.select([self.server_socket], [], [], 1.0)
                     if ready_to_read:
-                        client_socket, address = self.server_socket.accept()
-                        client_socket.setblocking(False)
-                        
-                        # Generate unique client ID
-                        client_id = f"{address[0]}:{address[1]}:{int(time.time())}"
-                        
-                        with self.client_lock:
-                            self.clients[client_id] = {
-                                'socket': client_socket,
-                                'address': address,
-                                'user_id': None,
-                                'room_id': None,
-                                'username': None,
-                                'buffer': b''
-                            }
-                        
-                        print(f"🔌 New client connected: {client_id} from {address}")
+                        self._accept_pending()
                         
                 except Exception as e:
                     if self.running:
@@ -79,6 +130,73 @@ class DrawSyncSocketServer:
         finally:
             self.stop()
     
+    def _accept_pending(self) -> int:
+        """Accept every connection waiting in the backlog, not just the first one"""
+        accepted = 0
+        while self.running:
+            try:
+                client_socket, address = self.server_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                break
+            
+            # Admission limit: turn the connection away right away instead of queueing it
+            if len(self.clients) >= settings.MAX_CONNECTIONS:
+                self._reject_connection(client_socket)
+                continue
+            
+            self._register_client(client_socket, address)
+            accepted += 1
+        
+        if accepted:
+            self.connections_accepted.inc(accepted)
+        return accepted
+    
+    def _register_client(self, client_socket: socket.socket, address, watch: bool = True) -> str:
+        """Track a newly accepted connection and start watching it for input
+        
+        watch=False skips the selector, for in-memory transports that are driven directly.
+        """
+        client_socket.setblocking(False)
+        
+        # Generate unique client ID
+        client_id = f"{address[0]}:{address[1]}:{int(time.time())}"
+        
+        with self.client_lock:
+            self.clients[client_id] = {
+                'socket': client_socket,
+                'address': address,
+                'user_id': None,
+                'room_id': None,
+                'username': None,
+                'buffer': b'',
+                'last_activity': self.scheduler.time(),
+                'ping_sent_at': None,
+                'outbox': LaneQueue(settings.BULK_QUEUE_LIMIT),  # Frames waiting for the socket
+                'pending': None,  # Partly written frame (memoryview)
+                'send_lock': threading.Lock(),
+                'want_write': False,
+                'conn_id': next(self._conn_ids)  # Connection number in traffic captures
+            }
+        if self.capture:
+            self.capture.record(self.clients[client_id]['conn_id'], OPEN)
+        if watch:
+            with self.selector_lock:
+                self.selector.register(client_socket, selectors.EVENT_READ, client_id)
+        
+        print(f"🔌 New client connected: {client_id} from {address}")
+        return client_id
+    
+    def _reject_connection(self, client_socket: socket.socket):
+        """Send the server-full error and close without registering the client"""
+        try:
+            client_socket.setblocking(False)
+            client_socket.send(SERVER_FULL_MESSAGE)
+        except OSError:
+            pass
+        finally:
+            client_socket.close()
+        self.connections_rejected.inc()
+    
     def stop(self):
         """Stop the socket server"""
         self.running = False
@@ -86,12 +204,8 @@ class DrawSyncSocketServer:
             self.server_socket.close()
         
         # Stop all game timers
-        for room_id in list(self.timer_stop_flags.keys()):
-            self.timer_stop_flags[room_id] = True
-        
-        # Clear timer references
+        self.scheduler.stop()
         self.game_timers.clear()
-        self.timer_stop_flags.clear()
         
         # Close all client connections
         with self.client_lock:
@@ -102,35 +216,44 @@ class DrawSyncSocketServer:
                     pass
             self.clients.clear()
         
+        with self.selector_lock:
+            self.selector.close()
+        
+        if self.capture:
+            self.capture.close()
+        
+        if self.archive:
+            self.archive.stop()
+        
+        if self.thumbnails:
+            self.thumbnails.shutdown()
+        
+        if self.stats_writer:
+            self.stats_writer.stop()
+        
+        self.state_store.clear()
+        
         print("Socket server stopped")
     
     def _handle_clients(self):
         """Handle client messages in a separate thread"""
         while self.running:
             try:
-                with self.client_lock:
-                    client_sockets = [info['socket'] for info in self.clients.values()]
-                
-                if not client_sockets:
-                    time.sleep(0.1)
-                    continue
-                
-                # Check for readable sockets
-                ready_to_read, _, _ = select.select(client_sockets, [], [], 0.1)
+                # Check for readable sockets (epoll/kqueue where available, no FD_SETSIZE limit)
+                events = self.selector.select(timeout=0.1)
                 
-                for client_socket in ready_to_read:
-                    # Find client info
-                    client_id = None
-                    for cid, info in self.clients.items():
-                        if info['socket'] == client_socket:
-                            client_id = cid
-                            break
-                    
-                    if not client_id:
+                for key, mask in events:
+                    client_id = key.data
+                    if client_id not in self.clients:
                         continue
                     
+                    # Socket has room again: keep draining its outbox
+                    if mask & selectors.EVENT_WRITE:
+                        self._flush_client(client_id)
+                    
                     # Handle client message
-                    self._handle_client_message(client_id)
+                    if mask & selectors.EVENT_READ and client_id in self.clients:
+                        self._handle_client_message(client_id)
                     
             except Exception as e:
                 if self.running:
@@ -149,6 +272,9 @@ class DrawSyncSocketServer:
                 self._disconnect_client(client_id)
                 return
             
+            # Any inbound traffic proves the connection is alive
+            client_info['last_activity'] = self.scheduler.time()
+            
             # Add to buffer
             client_info['buffer'] += data
             
@@ -157,6 +283,8 @@ class DrawSyncSocketServer:
                 message_data, client_info['buffer'] = client_info['buffer'].split(b'\n', 1)
                 
                 if message_data:
+                    if self.capture:
+                        self.capture.record(client_info['conn_id'], MESSAGE, message_data)
                     try:
                         message = json.loads(message_data.decode('utf-8'))
                         self._process_message(client_id, message)
@@ -193,31 +321,230 @@ class DrawSyncSocketServer:
             self._handle_skip_turn(client_id, message)
         elif message_type == 'clear_canvas':
             self._handle_clear_canvas(client_id, message)
+        elif message_type == 'undo_stroke':
+            self._handle_undo_stroke(client_id, message)
+        elif message_type == 'redo_stroke':
+            self._handle_redo_stroke(client_id, message)
+        elif message_type == 'sync_canvas':
+            self._handle_sync_canvas(client_id, message)
         elif message_type == 'delete_room':
             self._handle_delete_room(client_id, message)
+        elif message_type == 'time_sync':
+            self._handle_time_sync(client_id, message)
+        elif message_type == 'resync_state':
+            self._handle_resync_state(client_id, message)
+        elif message_type == 'resume':
+            self._handle_resume(client_id, message)
+        elif message_type == 'ping':
+            self._handle_ping(client_id, message)
+        elif message_type == 'pong':
+            self._handle_pong(client_id, message)
+        elif message_type == 'get_metrics':
+            self._handle_get_metrics(client_id, message)
+        elif message_type == 'service_auth':
+            self._handle_service_auth(client_id, message)
+        elif message_type == 'draw_batch':
+            self._handle_draw_batch(client_id, message)
+        elif message_type == 'subscribe_lobby':
+            self._handle_subscribe_lobby(client_id, message)
+        elif message_type == 'unsubscribe_lobby':
+            self.lobby_clients.discard(client_id)
         else:
             print(f"❌ Unknown message type: {message_type}")
     
-    def _send_message(self, client_id: str, message: dict):
+    def _send_message(self, client_id: str, message: dict, lane: int = CONTROL):
         """Send a message to a specific client"""
+        self._send_data(client_id, (json.dumps(message) + '\n').encode('utf-8'), lane)
+    
+    def _send_data(self, client_id: str, data: bytes, lane: int = CONTROL):
+        """Queue an already encoded message for a client and write as much as the socket takes"""
+        client_info = self.clients.get(client_id)
+        if not client_info:
+            return
+        
+        with client_info['send_lock']:
+            dropped = client_info['outbox'].push(data, lane)
+            sent = self._flush_outbox(client_id, client_info)
+        
+        if dropped:
+            self.bulk_dropped.inc(dropped)
+        if not sent:
+            self._disconnect_client(client_id)
+        elif dropped:
+            self._resync_canvas(client_id)
+    
+    def _resync_canvas(self, client_id: str):
+        """Resend the drawing to a client whose queued draw frames were dropped"""
+        client_info = self.clients.get(client_id)
+        room_id = client_info.get('room_id') if client_info else None
+        if room_id in self.rooms:
+            self._send_canvas_snapshot(client_id, self.rooms[room_id])
+    
+    def _flush_client(self, client_id: str):
+        """Continue writing a client's outbox once its socket is writable"""
+        client_info = self.clients.get(client_id)
+        if not client_info:
+            return
+        
+        with client_info['send_lock']:
+            sent = self._flush_outbox(client_id, client_info)
+        if not sent:
+            self._disconnect_client(client_id)
+    
+    def _flush_outbox(self, client_id: str, client_info: dict) -> bool:
+        """Write queued frames, control lane first, until the socket would block
+        
+        Called with the client's send_lock held. Returns False if the connection failed.
+        """
+        sock = client_info['socket']
         try:
-            client_info = self.clients.get(client_id)
-            if client_info:
-                data = json.dumps(message) + '\n'
-                client_info['socket'].send(data.encode('utf-8'))
-        except Exception as e:
+            while True:
+                # A partly written frame must finish before anything can jump ahead of it
+                if not client_info['pending']:
+                    frame = client_info['outbox'].pop()
+                    if frame is None:
+                        break
+                    client_info['pending'] = memoryview(frame)
+                
+                sent = sock.send(client_info['pending'])
+                client_info['pending'] = client_info['pending'][sent:]
+        except (BlockingIOError, InterruptedError):
+            self._set_write_interest(client_id, client_info, True)
+            return True
+        except OSError as e:
             print(f"❌ Error sending message to {client_id}: {e}")
-            self._disconnect_client(client_id)
+            return False
+        
+        self._set_write_interest(client_id, client_info, False)
+        return True
+    
+    def _set_write_interest(self, client_id: str, client_info: dict, want_write: bool):
+        """Watch the socket for writability only while its outbox has a backlog"""
+        if client_info['want_write'] == want_write:
+            return
+        events = selectors.EVENT_READ | selectors.EVENT_WRITE if want_write else selectors.EVENT_READ
+        with self.selector_lock:
+            try:
+                self.selector.modify(client_info['socket'], events, client_id)
+            except (KeyError, ValueError, OSError):
+                return
+        client_info['want_write'] = want_write
     
     def _broadcast_to_room(self, room_id: int, message: dict, skip_client_id: str = None):
         """Broadcast a message to all clients in a room"""
         if room_id not in self.rooms:
             return
         
+        # Number the frame on the room stream and encode it once for the whole room.
+        # Under the stream lock, every client's queue gets the room's frames in seq order
         room_info = self.rooms[room_id]
-        for client_id in room_info['clients']:
-            if client_id != skip_client_id:
-                self._send_message(client_id, message)
+        with room_info['stream_lock']:
+            room_info['stream_seq'] += 1
+            seq = room_info['stream_seq']
+            data = (json.dumps({**message, 'seq': seq}) + '\n').encode('utf-8')
+            
+            # Keep it for clients that resume after a dropped connection
+            skip_client = self.clients.get(skip_client_id) if skip_client_id else None
+            room_info['recent_frames'].append((seq, skip_client['user_id'] if skip_client else None, data))
+            
+            lane = lane_for(message.get('type'))
+            for client_id in list(room_info['clients']):
+                if client_id != skip_client_id:
+                    self._send_data(client_id, data, lane)
+                else:
+                    # The sender still accounts for the seq, so its resume position stays contiguous
+                    self._send_data(client_id, self._skipped_frame(seq), lane_for('frame_skipped'))
+    
+    @staticmethod
+    def _skipped_frame(seq: int) -> bytes:
+        """Stand-in for a room frame a client is not sent (its own action)"""
+        return (json.dumps({'type': 'frame_skipped', 'seq': seq}) + '\n').encode('utf-8')
+    
+    def _heartbeat_tick(self):
+        """Ping idle clients and reap the ones that stopped answering"""
+        if not self.running:
+            return
+        
+        now = self.scheduler.time()
+        to_ping = []
+        to_reap = []
+        with self.client_lock:
+            for client_id, client_info in self.clients.items():
+                if client_info.get('service'):
+                    continue  # The API's link only talks when it has a request
+                idle = now - client_info.get('last_activity', now)
+                if idle >= settings.HEARTBEAT_TIMEOUT:
+                    to_reap.append(client_id)
+                elif idle >= settings.HEARTBEAT_INTERVAL:
+                    ping_sent_at = client_info.get('ping_sent_at')
+                    if ping_sent_at is None or now - ping_sent_at >= settings.HEARTBEAT_INTERVAL:
+                        client_info['ping_sent_at'] = now
+                        to_ping.append(client_id)
+        
+        if to_ping:
+            ping = (json.dumps({'type': 'ping', 'server_time': now}) + '\n').encode('utf-8')
+            for client_id in to_ping:
+                self._send_data(client_id, ping)
+            self.heartbeat_pings.inc(len(to_ping))
+        
+        if to_reap:
+            for client_id in to_reap:
+                self._disconnect_client(client_id)
+            self.heartbeat_reaped.inc(len(to_reap))
+            print(f"💀 Reaped {len(to_reap)} unresponsive clients")
+        
+        self.scheduler.call_later(settings.HEARTBEAT_INTERVAL, self._heartbeat_tick)
+    
+    def _state_heartbeat(self):
+        """Tell live state readers this server is still up, every 5 seconds"""
+        if not self.running:
+            return
+        self.state_store.heartbeat()
+        self.scheduler.call_later(5.0, self._state_heartbeat)
+    
+    def _flush_capture(self):
+        """Push buffered capture records to disk once a second"""
+        if not self.running or not self.capture:
+            return
+        self.capture.flush()
+        self.scheduler.call_later(1.0, self._flush_capture)
+    
+    def _handle_ping(self, client_id: str, message: dict):
+        """Answer a client-initiated ping"""
+        self._send_message(client_id, {
+            'type': 'pong',
+            'client_time': message.get('client_time'),
+            'server_time': self.scheduler.time()
+        })
+    
+    def _handle_pong(self, client_id: str, message: dict):
+        """Record the round trip of a heartbeat ping"""
+        client_info = self.clients.get(client_id)
+        if not client_info or client_info.get('ping_sent_at') is None:
+            return
+        
+        sent_at = message.get('server_time')
+        if not isinstance(sent_at, (int, float)):
+            sent_at = client_info['ping_sent_at']
+        self.heartbeat_rtt.observe(max(0.0, self.scheduler.time() - sent_at))
+        client_info['ping_sent_at'] = None
+    
+    def _handle_get_metrics(self, client_id: str, message: dict):
+        """Send the server's metrics snapshot to a service link"""
+        client_info = self.clients.get(client_id)
+        if not client_info or not client_info.get('service'):
+            self._send_message(client_id, {
+                'type': 'error',
+                'message': 'Service authentication required'
+            })
+            return
+        
+        self._send_message(client_id, {
+            'type': 'metrics',
+            'connected_clients': len(self.clients),
+            'active_rooms': len(self.rooms),
+            'metrics': self.metrics.snapshot()
+        })
     
     def _handle_authenticate(self, client_id: str, message: dict):
         """Handle client authentication"""
@@ -257,11 +584,13 @@ class DrawSyncSocketServer:
                         self.clients[client_id]['user_id'] = user.id
                         self.clients[client_id]['username'] = user.username
                 
-                # Send authentication success
+                # Send authentication success, doubling as the first clock sync sample
                 self._send_message(client_id, {
                     'type': 'authenticated',
                     'user_id': user.id,
-                    'username': user.username
+                    'username': user.username,
+                    'client_time': message.get('client_time'),
+                    'server_time': self.scheduler.time()
                 })
                 
                 print(f"✅ Client {client_id} authenticated as {user.username}")
@@ -276,6 +605,21 @@ class DrawSyncSocketServer:
                 'message': 'Authentication failed'
             })
     
+    def _handle_time_sync(self, client_id: str, message: dict):
+        """Answer a clock sync request so the client can estimate its offset to server time"""
+        self._send_message(client_id, {
+            'type': 'time_sync',
+            'client_time': message.get('client_time'),
+            'server_time': self.scheduler.time()
+        })
+    
+    def _handle_resync_state(self, client_id: str, message: dict):
+        """Send a full state snapshot to a client that missed a state patch"""
+        client_info = self.clients.get(client_id)
+        if not client_info or not client_info.get('room_id'):
+            return
+        self._send_game_state_to_client(client_id, client_info['room_id'])
+    
     def _handle_join_room(self, client_id: str, message: dict):
         """Handle client joining a room"""
         room_id = message.get('room_id')
@@ -294,47 +638,64 @@ class DrawSyncSocketServer:
             })
             return
         
+        # Players in a room don't need lobby updates any more
+        self.lobby_clients.discard(client_id)
+        
         # Check if user is already in a room
         current_room = client_info.get('room_id')
         if current_room and current_room in self.rooms:
             # Remove from current room first
             self.rooms[current_room]['clients'].discard(client_id)
-            if not self.rooms[current_room]['clients']:
-                del self.rooms[current_room]
+            self._delete_room_if_empty(current_room)
         
         # Add client to new room
         if room_id not in self.rooms:
             # Get room info from database
-            db = SessionLocal()
-            try:
-                from .models.game_room import GameRoom
-                db_room = db.query(GameRoom).filter(GameRoom.id == room_id).first()
-                max_players = db_room.max_players if db_room else 8
-            except Exception as e:
-                print(f"Error getting room info: {e}")
-                max_players = 8
-            finally:
-                db.close()
+            max_players = 8
+            if self.use_database:
+                db = SessionLocal()
+                try:
+                    from .models.game_room import GameRoom
+                    db_room = db.query(GameRoom).filter(GameRoom.id == room_id).first()
+                    max_players = db_room.max_players if db_room else 8
+                except Exception as e:
+                    print(f"Error getting room info: {e}")
+                finally:
+                    db.close()
             
             self.rooms[room_id] = {
                 'clients': set(),
                 'players': {},
                 'game_state': None,
-                'drawing_data': [],
+                'strokes': StrokeTable(),  # Current drawing, stroke by stroke
+                'raster': self._create_raster(),  # Optional raster with keyframes (RASTER_CANVAS)
                 'current_round': 0,
+                'game_number': 0,  # Games played in this room, keys the round archive
+                'game_counters': {},  # user_id -> words guessed/drawn this game, saved at game end
+                'game_started_at': None,
                 'max_rounds': 4,
                 'current_drawer_index': 0,
                 'current_word': '',
-                'time_remaining': 60,
+                'time_remaining': settings.DRAWING_TIME_LIMIT,
+                'round_deadline': None,
+                'round_active': False,
                 'game_started': False,
                 'guessed_players': set(),
                 'round_start_time': None,
-                'max_players': max_players
+                'max_players': max_players,
+                'state_seq': 0,  # Bumped on every published state change
+                'state_snapshot': {},  # Shared state as of state_seq
+                'stream_seq': 0,  # Sequence number of the last broadcast frame
+                'stream_lock': threading.RLock(),  # Numbers and queues room frames in one step
+                'recent_frames': deque(maxlen=settings.RESUME_BUFFER_SIZE),  # (seq, skip_user_id, data)
+                'held_seats': {},  # user_id -> {'handle', 'state_seq'} while disconnected
+                'resume_tokens': {}  # user_id -> resume_token
             }
         
         # Check if room is full
         room_info = self.rooms[room_id]
-        if len(room_info['players']) >= room_info.get('max_players', 8):
+        user_id = client_info['user_id']
+        if user_id not in room_info['players'] and len(room_info['players']) >= room_info.get('max_players', 8):
             self._send_message(client_id, {
                 'type': 'error',
                 'message': 'Room is full'
@@ -344,15 +705,207 @@ class DrawSyncSocketServer:
         self.rooms[room_id]['clients'].add(client_id)
         client_info['room_id'] = room_id
         
+        # Rejoining a held seat keeps the player's score
+        held_seat = room_info['held_seats'].pop(user_id, None)
+        if held_seat:
+            held_seat['handle'].cancel()
+        
         # Add player to room players
-        self.rooms[room_id]['players'][client_info['user_id']] = {
-            'id': client_info['user_id'],
-            'username': client_info['username'],
-            'score': 0,
-            'ready': False
-        }
+        if user_id in room_info['players']:
+            room_info['players'][user_id]['connected'] = True
+        else:
+            room_info['players'][user_id] = {
+                'id': user_id,
+                'username': client_info['username'],
+                'score': 0,
+                'ready': False,
+                'connected': True
+            }
+        
+        resume_token = room_info['resume_tokens'].get(user_id)
+        if not resume_token:
+            resume_token = secrets.token_urlsafe(16)
+            room_info['resume_tokens'][user_id] = resume_token
+            self.resume_tokens[resume_token] = (room_id, user_id)
         
         # Add player to database session
+        self._open_game_session(user_id, room_id)
+        
+        # Notify other clients in the room
+        self._broadcast_to_room(room_id, {
+            'type': 'player_joined',
+            'user_id': client_info['user_id'],
+            'username': client_info['username']
+        }, skip_client_id=client_id)
+        
+        # Send room info to client, with the token and stream position needed to resume later.
+        # No room frame can be queued between the position and the snapshots taken at it
+        with room_info['stream_lock']:
+            self._send_message(client_id, {
+                'type': 'room_joined',
+                'room_id': room_id,
+                'players': list(self.rooms[room_id]['players'].values()),
+                'resume_token': resume_token,
+                'seq': room_info['stream_seq']
+            })
+            
+            self._send_room_snapshot(client_id, room_id)
+    
+    def _send_room_snapshot(self, client_id: str, room_id: int):
+        """Send the full game state and current drawing to a client"""
+        # Send a full state snapshot; later changes arrive as patches
+        room_info = self.rooms[room_id]
+        self._send_game_state_to_client(client_id, room_id)
+        if room_info['game_started']:
+            # Send the visible strokes of the current drawing in one frame
+            self._send_canvas_snapshot(client_id, room_info)
+    
+    def _send_canvas_snapshot(self, client_id: str, room_info: Dict):
+        """Send the current drawing, without undone strokes
+        
+        With a raster keyframe the snapshot is that image plus the strokes drawn after it.
+        seq is the room stream position the drawing is as of: every earlier room frame
+        is queued ahead of it or covered by it.
+        """
+        with room_info['stream_lock']:
+            raster = room_info['raster']
+            keyframe = raster.keyframe if raster else None
+            self._send_message(client_id, {
+                'type': 'canvas_snapshot',
+                'keyframe': raster.keyframe_payload() if keyframe else None,
+                'strokes': room_info['strokes'].snapshot(exclude=keyframe['stroke_ids'] if keyframe else frozenset()),
+                'seq': room_info['stream_seq']
+            }, BARRIER)
+    
+    def _create_raster(self) -> Optional[RasterCanvas]:
+        """Raster canvas for a new room, if enabled and numpy is available"""
+        if not settings.RASTER_CANVAS or not raster_available():
+            return None
+        return RasterCanvas(settings.CANVAS_WIDTH, settings.CANVAS_HEIGHT, settings.KEYFRAME_INTERVAL)
+    
+    def _rasterize_stroke(self, room_info: Dict, stroke_id: int):
+        """Draw a finished stroke into the room raster and cut a keyframe when due"""
+        raster = room_info['raster']
+        raster.draw_stroke(room_info['strokes'].strokes[stroke_id])
+        if raster.needs_keyframe():
+            raster.cut_keyframe()
+    
+    def _handle_resume(self, client_id: str, message: dict):
+        """Resume a dropped session: re-attach to the held seat and replay missed frames"""
+        client_info = self.clients.get(client_id)
+        if not client_info or not client_info.get('user_id'):
+            self._send_message(client_id, {
+                'type': 'error',
+                'message': 'Authentication required'
+            })
+            return
+        
+        entry = self.resume_tokens.get(message.get('resume_token'))
+        if not entry or entry[1] != client_info['user_id'] or entry[0] not in self.rooms:
+            self._send_message(client_id, {
+                'type': 'resume_failed',
+                'message': 'Session expired, please rejoin the room'
+            })
+            return
+        
+        room_id, user_id = entry
+        room_info = self.rooms[room_id]
+        if user_id not in room_info['players']:
+            self._send_message(client_id, {
+                'type': 'resume_failed',
+                'message': 'Seat no longer held, please rejoin the room'
+            })
+            return
+        
+        # Drop older connections of this user that the server hasn't noticed are dead yet
+        for other_id in [cid for cid in room_info['clients'] if cid != client_id]:
+            other_info = self.clients.get(other_id)
+            if other_info and other_info['user_id'] == user_id:
+                room_info['clients'].discard(other_id)
+                other_info['room_id'] = None
+                self._disconnect_client(other_id)
+        
+        held_seat = room_info['held_seats'].pop(user_id, None)
+        if held_seat:
+            held_seat['handle'].cancel()
+        
+        # Attach and replay under the stream lock, so no live frame is queued between replayed ones
+        with room_info['stream_lock']:
+            room_info['clients'].add(client_id)
+            client_info['room_id'] = room_id
+            room_info['players'][user_id]['connected'] = True
+            
+            # Replay only what was missed, if the ring buffer still covers it. Frames
+            # the player was not sent (their own actions) replay as frame_skipped
+            last_seq = message.get('last_seq')
+            frames = room_info['recent_frames']
+            oldest_seq = frames[0][0] if frames else room_info['stream_seq'] + 1
+            can_replay = isinstance(last_seq, int) and oldest_seq - 1 <= last_seq <= room_info['stream_seq']
+            missed = [(seq, skip_user_id == user_id, data) for seq, skip_user_id, data in frames
+                      if can_replay and seq > last_seq]
+            replayed = sum(1 for _, skipped, _ in missed if not skipped)
+            
+            self._send_message(client_id, {
+                'type': 'resumed',
+                'room_id': room_id,
+                'players': list(room_info['players'].values()),
+                'seq': room_info['stream_seq'],
+                'replayed': replayed if can_replay else None
+            })
+            
+            if can_replay:
+                for seq, skipped, data in missed:
+                    self._send_data(client_id, self._skipped_frame(seq) if skipped else data)
+                # Per-client state (e.g. the drawer's word) is not in the stream
+                if not held_seat or held_seat['state_seq'] != room_info['state_seq']:
+                    self._send_game_state_to_client(client_id, room_id)
+            else:
+                self._send_room_snapshot(client_id, room_id)
+        
+        self._broadcast_to_room(room_id, {
+            'type': 'player_reconnected',
+            'user_id': user_id,
+            'username': client_info['username']
+        }, skip_client_id=client_id)
+        self._end_round_if_all_guessed(room_id)
+        print(f"🔁 Client {client_id} resumed session in room {room_id} ({replayed} frames replayed)")
+    
+    def _handle_leave_room(self, client_id: str, message: dict):
+        """Handle client leaving a room"""
+        client_info = self.clients.get(client_id)
+        if not client_info:
+            return
+        
+        room_id = client_info.get('room_id')
+        if room_id and room_id in self.rooms:
+            room_info = self.rooms[room_id]
+            room_info['clients'].discard(client_id)
+            
+            # Remove player from room players
+            if client_info['user_id'] in room_info['players']:
+                del room_info['players'][client_info['user_id']]
+            self._release_resume_token(room_info, client_info['user_id'])
+            
+            # Update database session
+            self._close_game_session(client_info['user_id'], room_id)
+            
+            # Notify other clients
+            self._broadcast_to_room(room_id, {
+                'type': 'player_left',
+                'user_id': client_info['user_id'],
+                'username': client_info['username']
+            }, skip_client_id=client_id)
+            
+            # If room is empty, delete it
+            self._delete_room_if_empty(room_id)
+            
+            client_info['room_id'] = None
+    
+    def _open_game_session(self, user_id: int, room_id: int):
+        """Create the user's game session in a room unless one is already open"""
+        if not self.use_database:
+            return
+        
         db = SessionLocal()
         try:
             import uuid
@@ -360,7 +913,7 @@ class DrawSyncSocketServer:
             
             # Check if player already has a session
             existing_session = db.query(GameSession).filter(
-                GameSession.user_id == client_info['user_id'],
+                GameSession.user_id == user_id,
                 GameSession.room_id == room_id,
                 GameSession.left_at.is_(None)
             ).first()
@@ -368,7 +921,7 @@ class DrawSyncSocketServer:
             if not existing_session:
                 # Create new session
                 session = GameSession(
-                    user_id=client_info['user_id'],
+                    user_id=user_id,
                     room_id=room_id,
                     session_token=str(uuid.uuid4()),
                     is_ready=False
@@ -381,98 +934,102 @@ class DrawSyncSocketServer:
                     room.current_players += 1
                 
                 db.commit()
-                print(f"Created game session for user {client_info['user_id']} in room {room_id}")
+                self.state_store.roster_changed(room_id)
+                if room:
+                    self.lobby.room_changed(room)
+                print(f"Created game session for user {user_id} in room {room_id}")
             
         except Exception as e:
             print(f"Error creating game session: {e}")
             db.rollback()
         finally:
             db.close()
-        
-        # Notify other clients in the room
-        self._broadcast_to_room(room_id, {
-            'type': 'player_joined',
-            'user_id': client_info['user_id'],
-            'username': client_info['username']
-        }, skip_client_id=client_id)
-        
-        # Send room info to client
-        self._send_message(client_id, {
-            'type': 'room_joined',
-            'room_id': room_id,
-            'players': list(self.rooms[room_id]['players'].values())
-        })
-        
-        # Send current game state to the new player
-        room_info = self.rooms[room_id]
-        if room_info['game_started']:
-            self._send_game_state_to_client(client_id, room_id)
-            
-            # Send all existing drawing data to the new player
-            for drawing_point in room_info['drawing_data']:
-                self._send_message(client_id, {
-                    'type': 'draw_data',
-                    'data': drawing_point
-                })
     
-    def _handle_leave_room(self, client_id: str, message: dict):
-        """Handle client leaving a room"""
-        client_info = self.clients.get(client_id)
-        if not client_info:
+    def _close_game_session(self, user_id: int, room_id: int):
+        """Mark the user's open game session in a room as left"""
+        if not self.use_database:
             return
         
-        room_id = client_info.get('room_id')
-        if room_id and room_id in self.rooms:
-            room_info = self.rooms[room_id]
-            room_info['clients'].discard(client_id)
+        db = SessionLocal()
+        try:
+            from sqlalchemy.sql import func
+            from .models.game_room import GameRoom
             
-            # Remove player from room players
-            if client_info['user_id'] in room_info['players']:
-                del room_info['players'][client_info['user_id']]
+            # Mark session as left
+            session = db.query(GameSession).filter(
+                GameSession.user_id == user_id,
+                GameSession.room_id == room_id,
+                GameSession.left_at.is_(None)
+            ).first()
             
-            # Update database session
-            db = SessionLocal()
-            try:
-                from sqlalchemy.sql import func
-                from .models.game_room import GameRoom
+            if session:
+                session.left_at = func.now()
                 
-                # Mark session as left
-                session = db.query(GameSession).filter(
-                    GameSession.user_id == client_info['user_id'],
-                    GameSession.room_id == room_id,
-                    GameSession.left_at.is_(None)
-                ).first()
+                # Update room player count
+                room = db.query(GameRoom).filter(GameRoom.id == room_id).first()
+                if room and room.current_players > 0:
+                    room.current_players -= 1
                 
-                if session:
-                    session.left_at = func.now()
-                    
-                    # Update room player count
-                    room = db.query(GameRoom).filter(GameRoom.id == room_id).first()
-                    if room and room.current_players > 0:
-                        room.current_players -= 1
-                    
-                    db.commit()
-                    print(f"Marked session as left for user {client_info['user_id']} in room {room_id}")
-            
-            except Exception as e:
-                print(f"Error updating game session: {e}")
-                db.rollback()
-            finally:
-                db.close()
-            
-            # Notify other clients
+                db.commit()
+                self.state_store.roster_changed(room_id)
+                if room:
+                    self.lobby.room_changed(room)
+                print(f"Marked session as left for user {user_id} in room {room_id}")
+        
+        except Exception as e:
+            print(f"Error updating game session: {e}")
+            db.rollback()
+        finally:
+            db.close()
+    
+    def _release_resume_token(self, room_info: Dict, user_id: int):
+        """Invalidate a player's resume token for a room"""
+        token = room_info['resume_tokens'].pop(user_id, None)
+        if token:
+            self.resume_tokens.pop(token, None)
+    
+    def _expire_held_seat(self, room_id: int, user_id: int):
+        """Give up a disconnected player's seat once the grace period is over"""
+        room_info = self.rooms.get(room_id)
+        if not room_info or user_id not in room_info['held_seats']:
+            return
+        
+        del room_info['held_seats'][user_id]
+        player = room_info['players'].pop(user_id, None)
+        self._release_resume_token(room_info, user_id)
+        self._close_game_session(user_id, room_id)
+        
+        if player:
             self._broadcast_to_room(room_id, {
                 'type': 'player_left',
-                'user_id': client_info['user_id'],
-                'username': client_info['username']
-            }, skip_client_id=client_id)
-            
-            # If room is empty, delete it
-            if not room_info['clients']:
-                del self.rooms[room_id]
-                print(f"Room {room_id} deleted (no players left)")
-            
-            client_info['room_id'] = None
+                'user_id': user_id,
+                'username': player['username']
+            })
+        print(f"⌛ Seat for user {user_id} in room {room_id} expired")
+        
+        self._end_round_if_all_guessed(room_id)
+        self._delete_room_if_empty(room_id)
+    
+    def _delete_room_if_empty(self, room_id: int):
+        """Delete a room once nobody is connected and no seats are held"""
+        room_info = self.rooms.get(room_id)
+        if room_info and not room_info['clients'] and not room_info['held_seats']:
+            self._delete_room(room_id)
+            print(f"Room {room_id} deleted (no players left)")
+    
+    def _delete_room(self, room_id: int):
+        """Delete a room and everything scheduled for it"""
+        room_info = self.rooms.pop(room_id, None)
+        if not room_info:
+            return
+        
+        self._cancel_round_timer(room_id)
+        self.state_store.remove(room_id)
+        self._lobby_room_changed(room_id)
+        for held_seat in room_info['held_seats'].values():
+            held_seat['handle'].cancel()
+        for token in room_info['resume_tokens'].values():
+            self.resume_tokens.pop(token, None)
     
     def _handle_delete_room(self, client_id: str, message: dict):
         """Handle room deletion request"""
@@ -483,9 +1040,7 @@ class DrawSyncSocketServer:
         room_id = client_info['room_id']
         if room_id in self.rooms:
             # Stop game timer if running
-            if room_id in self.game_timers:
-                self.game_timers[room_id].cancel()
-                del self.game_timers[room_id]
+            self._cancel_round_timer(room_id)
             
             # Notify all clients in room
             self._broadcast_to_room(room_id, {
@@ -493,13 +1048,15 @@ class DrawSyncSocketServer:
                 'message': 'Room has been deleted'
             })
             
-            # Close all client connections in the room
+            # Close all client connections in the room (no seats are held for a deleted room)
             room_clients = list(self.rooms[room_id]['clients'])
             for client_id in room_clients:
+                if client_id in self.clients:
+                    self.clients[client_id]['room_id'] = None
                 self._disconnect_client(client_id)
             
             # Delete room
-            del self.rooms[room_id]
+            self._delete_room(room_id)
             print(f"Room {room_id} deleted by {client_info['username']}")
     
     def _handle_draw(self, client_id: str, message: dict):
@@ -515,12 +1072,8 @@ class DrawSyncSocketServer:
         if not room_info['game_started']:
             return
         
-        players_list = list(room_info['players'].values())
-        if room_info['current_drawer_index'] >= len(players_list):
-            return
-        
-        current_drawer = players_list[room_info['current_drawer_index']]
-        if current_drawer['id'] != client_info['user_id']:
+        current_drawer = self._get_current_drawer(room_info)
+        if not current_drawer or current_drawer['id'] != client_info['user_id']:
             return
         
         drawing_data = {
@@ -535,8 +1088,22 @@ class DrawSyncSocketServer:
             'timestamp': message.get('timestamp', time.time() * 1000)
         }
         
-        # Add to room drawing data
-        room_info['drawing_data'].append(drawing_data)
+        # Add to the room's stroke table; the first point of a stroke gets a new id
+        is_new_stroke = drawing_data['is_first_point']
+        stroke_id = room_info['strokes'].add_point(drawing_data)
+        if stroke_id is None:
+            return
+        drawing_data['stroke_id'] = stroke_id
+        
+        if room_info['raster'] and not drawing_data['is_drawing']:
+            self._rasterize_stroke(room_info, stroke_id)
+        
+        # Tell the drawer the id of the stroke they just started, for undo
+        if is_new_stroke:
+            self._send_message(client_id, {
+                'type': 'stroke_started',
+                'stroke_id': stroke_id
+            })
         
         # Broadcast to other players in the room
         self._broadcast_to_room(room_id, {
@@ -544,6 +1111,175 @@ class DrawSyncSocketServer:
             'data': drawing_data
         }, skip_client_id=client_id)
     
+    def _handle_subscribe_lobby(self, client_id: str, message: dict):
+        """Send the lobby snapshot, then keep the client updated with room deltas
+        
+        Needs no authentication: it is the same list as GET /rooms/.
+        """
+        if client_id not in self.clients:
+            return
+        
+        if self.use_database and not self.lobby.loaded:
+            db = SessionLocal()
+            try:
+                self.lobby.load(db)
+                self.lobby_pending.update(self.lobby.rooms)
+            except Exception as e:
+                print(f"❌ Error loading lobby: {e}")
+            finally:
+                db.close()
+        
+        # Bring the baseline up to date, so the snapshot is what later deltas apply to
+        self._flush_lobby()
+        self.lobby_clients.add(client_id)
+        self._send_message(client_id, {
+            'type': 'lobby_snapshot',
+            'rooms': sorted(self.lobby_sent.values(), key=lambda room: room['id'])
+        })
+        
+        if self.use_database and not self.lobby_refreshing:
+            self.lobby_refreshing = True
+            self.scheduler.call_later(settings.DIRECTORY_REFRESH_INTERVAL, self._refresh_lobby)
+    
+    def _refresh_lobby(self):
+        """Pull rooms changed through the REST API while anyone watches the lobby"""
+        if not self.running or not self.lobby_clients:
+            self.lobby_refreshing = False
+            return
+        
+        db = SessionLocal()
+        try:
+            self.lobby.refresh(db, force=True)
+        except Exception as e:
+            print(f"❌ Error refreshing lobby: {e}")
+        finally:
+            db.close()
+        self.scheduler.call_later(settings.DIRECTORY_REFRESH_INTERVAL, self._refresh_lobby)
+    
+    def _lobby_view(self, room_id: int) -> Optional[Dict]:
+        """A room as lobby subscribers see it, or None once it is not listed"""
+        room = self.lobby.rooms.get(room_id)
+        if room is None:
+            return None
+        room_info = self.rooms.get(room_id)
+        return {
+            'id': room_id,
+            'name': room['name'],
+            'room_code': room['room_code'],
+            'current_players': room['current_players'],
+            'max_players': room['max_players'],
+            'game_started': room_info['game_started'] if room_info else bool(room['game_started'])
+        }
+    
+    def _lobby_room_changed(self, room_id: int):
+        """Queue a room for the next lobby push; pushes are coalesced per LOBBY_FLUSH_INTERVAL"""
+        if not self.lobby.loaded:
+            return
+        self.lobby_pending.add(room_id)
+        if self.lobby_flush_handle is None:
+            self.lobby_flush_handle = self.scheduler.call_later(settings.LOBBY_FLUSH_INTERVAL, self._flush_lobby)
+    
+    def _flush_lobby(self):
+        """Push one room_added/room_updated/room_removed per changed room to lobby subscribers"""
+        if self.lobby_flush_handle is not None:
+            self.lobby_flush_handle.cancel()
+            self.lobby_flush_handle = None
+        pending, self.lobby_pending = self.lobby_pending, set()
+        
+        frames = []
+        for room_id in sorted(pending):
+            view = self._lobby_view(room_id)
+            previous = self.lobby_sent.get(room_id)
+            if view is None:
+                if previous is not None:
+                    del self.lobby_sent[room_id]
+                    frames.append({'type': 'room_removed', 'room_id': room_id})
+            elif previous is None:
+                self.lobby_sent[room_id] = view
+                frames.append({'type': 'room_added', 'room': view})
+            elif view != previous:
+                self.lobby_sent[room_id] = view
+                changes = {key: value for key, value in view.items() if previous.get(key) != value}
+                frames.append({'type': 'room_updated', 'room_id': room_id, **changes})
+        
+        if frames and self.lobby_clients:
+            data = ''.join(json.dumps(frame) + '\n' for frame in frames).encode('utf-8')
+            for client_id in list(self.lobby_clients):
+                self._send_data(client_id, data)
+    
+    def _handle_service_auth(self, client_id: str, message: dict):
+        """Mark a connection as the REST API's service link (see app/services/game_link.py)"""
+        if not verify_internal_service_key(message.get('key')):
+            self._send_message(client_id, {
+                'type': 'error',
+                'message': 'Invalid service key'
+            })
+            return
+        
+        with self.client_lock:
+            if client_id in self.clients:
+                self.clients[client_id]['service'] = True
+        self._send_message(client_id, {'type': 'service_authenticated'})
+    
+    def _handle_draw_batch(self, client_id: str, message: dict):
+        """Add whole strokes uploaded over REST on behalf of the current drawer
+        
+        The API has already validated the strokes; they go into the stroke table
+        like live points and reach the room as one draw_batch frame.
+        """
+        client_info = self.clients.get(client_id)
+        if not client_info or not client_info.get('service'):
+            return
+        
+        def reply(**result):
+            self._send_message(client_id, {'type': 'draw_batch_result', 'request_id': message.get('request_id'), **result})
+        
+        room_id = message.get('room_id')
+        user_id = message.get('user_id')
+        room_info = self.rooms.get(room_id)
+        if not room_info or not room_info['game_started']:
+            reply(error='No game running in this room', status=404)
+            return
+        
+        current_drawer = self._get_current_drawer(room_info)
+        if not current_drawer or current_drawer['id'] != user_id:
+            reply(error='Not your turn to draw', status=409)
+            return
+        
+        strokes = room_info['strokes']
+        timestamp = time.time() * 1000
+        uploaded = []
+        for stroke in message.get('strokes', []):
+            base = {
+                'user_id': user_id,
+                'username': current_drawer['username'],
+                'color': stroke['color'],
+                'brush_size': stroke['brush_size'],
+                'timestamp': timestamp
+            }
+            points = stroke['points']
+            for index, (x, y) in enumerate(points):
+                stroke_id = strokes.add_point({**base, 'x': x, 'y': y, 'is_drawing': True, 'is_first_point': index == 0})
+            x, y = points[-1]
+            strokes.add_point({**base, 'x': x, 'y': y, 'is_drawing': False, 'is_first_point': False})
+            if room_info['raster']:
+                self._rasterize_stroke(room_info, stroke_id)
+            uploaded.append({
+                'id': stroke_id,
+                'user_id': user_id,
+                'color': stroke['color'],
+                'brush_size': stroke['brush_size'],
+                'points': points,
+                'complete': True
+            })
+        
+        self._broadcast_to_room(room_id, {
+            'type': 'draw_batch',
+            'user_id': user_id,
+            'strokes': uploaded
+        })
+        reply(stroke_ids=[stroke['id'] for stroke in uploaded])
+    
     def _handle_chat_message(self, client_id: str, message: dict):
         """Handle chat message"""
         client_info = self.clients.get(client_id)
@@ -585,17 +1321,16 @@ class DrawSyncSocketServer:
         # Check if guess is correct
         if guess.lower().strip() == current_word.lower():
             room_info['guessed_players'].add(user_id)
+            self._count_for_stats(room_info, user_id, 'words_guessed')
             
             # Award points
             if user_id in room_info['players']:
                 room_info['players'][user_id]['score'] += 100
             
             # Award points to drawer
-            players_list = list(room_info['players'].values())
-            if room_info['current_drawer_index'] < len(players_list):
-                drawer = players_list[room_info['current_drawer_index']]
-                if drawer['id'] in room_info['players']:
-                    room_info['players'][drawer['id']]['score'] += 50
+            drawer = self._get_current_drawer(room_info)
+            if drawer:
+                drawer['score'] += 50
             
             # Notify all players about correct guess
             self._broadcast_to_room(room_id, {
@@ -612,33 +1347,46 @@ class DrawSyncSocketServer:
                 'players': list(room_info['players'].values())
             })
             
-            # Check if all non-drawer players have guessed correctly
-            players_list = list(room_info['players'].values())
-            if room_info['current_drawer_index'] < len(players_list):
-                drawer = players_list[room_info['current_drawer_index']]
-                non_drawer_players = [p for p in players_list if p['id'] != drawer['id']]
-                guessed_players = len(room_info['guessed_players'])
-                
-                # If all non-drawer players have guessed correctly, end the round
-                if guessed_players >= len(non_drawer_players):
-                    print(f"🎉 All players guessed correctly! Ending round {room_info['current_round']}")
-                    
-                    # Notify all players that everyone guessed correctly
-                    self._broadcast_to_room(room_id, {
-                        'type': 'all_guessed',
-                        'message': 'Everyone guessed correctly! Round ending...',
-                        'word': current_word
-                    })
-                    
-                    # End round after a short delay to show the message
-                    threading.Timer(2.0, lambda: self._end_round(room_id)).start()
-                else:
-                    print(f"🎯 {guessed_players}/{len(non_drawer_players)} players guessed correctly. Round continues...")
+            # End the round early if that was the last guess it was waiting for
+            self._end_round_if_all_guessed(room_id)
             
             return True
         
         return False
     
+    def _end_round_if_all_guessed(self, room_id: int):
+        """End the round early once every connected non-drawer player has guessed the word"""
+        room_info = self.rooms.get(room_id)
+        if not room_info or not room_info['round_active'] or room_id not in self.game_timers:
+            return  # No round running, or its end is already scheduled
+        
+        drawer = self._get_current_drawer(room_info)
+        if not drawer or not room_info['guessed_players']:
+            return
+        
+        # Held seats of disconnected players don't count until they resume
+        guessers = [player_id for player_id, player in room_info['players'].items()
+                    if player['connected'] and player_id != drawer['id']]
+        guessed_players = sum(1 for player_id in guessers if player_id in room_info['guessed_players'])
+        non_drawer_count = len(guessers)
+        
+        if not non_drawer_count or guessed_players < non_drawer_count:
+            print(f"🎯 {guessed_players}/{non_drawer_count} players guessed correctly. Round continues...")
+            return
+        
+        print(f"🎉 All players guessed correctly! Ending round {room_info['current_round']}")
+        
+        # Notify all players that everyone guessed correctly
+        self._broadcast_to_room(room_id, {
+            'type': 'all_guessed',
+            'message': 'Everyone guessed correctly! Round ending...',
+            'word': room_info['current_word']
+        })
+        
+        # End round after a short delay to show the message
+        self._cancel_round_timer(room_id)
+        self.scheduler.call_later(2.0, self._end_round, room_id)
+    
     def _handle_start_game(self, client_id: str, message: dict):
         """Handle game start request"""
         client_info = self.clients.get(client_id)
@@ -664,8 +1412,12 @@ class DrawSyncSocketServer:
         room_info['game_started'] = True
         room_info['current_round'] = 1
         room_info['current_drawer_index'] = 0
-        room_info['drawing_data'] = []
+        room_info['game_number'] = self.archive.next_game_number(room_id) if self.archive else room_info['game_number'] + 1
+        room_info['game_counters'] = {}
+        room_info['game_started_at'] = self.scheduler.time()
+        self._clear_canvas(room_info)
         room_info['guessed_players'] = set()
+        self._lobby_room_changed(room_id)
         
         # Broadcast game started
         self._broadcast_to_room(room_id, {
@@ -674,8 +1426,7 @@ class DrawSyncSocketServer:
         })
         
         # Send game state update to all clients
-        for client_id in room_info['clients']:
-            self._send_game_state_to_client(client_id, room_id)
+        self._publish_state(room_id)
         
         # Start first round
         self._start_round(room_id)
@@ -687,37 +1438,42 @@ class DrawSyncSocketServer:
             return
         
         room_info = self.rooms[room_id]
-        players_list = list(room_info['players'].values())
+        if not room_info['game_started']:
+            return
         
-        if not players_list:
+        if not room_info['players']:
             print(f"❌ Cannot start round: No players in room {room_id}")
             return
         
         # Ensure drawer index is within bounds
-        if room_info['current_drawer_index'] >= len(players_list):
+        if room_info['current_drawer_index'] >= len(room_info['players']):
             room_info['current_drawer_index'] = 0
         
         # Get current drawer
-        current_drawer = players_list[room_info['current_drawer_index']]
+        current_drawer = self._get_current_drawer(room_info)
         
         # Assign word
         word = word_manager.get_random_word()
         room_info['current_word'] = word
-        room_info['time_remaining'] = 60
-        room_info['round_start_time'] = time.time()
+        room_info['time_remaining'] = settings.DRAWING_TIME_LIMIT
+        room_info['round_start_time'] = self.scheduler.time()
+        room_info['round_deadline'] = self.scheduler.time() + settings.DRAWING_TIME_LIMIT
+        room_info['round_active'] = True
         room_info['guessed_players'] = set()
-        room_info['drawing_data'] = []
+        self._clear_canvas(room_info)
         
         print(f"🔄 Starting round {room_info['current_round']} in room {room_id}")
         print(f"👤 Current drawer: {current_drawer['username']} (ID: {current_drawer['id']})")
         print(f"📝 Word: {word}")
         
-        # Broadcast round start
+        # Broadcast round start; clients count down to the deadline locally
         self._broadcast_to_room(room_id, {
             'type': 'round_started',
             'round': room_info['current_round'],
             'drawer': current_drawer['username'],
-            'time_remaining': room_info['time_remaining']
+            'time_remaining': room_info['time_remaining'],
+            'round_deadline': room_info['round_deadline'],
+            'server_time': self.scheduler.time()
         })
         
         # Send word to drawer
@@ -737,62 +1493,61 @@ class DrawSyncSocketServer:
                 })
         
         # Send game state update to all clients
-        for client_id in room_info['clients']:
-            self._send_game_state_to_client(client_id, room_id)
+        self._publish_state(room_id)
         
         # Start timer
         self._start_round_timer(room_id)
     
     def _start_round_timer(self, room_id: int):
-        """Start a timer for the current round"""
-        # Stop existing timer if any
-        if room_id in self.timer_stop_flags:
-            self.timer_stop_flags[room_id] = True
-        
-        # Create stop flag for this timer
-        self.timer_stop_flags[room_id] = False
-        
-        def round_timer():
-            start_time = time.time()
-            duration = 60  # 60 seconds
-            print(f"🕐 Timer started for room {room_id}, duration: {duration}s")
-            
-            while time.time() - start_time < duration:
-                # Check if timer should stop
-                if self.timer_stop_flags.get(room_id, False):
-                    print(f"🛑 Timer stopped for room {room_id}")
-                    return
-                
-                if room_id not in self.rooms:
-                    print(f"🛑 Room {room_id} no longer exists, stopping timer")
-                    return
-                
-                room_info = self.rooms[room_id]
-                remaining = max(0, duration - int(time.time() - start_time))
-                room_info['time_remaining'] = remaining
-                
-                # Send time update every second
-                self._broadcast_to_room(room_id, {
-                    'type': 'time_update',
-                    'time_remaining': remaining
-                })
-                
-                # Debug output every 10 seconds
-                if remaining % 10 == 0 and remaining > 0:
-                    print(f"⏰ Room {room_id}: {remaining}s remaining")
-                
-                time.sleep(1)
-            
-            # Time's up
-            if room_id in self.rooms and not self.timer_stop_flags.get(room_id, False):
-                print(f"⏰ Time's up for room {room_id}, ending round")
-                self._end_round(room_id)
-            else:
-                print(f"🛑 Timer for room {room_id} was stopped or room doesn't exist")
+        """Schedule the current round's deadline and its periodic clock resyncs"""
+        self._cancel_round_timer(room_id)
+        
+        deadline = self.rooms[room_id]['round_deadline']
+        self.game_timers[room_id] = self.scheduler.call_at(deadline, self._on_round_deadline, room_id, deadline)
+        self._schedule_round_resync(room_id, deadline)
+        print(f"🕐 Round deadline set for room {room_id} in {settings.DRAWING_TIME_LIMIT}s")
+    
+    def _cancel_round_timer(self, room_id: int):
+        """Cancel the pending round deadline for a room"""
+        handle = self.game_timers.pop(room_id, None)
+        if handle:
+            handle.cancel()
+    
+    def _schedule_round_resync(self, room_id: int, deadline: float):
+        """Schedule the next resync frame if it falls before the deadline"""
+        next_resync = self.scheduler.time() + settings.ROUND_RESYNC_INTERVAL
+        if next_resync < deadline:
+            self.scheduler.call_at(next_resync, self._send_round_resync, room_id, deadline)
+    
+    def _send_round_resync(self, room_id: int, deadline: float):
+        """Re-broadcast the round deadline so drifting client clocks get corrected"""
+        room_info = self.rooms.get(room_id)
+        if not room_info or room_info['round_deadline'] != deadline:
+            return  # Round already ended or was replaced
+        
+        self._broadcast_to_room(room_id, {
+            'type': 'time_update',
+            'time_remaining': self._get_time_remaining(room_info),
+            'round_deadline': deadline,
+            'server_time': self.scheduler.time()
+        })
+        self._schedule_round_resync(room_id, deadline)
+    
+    def _on_round_deadline(self, room_id: int, deadline: float):
+        """End the round when its deadline is reached"""
+        room_info = self.rooms.get(room_id)
+        if not room_info or room_info['round_deadline'] != deadline:
+            return
         
-        timer_thread = threading.Thread(target=round_timer, daemon=True)
-        timer_thread.start()
-        self.game_timers[room_id] = timer_thread
+        print(f"⏰ Time's up for room {room_id}, ending round")
+        self._end_round(room_id)
+    
+    def _get_time_remaining(self, room_info: Dict) -> int:
+        """Whole seconds left in the current round"""
+        deadline = room_info.get('round_deadline')
+        if deadline is None:
+            return room_info['time_remaining']
+        return max(0, math.ceil(deadline - self.scheduler.time()))
     
     def _end_round(self, room_id: int):
         """End the current round"""
@@ -801,15 +1556,21 @@ class DrawSyncSocketServer:
             return
         
         room_info = self.rooms[room_id]
+        if not room_info['round_active']:
+            return  # Round was already ended (deadline, skip or everyone guessed)
         
         print(f"⏹️ Ending round {room_info['current_round']} in room {room_id}")
         print(f"📝 Word was: {room_info['current_word']}")
         
         # Stop timer
-        if room_id in self.timer_stop_flags:
-            self.timer_stop_flags[room_id] = True
-        if room_id in self.game_timers:
-            del self.game_timers[room_id]
+        self._cancel_round_timer(room_id)
+        room_info['round_active'] = False
+        room_info['round_deadline'] = None
+        room_info['time_remaining'] = 0
+        self._archive_round(room_id, room_info)
+        drawer = self._get_current_drawer(room_info)
+        if drawer:
+            self._count_for_stats(room_info, drawer['id'], 'words_drawn')
         
         # Broadcast round end
         self._broadcast_to_room(room_id, {
@@ -826,8 +1587,7 @@ class DrawSyncSocketServer:
         print(f"👤 Next drawer index: {room_info['current_drawer_index']}")
         
         # Send game state update to all clients
-        for client_id in room_info['clients']:
-            self._send_game_state_to_client(client_id, room_id)
+        self._publish_state(room_id)
         
         # Check if game should end
         if room_info['current_round'] > room_info['max_rounds']:
@@ -836,7 +1596,27 @@ class DrawSyncSocketServer:
         else:
             # Start next round after delay
             print(f"⏳ Starting next round in 3 seconds...")
-            threading.Timer(3.0, lambda: self._start_round(room_id)).start()
+            self.scheduler.call_later(3.0, self._start_round, room_id)
+    
+    def _count_for_stats(self, room_info: Dict, user_id: int, counter: str):
+        """Bump a per-game stats counter; they are only written to the database at game end"""
+        counters = room_info['game_counters'].setdefault(user_id, {'words_guessed': 0, 'words_drawn': 0})
+        counters[counter] += 1
+    
+    def _archive_round(self, room_id: int, room_info: Dict):
+        """Hand the finished round's drawing to the archive writer thread and the thumbnail pool"""
+        if not self.archive:
+            return
+        table = room_info['strokes']
+        strokes = [table.strokes[stroke_id] for stroke_id in table.visible]
+        drawer = self._get_current_drawer(room_info)
+        self.archive.submit(room_id, room_info['game_number'], room_info['current_round'], strokes, {
+            'word': room_info['current_word'],
+            'drawer_id': drawer['id'] if drawer else None,
+            'ended_at': time.time()
+        })
+        if self.thumbnails and strokes:
+            self.thumbnails.submit_strokes(strokes)
     
     def _end_game(self, room_id: int):
         """End the game"""
@@ -846,10 +1626,9 @@ class DrawSyncSocketServer:
         room_info = self.rooms[room_id]
         
         # Stop timer
-        if room_id in self.timer_stop_flags:
-            self.timer_stop_flags[room_id] = True
-        if room_id in self.game_timers:
-            del self.game_timers[room_id]
+        self._cancel_round_timer(room_id)
+        room_info['round_active'] = False
+        room_info['round_deadline'] = None
         
         # Calculate final scores
         final_scores = {}
@@ -863,17 +1642,23 @@ class DrawSyncSocketServer:
             'message': 'Game ended!'
         })
         
+        # Save player stats in the background (one transaction for the whole game)
+        if self.stats_writer:
+            play_minutes = int((self.scheduler.time() - (room_info['game_started_at'] or self.scheduler.time())) // 60)
+            self.stats_writer.submit(StatsService.game_results(
+                list(room_info['players'].values()), room_info['game_counters'], play_minutes))
+        
         # Reset game state
         room_info['game_started'] = False
+        self._lobby_room_changed(room_id)
         room_info['current_round'] = 0
         room_info['current_drawer_index'] = 0
         room_info['current_word'] = ''
-        room_info['drawing_data'] = []
+        self._clear_canvas(room_info)
         room_info['guessed_players'] = set()
         
         # Send final game state update to all clients
-        for client_id in room_info['clients']:
-            self._send_game_state_to_client(client_id, room_id)
+        self._publish_state(room_id)
     
     def _handle_guess_word(self, client_id: str, message: dict):
         """Handle word guess (legacy support)"""
@@ -902,23 +1687,25 @@ class DrawSyncSocketServer:
             room_info['players'][client_info['user_id']]['ready'] = is_ready
         
         # Update database session
-        db = SessionLocal()
-        try:
-            session = db.query(GameSession).filter(
-                GameSession.user_id == client_info['user_id'],
-                GameSession.room_id == room_id,
-                GameSession.left_at.is_(None)
-            ).first()
+        if self.use_database:
+            db = SessionLocal()
+            try:
+                session = db.query(GameSession).filter(
+                    GameSession.user_id == client_info['user_id'],
+                    GameSession.room_id == room_id,
+                    GameSession.left_at.is_(None)
+                ).first()
+                
+                if session:
+                    session.is_ready = is_ready
+                    db.commit()
+                    self.state_store.roster_changed(room_id)
             
-            if session:
-                session.is_ready = is_ready
-                db.commit()
-        
-        except Exception as e:
-            print(f"Error updating ready status: {e}")
-            db.rollback()
-        finally:
-            db.close()
+            except Exception as e:
+                print(f"Error updating ready status: {e}")
+                db.rollback()
+            finally:
+                db.close()
         
         # Broadcast ready status to room
         self._broadcast_to_room(room_id, {
@@ -938,12 +1725,8 @@ class DrawSyncSocketServer:
         room_info = self.rooms[room_id]
         
         # Check if it's the client's turn
-        players_list = list(room_info['players'].values())
-        if room_info['current_drawer_index'] >= len(players_list):
-            return
-        
-        current_drawer = players_list[room_info['current_drawer_index']]
-        if current_drawer['id'] != client_info['user_id']:
+        current_drawer = self._get_current_drawer(room_info)
+        if not current_drawer or current_drawer['id'] != client_info['user_id']:
             return
         
         # End current round
@@ -959,16 +1742,12 @@ class DrawSyncSocketServer:
         room_info = self.rooms[room_id]
         
         # Check if it's the client's turn
-        players_list = list(room_info['players'].values())
-        if room_info['current_drawer_index'] >= len(players_list):
-            return
-        
-        current_drawer = players_list[room_info['current_drawer_index']]
-        if current_drawer['id'] != client_info['user_id']:
+        current_drawer = self._get_current_drawer(room_info)
+        if not current_drawer or current_drawer['id'] != client_info['user_id']:
             return
         
         # Clear drawing data
-        room_info['drawing_data'] = []
+        self._clear_canvas(room_info)
         
         # Broadcast clear canvas
         self._broadcast_to_room(room_id, {
@@ -977,36 +1756,137 @@ class DrawSyncSocketServer:
             'username': client_info['username']
         })
     
-    def _send_game_state_to_client(self, client_id: str, room_id: int):
-        """Send current game state to a specific client"""
+    def _handle_undo_stroke(self, client_id: str, message: dict):
+        """Handle undo of the newest stroke"""
+        self._apply_stroke_edit(client_id, 'undo')
+    
+    def _handle_redo_stroke(self, client_id: str, message: dict):
+        """Handle redo of the last undone stroke"""
+        self._apply_stroke_edit(client_id, 'redo')
+    
+    def _apply_stroke_edit(self, client_id: str, action: str):
+        """Undo or redo a stroke for the current drawer and broadcast just its id"""
+        client_info = self.clients.get(client_id)
+        if not client_info or not client_info.get('room_id'):
+            return
+        
+        room_id = client_info['room_id']
+        room_info = self.rooms[room_id]
+        
+        # Check if it's the client's turn
+        current_drawer = self._get_current_drawer(room_info)
+        if not current_drawer or current_drawer['id'] != client_info['user_id']:
+            return
+        
+        strokes = room_info['strokes']
+        stroke_id = strokes.undo() if action == 'undo' else strokes.redo()
+        if stroke_id is None:
+            return
+        
+        raster = room_info['raster']
+        if raster:
+            if action == 'undo':
+                raster.remove_stroke(stroke_id, strokes.completed_strokes())
+            elif strokes.is_complete(stroke_id):
+                # Redone strokes go back on top, so they can simply be drawn again
+                self._rasterize_stroke(room_info, stroke_id)
+        
+        self._broadcast_to_room(room_id, {
+            'type': 'stroke_undone' if action == 'undo' else 'stroke_redone',
+            'stroke_id': stroke_id
+        })
+    
+    def _handle_sync_canvas(self, client_id: str, message: dict):
+        """Send the current drawing to a client that is missing strokes (e.g. a redo of a stroke it never saw)"""
+        client_info = self.clients.get(client_id)
+        if not client_info or not client_info.get('room_id'):
+            return
+        self._send_canvas_snapshot(client_id, self.rooms[client_info['room_id']])
+    
+    def _clear_canvas(self, room_info: Dict):
+        """Drop the current drawing (new round, game over or clear_canvas)"""
+        room_info['strokes'].clear()
+        if room_info['raster']:
+            room_info['raster'].clear()
+    
+    def _get_current_drawer(self, room_info: Dict) -> Optional[Dict]:
+        """Get the current drawer's player entry without copying the player list"""
+        index = room_info['current_drawer_index']
+        if index >= len(room_info['players']):
+            return None
+        return next(islice(room_info['players'].values(), index, None))
+    
+    def _build_shared_state(self, room_info: Dict) -> Dict:
+        """Build the part of the game state that is identical for every client"""
+        current_drawer = self._get_current_drawer(room_info)
+        return {
+            'current_round': room_info['current_round'],
+            'max_rounds': room_info['max_rounds'],
+            'game_started': room_info['game_started'],
+            'players': [dict(player) for player in room_info['players'].values()],
+            'current_drawer_id': current_drawer['id'] if current_drawer else None,
+            'round_deadline': room_info['round_deadline']
+        }
+    
+    def _refresh_state(self, room_id: int) -> Dict:
+        """Recompute the shared state, bump the sequence number and return the changed fields"""
+        room_info = self.rooms[room_id]
+        shared_state = self._build_shared_state(room_info)
+        snapshot = room_info['state_snapshot']
+        changes = {key: value for key, value in shared_state.items() if snapshot.get(key) != value}
+        if changes:
+            room_info['state_seq'] += 1
+            room_info['state_snapshot'] = shared_state
+            self.state_store.put(room_id, {
+                'room_id': room_id,
+                'state_seq': room_info['state_seq'],
+                **shared_state,
+                'time_remaining': self._get_time_remaining(room_info),
+                'server_time': self.scheduler.time(),
+                'updated_at': time.time()
+            })
+        return changes
+    
+    def _publish_state(self, room_id: int, skip_client_id: str = None):
+        """Broadcast only the state fields that changed since the last published version"""
         if room_id not in self.rooms:
             return
         
+        changes = self._refresh_state(room_id)
+        if not changes:
+            return
+        
+        room_info = self.rooms[room_id]
+        self._broadcast_to_room(room_id, {
+            'type': 'state_patch',
+            'state_seq': room_info['state_seq'],
+            'changes': changes,
+            'time_remaining': self._get_time_remaining(room_info),
+            'server_time': self.scheduler.time()
+        }, skip_client_id=skip_client_id)
+    
+    def _send_game_state_to_client(self, client_id: str, room_id: int):
+        """Send a full game state snapshot to a specific client"""
+        if room_id not in self.rooms or client_id not in self.clients:
+            return
+        
         room_info = self.rooms[room_id]
         client_info = self.clients[client_id]
         
-        # Determine if client is the current drawer
-        players_list = list(room_info['players'].values())
-        is_drawer = False
-        if room_info['current_drawer_index'] < len(players_list):
-            current_drawer = players_list[room_info['current_drawer_index']]
-            is_drawer = current_drawer['id'] == client_info['user_id']
+        # Bring everyone else up to date first so later patches apply on top of this snapshot
+        self._publish_state(room_id, skip_client_id=client_id)
         
-        # Send appropriate game state
-        current_drawer_id = None
-        if room_info['current_drawer_index'] < len(players_list):
-            current_drawer = players_list[room_info['current_drawer_index']]
-            current_drawer_id = current_drawer['id']
+        snapshot = room_info['state_snapshot']
+        is_drawer = snapshot['current_drawer_id'] is not None and snapshot['current_drawer_id'] == client_info['user_id']
+        current_word = room_info['current_word']
         
         game_state = {
             'type': 'game_state',
-            'current_round': room_info['current_round'],
-            'max_rounds': room_info['max_rounds'],
-            'time_remaining': room_info['time_remaining'],
-            'game_started': room_info['game_started'],
-            'players': list(room_info['players'].values()),
-            'current_drawer_id': current_drawer_id,
-            'word': room_info['current_word'] if is_drawer else '_' * len(room_info['current_word']) if room_info['current_word'] else '',
+            'state_seq': room_info['state_seq'],
+            **snapshot,
+            'time_remaining': self._get_time_remaining(room_info),
+            'server_time': self.scheduler.time(),
+            'word': current_word if is_drawer else '_' * len(current_word) if current_word else '',
             'is_drawer': is_drawer
         }
         
@@ -1025,29 +1905,52 @@ class DrawSyncSocketServer:
         if not client_info:
             return
         
+        if self.capture:
+            self.capture.record(client_info['conn_id'], CLOSE)
+        
+        self.lobby_clients.discard(client_id)
+        
         # Remove from room
         room_id = client_info.get('room_id')
         if room_id and room_id in self.rooms:
             room_info = self.rooms[room_id]
             room_info['clients'].discard(client_id)
+            user_id = client_info['user_id']
             
-            # Remove player from room players
-            if client_info['user_id'] in room_info['players']:
-                del room_info['players'][client_info['user_id']]
+            # Hold the seat (and score) for a while so the player can resume
+            still_connected = any(
+                self.clients.get(cid, {}).get('user_id') == user_id for cid in room_info['clients']
+            )
+            if user_id in room_info['players'] and not still_connected:
+                room_info['players'][user_id]['connected'] = False
+                room_info['held_seats'][user_id] = {
+                    'handle': self.scheduler.call_later(
+                        settings.RESUME_GRACE_PERIOD, self._expire_held_seat, room_id, user_id
+                    ),
+                    'state_seq': room_info['state_seq']
+                }
             
             # Notify other clients
             self._broadcast_to_room(room_id, {
                 'type': 'player_disconnected',
-                'user_id': client_info['user_id'],
-                'username': client_info['username']
+                'user_id': user_id,
+                'username': client_info['username'],
+                'seat_held': user_id in room_info['held_seats'],
+                'grace_period': settings.RESUME_GRACE_PERIOD
             }, skip_client_id=client_id)
             
+            # The guessers still connected may all have the word already
+            self._end_round_if_all_guessed(room_id)
+            
             # If room is empty, delete it
-            if not room_info['clients']:
-                del self.rooms[room_id]
-                print(f"Room {room_id} deleted (no players left)")
+            self._delete_room_if_empty(room_id)
         
         # Close socket
+        with self.selector_lock:
+            try:
+                self.selector.unregister(client_info['socket'])
+            except (KeyError, ValueError):
+                pass
         try:
             client_info['socket'].close()
         except:
@@ -1,32 +1,93 @@
 import asyncio
 import websockets
 import json
+import os
+import queue
+import signal
 import socket
 import threading
 import time
-from typing import Dict, Set
+import multiprocessing
+from typing import Dict, Set, Optional
+from .config import settings
+from .core.protocol import LaneQueue, lane_for
 
 class WebSocketBridge:
     """WebSocket bridge to connect browser WebSockets to Python socket server"""
     
-    def __init__(self, socket_host='localhost', socket_port=8001, ws_port=8002):
-        self.socket_host = socket_host
-        self.socket_port = socket_port
-        self.ws_port = ws_port
+    def __init__(self, socket_host=None, socket_port=None, ws_host=None, ws_port=None,
+                 reuse_port=False, worker_index=0, health_queue=None):
+        self.socket_host = socket_host or settings.SOCKET_HOST
+        self.socket_port = socket_port or settings.SOCKET_PORT
+        self.ws_host = ws_host or settings.BRIDGE_HOST
+        self.ws_port = ws_port or settings.BRIDGE_PORT
+        self.reuse_port = reuse_port  # Share the port with sibling worker processes
+        self.worker_index = worker_index
+        self.health_queue = health_queue  # multiprocessing.Queue for supervisor reports
         self.clients: Dict[str, dict] = {}  # websocket_id -> client_info
         self.socket_connections: Dict[str, socket.socket] = {}  # websocket_id -> socket
         self.running = False
         self.loop = None  # Store the main event loop
+        self.started_at = None
+        self.messages_forwarded = 0
+        self.bulk_frames_dropped = 0
+        self._stop_event = None
         
     async def start(self):
         """Start the WebSocket bridge server"""
         self.running = True
         self.loop = asyncio.get_running_loop()  # Store the main event loop
-        print(f"🌉 WebSocket Bridge starting on port {self.ws_port}")
+        self.started_at = time.time()
+        self._stop_event = asyncio.Event()
         
-        async with websockets.serve(self.handle_websocket, "localhost", self.ws_port):
-            print(f"✅ WebSocket Bridge ready on ws://localhost:{self.ws_port}")
-            await asyncio.Future()  # run forever
+        # SIGTERM/SIGINT trigger a graceful shutdown instead of killing the loop
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                self.loop.add_signal_handler(sig, self._stop_event.set)
+            except (NotImplementedError, RuntimeError, ValueError):
+                # Not supported on this platform or not in the main thread
+                pass
+        
+        print(f"🌉 WebSocket Bridge worker {self.worker_index} starting on {self.ws_host}:{self.ws_port} (pid {os.getpid()})")
+        
+        serve_kwargs = {'reuse_port': True} if self.reuse_port else {}
+        async with websockets.serve(self.handle_websocket, self.ws_host, self.ws_port, **serve_kwargs):
+            print(f"✅ WebSocket Bridge ready on ws://{self.ws_host}:{self.ws_port}")
+            health_task = None
+            if self.health_queue is not None:
+                health_task = asyncio.create_task(self._report_health())
+            
+            await self._stop_event.wait()
+            
+            print(f"🛑 WebSocket Bridge worker {self.worker_index} shutting down...")
+            if health_task:
+                health_task.cancel()
+            self.running = False
+            for client_id in list(self.clients.keys()):
+                await self._cleanup_client(client_id)
+        
+        print(f"🛑 WebSocket Bridge worker {self.worker_index} stopped")
+    
+    def health(self) -> dict:
+        """Get a health snapshot for this bridge worker"""
+        return {
+            'worker': self.worker_index,
+            'pid': os.getpid(),
+            'clients': len(self.clients),
+            'messages_forwarded': self.messages_forwarded,
+            'bulk_frames_dropped': self.bulk_frames_dropped,
+            'uptime': int(time.time() - self.started_at) if self.started_at else 0,
+            'timestamp': time.time()
+        }
+    
+    async def _report_health(self):
+        """Periodically push a health snapshot to the supervisor"""
+        while self.running:
+            try:
+                self.health_queue.put_nowait(self.health())
+            except Exception as e:
+                print(f"❌ Error reporting health from worker {self.worker_index}: {e}")
+            await asyncio.sleep(settings.BRIDGE_HEALTH_INTERVAL)
     
     async def handle_websocket(self, websocket, path):
         """Handle a new WebSocket connection"""
@@ -42,10 +103,16 @@ class WebSocketBridge:
             self.clients[client_id] = {
                 'websocket': websocket,
                 'socket': sock,
-                'buffer': b''
+                'buffer': b'',
+                'outbox': LaneQueue(settings.BULK_QUEUE_LIMIT),  # Frames waiting for the browser
+                'outbox_ready': asyncio.Event(),
+                'send_lock': asyncio.Lock()  # One write to the socket server at a time
             }
             self.socket_connections[client_id] = sock
             
+            # Single sender per WebSocket so control frames can overtake queued draw frames (not canvas barriers)
+            sender_task = asyncio.create_task(self._websocket_sender(client_id))
+            
             # Start reader thread for socket
             reader_thread = threading.Thread(
                 target=self._socket_reader,
@@ -60,6 +127,7 @@ class WebSocketBridge:
             except websockets.exceptions.ConnectionClosed:
                 print(f"🔌 WebSocket client disconnected: {client_id}")
             finally:
+                sender_task.cancel()
                 await self._cleanup_client(client_id)
                 
         except Exception as e:
@@ -75,9 +143,9 @@ class WebSocketBridge:
             # Forward to Python socket server
             client_info = self.clients.get(client_id)
             if client_info and client_info['socket']:
-                sock = client_info['socket']
                 message_bytes = (json.dumps(data) + '\n').encode('utf-8')
-                sock.send(message_bytes)
+                await self._send_to_server(client_id, message_bytes)
+                self.messages_forwarded += 1
                 print(f"📤 Forwarded message from {client_id}: {data.get('type', 'unknown')}")
                 
         except json.JSONDecodeError:
@@ -85,14 +153,32 @@ class WebSocketBridge:
         except Exception as e:
             print(f"❌ Error handling message from {client_id}: {e}")
     
+    async def _send_to_server(self, client_id: str, message_bytes: bytes):
+        """Write one framed message to the socket server (runs on the event loop)
+        
+        Every write to the socket goes through here, so messages are never
+        interleaved, and sock_sendall finishes partial writes on the
+        non-blocking socket.
+        """
+        client_info = self.clients.get(client_id)
+        if not client_info:
+            return
+        async with client_info['send_lock']:
+            await self.loop.sock_sendall(client_info['socket'], message_bytes)
+    
+    async def _send_own_message(self, client_id: str, message: dict):
+        """Send a message of the bridge's own (not from the browser) on a client's connection"""
+        try:
+            await self._send_to_server(client_id, (json.dumps(message) + '\n').encode('utf-8'))
+        except Exception as e:
+            print(f"❌ Error sending {message.get('type')} for {client_id}: {e}")
+    
     def _socket_reader(self, client_id: str, sock: socket.socket):
         """Read messages from Python socket server and forward to WebSocket"""
         client_info = self.clients.get(client_id)
         if not client_info:
             return
         
-        websocket = client_info['websocket']
-        
         while self.running and client_id in self.clients:
             try:
                 # Use select to check if socket has data
@@ -115,11 +201,27 @@ class WebSocketBridge:
                         if message_data:
                             try:
                                 message = json.loads(message_data.decode('utf-8'))
-                                # Forward to WebSocket using the stored event loop
+                                
+                                # Answer server heartbeats here; the browser side has its own WebSocket keepalive.
+                                # The pong is written by the event loop, like every other message upstream
+                                if message.get('type') == 'ping':
+                                    if self.loop and not self.loop.is_closed():
+                                        asyncio.run_coroutine_threadsafe(
+                                            self._send_own_message(client_id, {
+                                                'type': 'pong',
+                                                'server_time': message.get('server_time')
+                                            }),
+                                            self.loop
+                                        )
+                                    continue
+                                
+                                # Queue for the WebSocket sender on the stored event loop
                                 if self.loop and not self.loop.is_closed():
-                                    asyncio.run_coroutine_threadsafe(
-                                        websocket.send(json.dumps(message)),
-                                        self.loop
+                                    self.loop.call_soon_threadsafe(
+                                        self._queue_for_websocket,
+                                        client_id,
+                                        message_data.decode('utf-8'),
+                                        lane_for(message.get('type'))
                                     )
                                     print(f"📥 Forwarded message to {client_id}: {message.get('type', 'unknown')}")
                             except json.JSONDecodeError:
@@ -135,6 +237,42 @@ class WebSocketBridge:
         # Cleanup - use synchronous cleanup since we're in a thread
         self._cleanup_client_sync(client_id)
     
+    def _queue_for_websocket(self, client_id: str, frame: str, lane: int):
+        """Queue a frame for a browser client (runs on the event loop)"""
+        client_info = self.clients.get(client_id)
+        if not client_info:
+            return
+        
+        dropped = client_info['outbox'].push(frame, lane)
+        if dropped:
+            # The browser missed draw frames: have the server resend the whole drawing
+            self.bulk_frames_dropped += dropped
+            self.loop.create_task(self._send_own_message(client_id, {'type': 'sync_canvas'}))
+        client_info['outbox_ready'].set()
+    
+    async def _websocket_sender(self, client_id: str):
+        """Send queued frames to a browser client, control lane first (see LaneQueue)"""
+        client_info = self.clients.get(client_id)
+        if not client_info:
+            return
+        
+        websocket = client_info['websocket']
+        outbox = client_info['outbox']
+        outbox_ready = client_info['outbox_ready']
+        try:
+            while self.running and client_id in self.clients:
+                frame = outbox.pop()
+                if frame is None:
+                    outbox_ready.clear()
+                    await outbox_ready.wait()
+                    continue
+                # Waits while the connection is congested; meanwhile new frames queue by lane
+                await websocket.send(frame)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except Exception as e:
+            print(f"❌ Error sending to WebSocket {client_id}: {e}")
+    
     def _cleanup_client_sync(self, client_id: str):
         """Synchronous cleanup for use in background threads"""
         if client_id in self.clients:
@@ -197,8 +335,114 @@ class WebSocketBridge:
     def stop(self):
         """Stop the WebSocket bridge"""
         self.running = False
+        if self._stop_event and self.loop and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._stop_event.set)
         print("🛑 WebSocket Bridge stopped")
 
+
+def _run_bridge_worker(worker_index: int, health_queue):
+    """Entry point for a forked bridge worker process"""
+    bridge = WebSocketBridge(
+        reuse_port=True,
+        worker_index=worker_index,
+        health_queue=health_queue
+    )
+    try:
+        asyncio.run(bridge.start())
+    except KeyboardInterrupt:
+        pass
+
+
+class BridgeSupervisor:
+    """Runs N bridge workers sharing the bridge port via SO_REUSEPORT"""
+    
+    def __init__(self, workers: int):
+        self.workers = workers
+        # Spawn rather than fork: the parent may already be running socket server threads
+        self.context = multiprocessing.get_context("spawn")
+        self.health_queue = self.context.Queue()
+        self.processes: Dict[int, multiprocessing.Process] = {}  # worker_index -> process
+        self.health: Dict[int, dict] = {}  # worker_index -> last health report
+        self.running = False
+    
+    def _spawn(self, worker_index: int):
+        """Start (or restart) a single worker process"""
+        process = self.context.Process(
+            target=_run_bridge_worker,
+            args=(worker_index, self.health_queue),
+            name=f"drawsync-bridge-{worker_index}",
+            daemon=True
+        )
+        process.start()
+        self.processes[worker_index] = process
+        print(f"🌉 Bridge worker {worker_index} started (pid {process.pid})")
+    
+    def run(self):
+        """Start all workers and supervise them until stopped"""
+        self.running = True
+        previous_handlers = {}
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            previous_handlers[sig] = signal.signal(sig, lambda signum, frame: self.stop())
+        
+        for worker_index in range(self.workers):
+            self._spawn(worker_index)
+        
+        last_summary = time.time()
+        try:
+            while self.running:
+                try:
+                    report = self.health_queue.get(timeout=1.0)
+                    self.health[report['worker']] = report
+                except queue.Empty:
+                    pass
+                
+                # Restart workers that died unexpectedly
+                for worker_index, process in list(self.processes.items()):
+                    if self.running and not process.is_alive():
+                        print(f"❌ Bridge worker {worker_index} exited with code {process.exitcode}, restarting")
+                        self.health.pop(worker_index, None)
+                        self._spawn(worker_index)
+                
+                if time.time() - last_summary >= settings.BRIDGE_HEALTH_INTERVAL:
+                    self._print_health()
+                    last_summary = time.time()
+        finally:
+            self._shutdown_workers()
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+    
+    def _print_health(self):
+        """Print a one-line health summary per worker"""
+        stale_after = settings.BRIDGE_HEALTH_INTERVAL * 3
+        for worker_index in sorted(self.processes):
+            report = self.health.get(worker_index)
+            if not report or time.time() - report['timestamp'] > stale_after:
+                print(f"⚠️ Bridge worker {worker_index}: no recent health report")
+            else:
+                print(f"💓 Bridge worker {worker_index} (pid {report['pid']}): "
+                      f"{report['clients']} clients, {report['messages_forwarded']} messages, "
+                      f"up {report['uptime']}s")
+    
+    def _shutdown_workers(self, timeout: float = 10.0):
+        """Ask every worker to stop gracefully, killing any that don't"""
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()  # SIGTERM -> graceful shutdown in the worker
+        
+        deadline = time.time() + timeout
+        for worker_index, process in self.processes.items():
+            process.join(max(0, deadline - time.time()))
+            if process.is_alive():
+                print(f"⚠️ Bridge worker {worker_index} did not stop in time, killing")
+                process.kill()
+                process.join()
+        print("🛑 All bridge workers stopped")
+    
+    def stop(self):
+        """Stop supervising and shut down the workers"""
+        self.running = False
+
+
 # Global bridge instance
 websocket_bridge = WebSocketBridge()
 
@@ -206,5 +450,23 @@ async def start_websocket_bridge():
     """Start the WebSocket bridge"""
     await websocket_bridge.start()
 
+def start_websocket_bridge_workers(workers: Optional[int] = None):
+    """Start the WebSocket bridge, forking workers when more than one is configured"""
+    workers = workers or settings.BRIDGE_WORKERS
+    if workers > 1 and not hasattr(socket, 'SO_REUSEPORT'):
+        print("⚠️ SO_REUSEPORT is not available on this platform, running a single bridge worker")
+        workers = 1
+    
+    if workers <= 1:
+        asyncio.run(start_websocket_bridge())
+    else:
+        BridgeSupervisor(workers).run()
+
 if __name__ == "__main__":
-    asyncio.run(start_websocket_bridge()) 
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="DrawSync WebSocket bridge")
+    parser.add_argument("--workers", type=int, default=settings.BRIDGE_WORKERS,
+                        help="number of bridge worker processes sharing the port")
+    args = parser.parse_args()
+    start_websocket_bridge_workers(args.workers)
\ No newline at end of file
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Leaderboard benchmark
+
+Builds the in-memory leaderboard for a seeded population of players with a
+week of daily score buckets, then reports build time, memory, top-K, a page
+at a random offset and rank lookups per window, the cost of applying one
+finished game, and the cost of a day rollover. No database is used.
+
+    python benchmarks/leaderboard.py --users 1000000 --daily-active 0.1
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.leaderboard_service import WINDOW_DAYS, WINDOWS, LeaderboardService, utc_today
+
+StatsRow = namedtuple('StatsRow', 'id user_id username total_score games_played average_score last_played')
+BucketRow = namedtuple('BucketRow', 'user_id day score games_played')
+
+
+def per_call_us(function, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return round((time.perf_counter() - started) / calls * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the in-memory leaderboard")
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--daily-active', type=float, default=0.1, help="Share of players with a bucket on each day")
+    parser.add_argument('--calls', type=int, default=20000, help="Lookups timed per operation")
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    today = utc_today()
+    days = [today - timedelta(days=offset) for offset in range(max(WINDOW_DAYS.values()))]
+    stats_rows = [
+        StatsRow(user_id, user_id, f"player{user_id}", rng.randrange(200000), 1, 0, None)
+        for user_id in range(1, args.users + 1)
+    ]
+    bucket_rows = [
+        BucketRow(user_id, day, rng.randrange(3000), rng.randrange(1, 6))
+        for day in days
+        for user_id in rng.sample(range(1, args.users + 1), int(args.users * args.daily_active))
+    ]
+
+    leaderboard = LeaderboardService()
+    started = time.perf_counter()
+    leaderboard.load_rows(stats_rows, bucket_rows, today)
+    build_seconds = time.perf_counter() - started
+    del stats_rows, bucket_rows
+
+    results = {
+        'users': args.users,
+        'bucket_rows': sum(len(bucket) for bucket in leaderboard.buckets.values()),
+        'build_seconds': round(build_seconds, 2),
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+    }
+    for window in WINDOWS:
+        ranked = leaderboard.all_time if window == 'all' else leaderboard.windows[window].ranked
+        players = list(ranked.scores)
+        results[window] = {
+            'ranked_players': len(ranked),
+            'top10_us': per_call_us(lambda: leaderboard.top(10, window), args.calls),
+            'page_us': per_call_us(lambda: leaderboard.page(rng.randrange(len(ranked)), args.page_size, window), args.calls // 10),
+            'rank_us': per_call_us(lambda: leaderboard.rank(rng.choice(players), window), args.calls)
+        }
+
+    def finish_game():
+        players = rng.sample(range(1, args.users + 1), 8)
+        stats = [StatsRow(user_id, user_id, f"player{user_id}", *leaderboard.entries[user_id][1:3], 0, None)
+                 for user_id in players]
+        stats = [row._replace(total_score=row.total_score + 500, games_played=row.games_played + 1) for row in stats]
+        buckets = [BucketRow(user_id, today, 500, 1) for user_id in players]
+        leaderboard.apply_rows(stats, buckets)
+
+    results['apply_game_us'] = per_call_us(finish_game, args.calls // 10)
+
+    started = time.perf_counter()
+    leaderboard.roll(today + timedelta(days=1))
+    results['day_rollover_ms'] = round((time.perf_counter() - started) * 1e3, 1)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
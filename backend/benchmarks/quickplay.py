@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Quick-play matchmaking benchmark
+
+Fills the room directory with a seeded set of public rooms, then runs
+quick-play requests from several threads against it: hold a seat with
+reserve_seat, take it in a stand-in for the database (a conditional
+increment, like the UPDATE in RoomService._take_seat), report the room and
+release the seat. A request that finds no seat opens a new room. Reports
+requests per second, per-request latency, rooms created and any room that
+ended up over capacity. No database is used, so this is the matching cost
+only; the real endpoint adds one commit per join.
+
+    python benchmarks/quickplay.py --rooms 50000 --requests 200000 --threads 8
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.room_directory import DIRECTORY_FIELDS, RoomDirectory
+
+
+def room_row(room_id: int, max_players: int, current_players: int, game_started: bool) -> tuple:
+    room = {field: None for field in DIRECTORY_FIELDS}
+    room.update(id=room_id, room_code=f"R{room_id:05d}", name=f"room {room_id}", is_private=False,
+                max_players=max_players, current_players=current_players, is_active=True,
+                created_by=1, round_number=0, max_rounds=5, time_limit=60, game_started=game_started)
+    return tuple(room[field] for field in DIRECTORY_FIELDS) + (None,)
+
+
+def percentile(samples, share: float) -> float:
+    return round(samples[min(len(samples) - 1, int(len(samples) * share))] * 1e6, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quick-play matchmaking on the room directory")
+    parser.add_argument('--rooms', type=int, default=50_000)
+    parser.add_argument('--requests', type=int, default=200_000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--started', type=float, default=0.5, help="Share of rooms with a game in progress")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = []
+    for room_id in range(1, args.rooms + 1):
+        max_players = rng.choice((4, 6, 8, 10, 12))
+        rows.append(room_row(room_id, max_players, rng.randrange(max_players + 1), rng.random() < args.started))
+
+    directory = RoomDirectory()
+    started = time.perf_counter()
+    directory.load_rows(rows)
+    build_seconds = time.perf_counter() - started
+
+    # Stand-in for game_rooms: seats taken per room, changed only by a conditional increment
+    seated = {row[DIRECTORY_FIELDS.index('id')]: dict(zip(DIRECTORY_FIELDS, row)) for row in rows}
+    database_lock = threading.Lock()
+    next_room_id = [args.rooms]
+    rejected = [0]
+    created = [0]
+
+    def take_seat(room_id: int) -> bool:
+        with database_lock:
+            room = dict(seated[room_id])
+            taken = room['current_players'] < room['max_players']
+            if taken:
+                room['current_players'] += 1
+                seated[room_id] = room
+            else:
+                rejected[0] += 1
+        # Joined or found full, the directory gets the room as it is now
+        directory.room_changed(SimpleNamespace(updated_at=None, **room))
+        return taken
+
+    def open_room():
+        with database_lock:
+            next_room_id[0] += 1
+            created[0] += 1
+            room = dict(zip(DIRECTORY_FIELDS, room_row(next_room_id[0], 8, 1, False)))
+            seated[room['id']] = room
+        directory.room_changed(SimpleNamespace(updated_at=None, **room))
+
+    def quick_play():
+        room_id = directory.reserve_seat()
+        if room_id is None:
+            open_room()
+            return
+        try:
+            take_seat(room_id)
+        finally:
+            directory.release_seat(room_id)
+
+    latencies = [[] for _ in range(args.threads)]
+    barrier = threading.Barrier(args.threads + 1)
+
+    def worker(samples):
+        barrier.wait()
+        for _ in range(args.requests // args.threads):
+            request_started = time.perf_counter()
+            quick_play()
+            samples.append(time.perf_counter() - request_started)
+
+    threads = [threading.Thread(target=worker, args=(samples,)) for samples in latencies]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    samples = sorted(sample for thread_samples in latencies for sample in thread_samples)
+    over_capacity = sum(1 for room in seated.values() if room['current_players'] > room['max_players'])
+    print(json.dumps({
+        'rooms': args.rooms,
+        'threads': args.threads,
+        'build_seconds': round(build_seconds, 2),
+        'requests': len(samples),
+        'requests_per_second': round(len(samples) / elapsed),
+        'p50_us': percentile(samples, 0.5),
+        'p99_us': percentile(samples, 0.99),
+        'rooms_created': created[0],
+        'joins_rejected': rejected[0],
+        'rooms_over_capacity': over_capacity,
+        'reservations_left': len(directory.reserved)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
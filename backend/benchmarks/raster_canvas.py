@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Raster canvas benchmark
+
+Draws seeded random strokes into a RasterCanvas and reports rasterize cost
+per point, keyframe encode cost and size, memory per room, and late-join
+snapshot size with and without keyframes. Needs numpy.
+
+    python benchmarks/raster_canvas.py --strokes 500 --points 40 --brush 4
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.config import settings
+from app.core.canvas import RasterCanvas, raster_available
+from app.core.strokes import StrokeTable
+
+
+def random_stroke(rng: random.Random, user_id: int, points: int, brush: int, width: int, height: int):
+    """Draw points for one wandering stroke, ending with the pen-up point"""
+    x, y = rng.uniform(0, width), rng.uniform(0, height)
+    color = '#%06x' % rng.randrange(0x1000000)
+    stroke = []
+    for index in range(points):
+        x = min(width - 1, max(0, x + rng.uniform(-8, 8)))
+        y = min(height - 1, max(0, y + rng.uniform(-8, 8)))
+        stroke.append({'user_id': user_id, 'x': x, 'y': y, 'is_drawing': True,
+                       'is_first_point': index == 0, 'color': color, 'brush_size': brush})
+    stroke.append({**stroke[-1], 'is_drawing': False, 'is_first_point': False})
+    return stroke
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the server-side raster canvas")
+    parser.add_argument('--strokes', type=int, default=500)
+    parser.add_argument('--points', type=int, default=40, help="Points per stroke")
+    parser.add_argument('--brush', type=int, default=4, help="Brush size in pixels")
+    parser.add_argument('--keyframe-interval', type=int, default=settings.KEYFRAME_INTERVAL)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if not raster_available():
+        sys.exit("numpy is not installed")
+
+    rng = random.Random(args.seed)
+    width, height = settings.CANVAS_WIDTH, settings.CANVAS_HEIGHT
+    strokes = StrokeTable()
+    raster = RasterCanvas(width, height, args.keyframe_interval)
+
+    rasterize_seconds = 0.0
+    keyframe_seconds = 0.0
+    keyframes = 0
+    for _ in range(args.strokes):
+        for point in random_stroke(rng, 1, args.points, args.brush, width, height):
+            stroke_id = strokes.add_point(point)
+        started = time.perf_counter()
+        raster.draw_stroke(strokes.strokes[stroke_id])
+        rasterize_seconds += time.perf_counter() - started
+        if raster.needs_keyframe():
+            started = time.perf_counter()
+            raster.cut_keyframe()
+            keyframe_seconds += time.perf_counter() - started
+            keyframes += 1
+
+    keyframe = raster.keyframe
+    vector_snapshot = json.dumps({'type': 'canvas_snapshot', 'keyframe': None, 'strokes': strokes.snapshot()})
+    keyframe_snapshot = json.dumps({
+        'type': 'canvas_snapshot',
+        'keyframe': raster.keyframe_payload(),
+        'strokes': strokes.snapshot(exclude=keyframe['stroke_ids'] if keyframe else frozenset())
+    })
+
+    started = time.perf_counter()
+    thumbnail = raster.thumbnail()
+    thumbnail_seconds = time.perf_counter() - started
+
+    total_points = args.strokes * args.points
+    print(json.dumps({
+        'canvas': f"{width}x{height}",
+        'strokes': args.strokes,
+        'points': total_points,
+        'brush_size': args.brush,
+        'rasterize_us_per_point': round(rasterize_seconds / total_points * 1e6, 2),
+        'keyframes': keyframes,
+        'keyframe_encode_ms': round(keyframe_seconds / keyframes * 1000, 2) if keyframes else None,
+        'keyframe_png_bytes': len(keyframe['png']) if keyframe else None,
+        'memory_per_room_bytes': raster.memory_bytes(),
+        'snapshot_bytes_vector_only': len(vector_snapshot),
+        'snapshot_bytes_with_keyframe': len(keyframe_snapshot),
+        'thumbnail_ms': round(thumbnail_seconds * 1000, 2),
+        'thumbnail_png_bytes': len(thumbnail)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
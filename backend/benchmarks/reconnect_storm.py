@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Reconnect storm benchmark for the socket server
+
+Opens N client connections at once (as after a server restart or network blip),
+sends a time_sync on each and reports how long it takes until every client got
+its first reply. Starts an in-process server unless --target is given.
+
+    python benchmarks/reconnect_storm.py --clients 2000
+    python benchmarks/reconnect_storm.py --clients 2000 --backlog 5
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import resource
+import selectors
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.config import settings
+from app.socket_server import DrawSyncSocketServer
+
+
+def raise_fd_limit(needed: int):
+    """Raise the soft open-file limit so both ends of every connection fit"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, backlog: int) -> DrawSyncSocketServer:
+    settings.SOCKET_BACKLOG = backlog
+    settings.MAX_CONNECTIONS = max(settings.MAX_CONNECTIONS, 100000)
+    server = DrawSyncSocketServer(host='127.0.0.1', port=port)
+    threading.Thread(target=server.start, daemon=True).start()
+    while not server.running:
+        time.sleep(0.01)
+    return server
+
+
+def run_storm(host: str, port: int, clients: int, timeout: float) -> dict:
+    """Connect every client at once and wait for each one's first reply"""
+    selector = selectors.DefaultSelector()
+    started_at = {}
+    latencies = []
+    failures = 0
+    request = (json.dumps({'type': 'time_sync', 'client_time': 0}) + '\n').encode('utf-8')
+
+    storm_start = time.perf_counter()
+    for _ in range(clients):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        sock.connect_ex((host, port))
+        started_at[sock] = time.perf_counter()
+        selector.register(sock, selectors.EVENT_WRITE, b'')
+
+    deadline = time.perf_counter() + timeout
+    while started_at and time.perf_counter() < deadline:
+        for key, events in selector.select(timeout=0.1):
+            sock = key.fileobj
+            try:
+                if events & selectors.EVENT_WRITE:
+                    sock.send(request)
+                    selector.modify(sock, selectors.EVENT_READ, b'')
+                    continue
+                data = sock.recv(4096)
+            except (BlockingIOError, InterruptedError):
+                continue
+            except OSError:
+                data = b''
+
+            if not data:
+                failures += 1
+            elif b'\n' not in key.data + data:
+                selector.modify(sock, selectors.EVENT_READ, key.data + data)
+                continue
+            else:
+                latencies.append(time.perf_counter() - started_at[sock])
+
+            selector.unregister(sock)
+            del started_at[sock]
+            sock.close()
+
+    elapsed = time.perf_counter() - storm_start
+    for sock in started_at:
+        sock.close()
+    selector.close()
+
+    latencies.sort()
+
+    def percentile(q: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+
+    return {
+        'clients': clients,
+        'connected': len(latencies),
+        'failed': failures,
+        'timed_out': len(started_at),
+        'total_seconds': round(elapsed, 3),
+        'p50_ms': round(percentile(0.5), 2),
+        'p99_ms': round(percentile(0.99), 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time a reconnect storm against the socket server")
+    parser.add_argument('--clients', type=int, default=2000, help="Number of simultaneous clients")
+    parser.add_argument('--backlog', type=int, default=settings.SOCKET_BACKLOG, help="listen() backlog for the in-process server")
+    parser.add_argument('--target', help="host:port of a running server (skips the in-process one)")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Seconds to wait for every reply")
+    args = parser.parse_args()
+
+    raise_fd_limit(args.clients * 2 + 256)
+
+    server = None
+    # The in-process server logs every connection; keep that out of the report
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if args.target:
+            host, port = args.target.rsplit(':', 1)
+            port = int(port)
+        else:
+            host, port = '127.0.0.1', free_port()
+            server = start_server(port, args.backlog)
+
+        result = run_storm(host, port, args.clients, args.timeout)
+
+        if server:
+            result['backlog'] = args.backlog
+            result['accepted'] = server.connections_accepted.value
+            result['rejected'] = server.connections_rejected.value
+            server.stop()
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Replay captured client traffic against a socket server or WebSocket bridge
+
+Record real traffic by starting the socket server with CAPTURE_FILE set, then
+replay it, one connection per captured connection with the same message timing:
+
+    python benchmarks/replay_capture.py traffic.cap --target tcp://localhost:8001
+    python benchmarks/replay_capture.py traffic.cap --target ws://localhost:8002 --speed 10
+    python benchmarks/replay_capture.py traffic.cap --speed max --refresh-tokens
+
+Every replayed connection also sends a ping each --probe-interval seconds, and
+the pong round trip is reported as latency. Captured JWTs expire; with
+--refresh-tokens they are re-issued for the same user with this checkout's
+SECRET_KEY (the target must share its database and SECRET_KEY).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import websockets
+from websockets.exceptions import ConnectionClosed
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.capture import read_capture, SESSION, OPEN, MESSAGE, CLOSE
+
+
+def load_connections(path: str) -> Tuple[Dict[Tuple[int, int], List[Tuple[float, int, bytes]]], float, int]:
+    """Group captured records per connection with times in seconds from capture start
+
+    Consecutive server runs in one file are laid end to end.
+    """
+    connections = defaultdict(list)
+    session = -1
+    offset = 0
+    last = None
+    messages = 0
+    for timestamp, conn_id, kind, payload in read_capture(path):
+        if kind == SESSION:
+            session += 1
+            # Continue this run's clock right where the previous run's ended
+            offset = (last - timestamp) if last is not None else -timestamp
+            continue
+        last = timestamp + offset
+        connections[(session, conn_id)].append((last / 1e9, kind, payload))
+        if kind == MESSAGE:
+            messages += 1
+    duration = last / 1e9 if last is not None else 0.0
+    return connections, duration, messages
+
+
+def refresh_token(payload: bytes) -> bytes:
+    """Re-issue the JWT in an authenticate message for the same user"""
+    from jose import jwt
+    from app.core.security import create_access_token
+
+    message = json.loads(payload)
+    if message.get('type') != 'authenticate' or not message.get('token'):
+        return payload
+    claims = jwt.get_unverified_claims(message['token'])
+    message['token'] = create_access_token({'sub': claims.get('sub')})
+    return json.dumps(message).encode('utf-8')
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Replay:
+    """Drives one target with the captured connections and collects results"""
+
+    def __init__(self, target: str, speed: Optional[float], probe_interval: float, refresh_tokens: bool):
+        self.target = urlparse(target)
+        self.speed = speed  # None replays as fast as possible
+        self.probe_interval = probe_interval
+        self.refresh_tokens = refresh_tokens
+        self.sent = 0
+        self.received = 0
+        self.errors = 0
+        self.lag: List[float] = []  # seconds each send ran behind schedule
+        self.rtt: List[float] = []
+        self.started = None
+        self.first_send = None
+        self.last_send = None
+
+    def due(self, at: float) -> float:
+        """Wall clock (perf_counter) time a captured event should replay at"""
+        if self.speed is None:
+            return self.started
+        return self.started + at / self.speed
+
+    async def wait_until(self, at: float):
+        delay = self.due(at) - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def run(self, connections: Dict) -> float:
+        self.started = time.perf_counter()
+        await asyncio.gather(*(self.replay_connection(events) for events in connections.values()))
+        return time.perf_counter() - self.started
+
+    async def replay_connection(self, events: List[Tuple[float, int, bytes]]):
+        await self.wait_until(events[0][0])
+        try:
+            send, recv, close = await self.connect()
+        except OSError as e:
+            print(f"❌ Connection failed: {e}", file=sys.stderr)
+            self.errors += 1
+            return
+
+        reader = asyncio.create_task(self.read_frames(recv, send))
+        prober = asyncio.create_task(self.probe(send))
+        try:
+            for at, kind, payload in events:
+                if kind == OPEN:
+                    continue
+                if kind == CLOSE:
+                    await self.wait_until(at)
+                    break
+                if self.refresh_tokens:
+                    payload = refresh_token(payload)
+                await self.wait_until(at)
+                self.lag.append(max(0.0, time.perf_counter() - self.due(at)))
+                await send(payload)
+                self.sent += 1
+                self.last_send = time.perf_counter()
+                if self.first_send is None:
+                    self.first_send = self.last_send
+            # Leave time for the last replies to arrive
+            await asyncio.sleep(0.5)
+        except (OSError, ConnectionClosed):
+            self.errors += 1
+        finally:
+            prober.cancel()
+            reader.cancel()
+            await close()
+
+    async def connect(self):
+        """Open a connection and return (send, recv, close) coroutines for it"""
+        if self.target.scheme in ('ws', 'wss'):
+            websocket = await websockets.connect(self.target.geturl(), max_size=None)
+
+            async def send(payload: bytes):
+                await websocket.send(payload.decode('utf-8'))
+
+            async def recv() -> bytes:
+                return (await websocket.recv()).encode('utf-8')
+
+            return send, recv, websocket.close
+
+        reader, writer = await asyncio.open_connection(self.target.hostname, self.target.port)
+
+        async def send(payload: bytes):
+            writer.write(payload + b'\n')
+            await writer.drain()
+
+        async def recv() -> bytes:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("Server closed the connection")
+            return line
+
+        async def close():
+            writer.close()
+
+        return send, recv, close
+
+    async def read_frames(self, recv, send):
+        try:
+            while True:
+                frame = json.loads(await recv())
+                self.received += 1
+                if frame.get('type') == 'pong' and isinstance(frame.get('client_time'), float):
+                    self.rtt.append(time.perf_counter() - frame['client_time'])
+                elif frame.get('type') == 'ping':
+                    # Server heartbeat over raw TCP (the bridge answers these itself)
+                    await send(json.dumps({'type': 'pong', 'server_time': frame.get('server_time')}).encode('utf-8'))
+        except (ConnectionError, OSError, ValueError, ConnectionClosed):
+            pass
+
+    async def probe(self, send):
+        try:
+            while True:
+                await asyncio.sleep(self.probe_interval)
+                await send(json.dumps({'type': 'ping', 'client_time': time.perf_counter()}).encode('utf-8'))
+        except (OSError, ConnectionClosed):
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a DrawSync traffic capture")
+    parser.add_argument('capture', help="Capture file written by the socket server (CAPTURE_FILE)")
+    parser.add_argument('--target', default='tcp://localhost:8001', help="tcp://host:port (socket server) or ws://host:port (bridge)")
+    parser.add_argument('--speed', default='1', help="Time scale: 1 for real time, N for N times faster, or 'max'")
+    parser.add_argument('--probe-interval', type=float, default=1.0, help="Seconds between latency pings per connection")
+    parser.add_argument('--refresh-tokens', action='store_true', help="Re-issue expired JWTs in authenticate messages")
+    args = parser.parse_args()
+
+    connections, duration, messages = load_connections(args.capture)
+    speed = None if args.speed == 'max' else float(args.speed)
+
+    replay = Replay(args.target, speed, args.probe_interval, args.refresh_tokens)
+    elapsed = asyncio.run(replay.run(connections))
+    send_span = (replay.last_send - replay.first_send) if replay.sent > 1 else 0.0
+
+    print(json.dumps({
+        'capture': {
+            'connections': len(connections),
+            'messages': messages,
+            'duration_seconds': round(duration, 3),
+            'messages_per_second': round(messages / duration, 1) if duration else None  # includes idle lead-in
+        },
+        'replay': {
+            'target': args.target,
+            'speed': args.speed,
+            'elapsed_seconds': round(elapsed, 3),
+            'messages_sent': replay.sent,
+            'send_span_seconds': round(send_span, 3),
+            'messages_per_second': round(replay.sent / send_span, 1) if send_span else None,
+            'frames_received': replay.received,
+            'errors': replay.errors,
+            'schedule_lag_p99_ms': round(percentile(replay.lag, 0.99) * 1000, 2),
+            'latency_p50_ms': round(percentile(replay.rtt, 0.5) * 1000, 2),
+            'latency_p99_ms': round(percentile(replay.rtt, 0.99) * 1000, 2),
+            'latency_samples': len(replay.rtt)
+        }
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
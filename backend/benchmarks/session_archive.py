@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Game session archival benchmark
+
+Seeds a SQLite database with game sessions (mostly closed, opened in id
+order over the last two months), then times the hot-path session queries three times:
+with only the room roster index, with the partial indexes on open and
+closed sessions, and after the archival job has moved closed sessions older
+than --archive-days to game_session_archive. Also reports the archival
+run (rows/s, write lock time) and the row counts of both tables.
+
+    python benchmarks/session_archive.py --sessions 10000000 --db /tmp/drawsync-sessions.db
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import ArchivedSession, GameRoom, GameSession, SessionTotals, User
+from app.services.cleanup_service import CleanupService
+
+PARTIAL_INDEXES = ('ix_game_sessions_open_user_room', 'ix_game_sessions_closed_left_at')
+
+QUERIES = {
+    # RoomService.join_room and the socket server's join: is the user already in the room
+    'membership_check': (
+        "SELECT id FROM game_sessions WHERE user_id = :user_id AND room_id = :room_id AND left_at IS NULL LIMIT 1"
+    ),
+    # RoomService.quick_play: rooms the user is already in
+    'user_open_rooms': "SELECT room_id FROM game_sessions WHERE user_id = :user_id AND left_at IS NULL",
+    # RoomService.get_room_players
+    'room_roster': (
+        "SELECT game_sessions.id, users.username FROM game_sessions JOIN users ON users.id = game_sessions.user_id "
+        "WHERE game_sessions.room_id = :room_id AND game_sessions.left_at IS NULL ORDER BY game_sessions.id"
+    ),
+}
+
+
+def seed(engine, args, rng):
+    now = datetime.utcnow()
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.executemany(
+            "INSERT INTO users (id, username, email, hashed_password, is_active) VALUES (?, ?, ?, 'x', 1)",
+            ((user_id, f"player{user_id}", f"player{user_id}@example.com") for user_id in range(1, args.users + 1))
+        )
+        cursor.executemany(
+            "INSERT INTO game_rooms (id, room_code, name, is_private, max_players, current_players, is_active, "
+            "created_by, round_number, max_rounds, time_limit, game_started, created_at) "
+            "VALUES (?, ?, 'room', 0, 8, 0, 1, 1, 0, 5, 60, 0, ?)",
+            ((room_id, f"R{room_id:07d}", now) for room_id in range(1, args.rooms + 1))
+        )
+
+        # Sessions are opened in id order over the last 60 days and closed within the hour
+        def sessions():
+            step = 60 * 86400 / args.sessions
+            for session_id in range(1, args.sessions + 1):
+                joined_at = now - timedelta(seconds=(args.sessions - session_id) * step)
+                left_at = None if rng.random() < args.open_share else joined_at + timedelta(seconds=rng.randrange(60, 3600))
+                yield (session_id, rng.randrange(1, args.users + 1), rng.randrange(1, args.rooms + 1),
+                       f"s{session_id:x}", rng.randrange(500), joined_at, left_at)
+
+        cursor.executemany(
+            "INSERT INTO game_sessions (id, user_id, room_id, session_token, is_ready, score, joined_at, left_at) "
+            "VALUES (?, ?, ?, ?, 0, ?, ?, ?)",
+            sessions()
+        )
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def time_queries(engine, args, rng) -> dict:
+    results = {}
+    with engine.connect() as connection:
+        connection.execute(text("ANALYZE"))
+        for name, sql in QUERIES.items():
+            statement = text(sql)
+            samples = []
+            for _ in range(args.lookups):
+                params = {'user_id': rng.randrange(1, args.users + 1), 'room_id': rng.randrange(1, args.rooms + 1)}
+                started = time.perf_counter()
+                connection.execute(statement, params).all()
+                samples.append(time.perf_counter() - started)
+            samples.sort()
+            results[name] = {
+                'p50_us': round(samples[len(samples) // 2] * 1e6, 1),
+                'p99_us': round(samples[int(len(samples) * 0.99)] * 1e6, 1),
+                'plan': ' | '.join(row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params))
+            }
+    return results
+
+
+def count(engine, table: str) -> int:
+    with engine.connect() as connection:
+        return connection.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark game session archival and the active-session indexes")
+    parser.add_argument('--db', default='/tmp/drawsync-sessions.db')
+    parser.add_argument('--sessions', type=int, default=10_000_000)
+    parser.add_argument('--users', type=int, default=200_000)
+    parser.add_argument('--rooms', type=int, default=50_000)
+    parser.add_argument('--open-share', type=float, default=0.01, help="Share of sessions still open")
+    parser.add_argument('--archive-days', type=int, default=7)
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    parser.add_argument('--lookups', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    engine = create_engine(f"sqlite:///{args.db}")
+    Base.metadata.create_all(bind=engine, tables=[
+        User.__table__, GameRoom.__table__, GameSession.__table__,
+        ArchivedSession.__table__, SessionTotals.__table__
+    ])
+    with engine.begin() as connection:
+        for index in PARTIAL_INDEXES:
+            connection.execute(text(f"DROP INDEX {index}"))
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    seed(engine, args, rng)
+    results = {'sessions': args.sessions, 'seed_seconds': round(time.perf_counter() - started, 1)}
+
+    results['before'] = time_queries(engine, args, rng)
+
+    started = time.perf_counter()
+    for index in GameSession.__table__.indexes:
+        if index.name in PARTIAL_INDEXES:
+            index.create(bind=engine)
+    results['index_build_seconds'] = round(time.perf_counter() - started, 1)
+    results['with_partial_indexes'] = time_queries(engine, args, rng)
+
+    with Session(engine) as db:
+        results['archival'] = CleanupService.cleanup_rooms(
+            db, hours_old=24, chunk_size=args.chunk_size, archive_days=args.archive_days
+        )
+    results['after_archival'] = time_queries(engine, args, rng)
+    results['game_sessions_rows'] = count(engine, 'game_sessions')
+    results['archive_rows'] = count(engine, 'game_session_archive')
+    results['db_mb'] = round(os.path.getsize(args.db) / 1e6)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Game engine benchmark on a virtual clock
+
+Plays full games in many rooms at once with app.simulation (no sockets, threads
+or database) and reports the CPU cost per round transition.
+
+    python benchmarks/simulate_games.py --rooms 5000 --players 4
+    python benchmarks/simulate_games.py --rooms 5000 --guess-after 20
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.simulation import GameSimulation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many concurrent games in virtual time")
+    parser.add_argument('--rooms', type=int, default=2000, help="Number of rooms")
+    parser.add_argument('--players', type=int, default=4, help="Players per room")
+    parser.add_argument('--guess-after', type=float, default=None,
+                        help="Everyone guesses this many seconds into a round (default: rounds time out)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    sim = GameSimulation(seed=args.seed, keep_frames=False)
+    room_ids = range(1, args.rooms + 1)
+
+    cpu_start = time.process_time()
+    for room_id in room_ids:
+        sim.create_room(room_id, players=args.players)
+    setup_cpu = time.process_time() - cpu_start
+
+    cpu_start = time.process_time()
+    for room_id in room_ids:
+        sim.start_game(room_id)
+
+    rooms = sim.server.rooms
+    if args.guess_after is None:
+        sim.run_until_idle()
+    else:
+        while any(rooms[room_id]['game_started'] for room_id in room_ids):
+            sim.advance(1.0)
+            for room_id in room_ids:
+                room_info = rooms[room_id]
+                if room_info['round_active'] and sim.now() - room_info['round_start_time'] >= args.guess_after:
+                    sim.guess_all(room_id)
+    play_cpu = time.process_time() - cpu_start
+
+    # Every round is one start and one end transition
+    rounds = sum(rooms[room_id]['max_rounds'] for room_id in room_ids)
+    transitions = rounds * 2
+    bytes_sent = sum(client.transport.bytes_sent for client in sim.clients.values())
+
+    print(json.dumps({
+        'rooms': args.rooms,
+        'players': args.players,
+        'rounds': rounds,
+        'virtual_seconds': sim.now(),
+        'setup_cpu_seconds': round(setup_cpu, 3),
+        'play_cpu_seconds': round(play_cpu, 3),
+        'cpu_us_per_transition': round(play_cpu / transitions * 1e6, 1) if transitions else 0.0,
+        'bytes_sent': bytes_sent
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Thumbnail rendering benchmark
+
+Renders seeded random rounds to PNG thumbnails, first inline in this process
+and then across a pool of worker processes, and reports thumbnails/s overall
+and per worker, plus the cost of a content-hash cache hit. Needs numpy.
+
+    python benchmarks/thumbnails.py --rounds 200 --strokes 60 --workers 4
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.config import settings
+from app.core.archive import encode_strokes
+from app.core.canvas import raster_available
+from app.core.strokes import StrokeTable
+from app.core.thumbnails import render_png, render_to_cache
+from raster_canvas import random_stroke
+
+
+def random_round(rng: random.Random, strokes: int, points: int, width: int, height: int):
+    """Packed strokes of one random drawing, as stored in the round archive"""
+    table = StrokeTable()
+    for _ in range(strokes):
+        for point in random_stroke(rng, 1, points, rng.choice((2, 4, 8)), width, height):
+            table.add_point(point)
+    return encode_strokes(table.completed_strokes())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark thumbnail rendering")
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--strokes', type=int, default=60, help="Strokes per round")
+    parser.add_argument('--points', type=int, default=40, help="Points per stroke")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--size', type=int, default=settings.THUMBNAIL_SIZE)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if not raster_available():
+        sys.exit("numpy is not installed")
+
+    rng = random.Random(args.seed)
+    width, height = settings.CANVAS_WIDTH, settings.CANVAS_HEIGHT
+    rounds = [random_round(rng, args.strokes, args.points, width, height) for _ in range(args.rounds)]
+
+    started = time.perf_counter()
+    sizes = [len(render_png(body, count, width, height, args.size)) for body, count in rounds]
+    inline_seconds = time.perf_counter() - started
+
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        # Warm the workers up so process start-up is not counted
+        list(pool.map(render_png, *zip(*[(body, count, width, height, args.size) for body, count in rounds[:args.workers]])))
+        started = time.perf_counter()
+        futures = [pool.submit(render_png, body, count, width, height, args.size) for body, count in rounds]
+        for future in futures:
+            future.result()
+        pool_seconds = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as directory:
+        for body, count in rounds:
+            render_to_cache(directory, body, count, width, height, args.size)
+        started = time.perf_counter()
+        for body, count in rounds:
+            render_to_cache(directory, body, count, width, height, args.size)
+        hit_seconds = time.perf_counter() - started
+
+    print(json.dumps({
+        'canvas': f"{width}x{height}",
+        'thumbnail_size': args.size,
+        'rounds': args.rounds,
+        'points_per_round': args.strokes * args.points,
+        'packed_bytes_per_round': sum(len(body) for body, _ in rounds) // len(rounds),
+        'png_bytes_avg': sum(sizes) // len(sizes),
+        'inline_thumbnails_per_second': round(args.rounds / inline_seconds, 1),
+        'workers': args.workers,
+        'pool_thumbnails_per_second': round(args.rounds / pool_seconds, 1),
+        'pool_thumbnails_per_second_per_worker': round(args.rounds / pool_seconds / args.workers, 1),
+        'cache_hit_us': round(hit_seconds / args.rounds * 1e6, 1)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
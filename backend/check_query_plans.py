@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Query plan check
+
+Migrates a throwaway SQLite database to head, seeds a few rows, then runs
+the services' database paths (auth, rooms, quick-play, rosters, the room
+directory, stats, the leaderboard and cleanup) while recording every
+statement they send. Each statement is then run through EXPLAIN QUERY PLAN:
+any step that scans a table without an index fails the check, as does a
+full pass over an index that is not listed in FULL_PASSES.
+
+    python check_query_plans.py          # exits 1 if a query does not use an index
+    python check_query_plans.py --plans  # also print every plan
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Tuple
+
+WORKDIR = tempfile.mkdtemp(prefix="drawsync-plans-")
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(WORKDIR, 'plans.db')}"
+os.environ['LIVE_STATE_BACKEND'] = "memory"
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fastapi import HTTPException
+from sqlalchemy import event, insert
+
+from app.database import SessionLocal, engine, run_migrations
+from app.models import GameRoom, GameSession, User
+from app.schemas.game_room import GameRoomCreate, GameRoomJoin
+from app.schemas.user import UserCreate
+from app.services.cleanup_service import CleanupService
+from app.services.leaderboard_service import leaderboard_service
+from app.services.room_directory import room_directory
+from app.services.room_service import RoomService
+from app.services.stats_service import StatsService
+from app.services.user_service import UserService
+
+# Queries that read a whole index on purpose: step -> index
+FULL_PASSES = {
+    # The leaderboard is built from every player, in rank order
+    'leaderboard.load': 'ix_player_stats_total_score',
+    # The orphaned-session sweep is an anti-join on game_rooms: one pass over the room_id index per cycle
+    'cleanup.cleanup_rooms': 'ix_game_sessions_room_id_left_at',
+}
+
+SCAN = re.compile(r'^SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?')
+
+
+def seed(db):
+    """Users, rooms and sessions for every cleanup step to find something"""
+    now = datetime.utcnow()
+    db.execute(insert(User.__table__), [
+        {'id': user_id, 'username': f"player{user_id}", 'email': f"player{user_id}@example.com",
+         'hashed_password': "x", 'is_active': True}
+        for user_id in range(1, 41)
+    ])
+    db.execute(insert(GameRoom.__table__), [
+        {'id': room_id, 'room_code': f"SEED{room_id:02d}", 'name': f"room {room_id}", 'is_private': False,
+         'max_players': 4, 'current_players': 4 if room_id <= 2 else 0, 'is_active': room_id <= 6,
+         'created_by': 1, 'created_at': now - timedelta(days=2)}
+        for room_id in range(1, 11)
+    ])
+    db.execute(insert(GameSession.__table__), [
+        {'user_id': session_id % 40 + 1, 'room_id': session_id % 12 + 1, 'session_token': f"seed{session_id}",
+         'score': session_id, 'joined_at': now - timedelta(days=30), 'left_at': now - timedelta(days=30, seconds=-session_id)}
+        for session_id in range(1, 31)
+    ])
+    db.commit()
+
+
+def exercise(db, step):
+    """Run the services' database paths, naming each with step(name)"""
+    # Sign-up's username and email checks, stopped before hashing by a taken name / address
+    step('users.create_user')
+    for username, email in (("player1", "new@example.com"), ("newplayer", "player1@example.com")):
+        try:
+            UserService.create_user(db, UserCreate(username=username, email=email, password="x"))
+        except HTTPException:
+            pass
+    step('users.get_user_by_username')
+    user = UserService.get_user_by_username(db, "player1")
+    step('users.get_user_by_id')
+    UserService.get_user_by_id(db, user.id)
+
+    step('rooms.create_room')
+    room = RoomService.create_room(db, GameRoomCreate(name="plans", max_players=4), user.id)
+    step('rooms.join_room')
+    RoomService.join_room(db, GameRoomJoin(room_code=room.room_code), 2)
+    step('rooms.get_room_by_code')
+    RoomService.get_room_by_code(db, room.room_code)
+    step('rooms.get_room_players')
+    RoomService.get_room_players(db, room.id)
+    step('rooms.update_room_state')
+    RoomService.update_room_state(db, room.id, round_number=1)
+    step('rooms.leave_room')
+    RoomService.leave_room(db, 2, room.id)
+
+    step('room_directory.load')
+    RoomService.get_public_rooms(db)
+    step('room_directory.refresh')
+    room_directory.refresh(db, force=True)
+    step('rooms.quick_play')
+    RoomService.quick_play(db, 3)
+
+    step('leaderboard.load')
+    leaderboard_service.load(db)
+    step('stats.apply_game_results')
+    played_at = datetime.now(timezone.utc)
+    StatsService.apply_game_results(db, [
+        {'user_id': user_id, 'won': user_id == 1, 'score': 10 * user_id, 'words_guessed': 1,
+         'words_drawn': 1, 'play_minutes': 5, 'played_at': played_at}
+        for user_id in (1, 2, 3)
+    ])
+    step('users.get_user_stats')
+    UserService.get_user_stats(db, 1)
+    step('leaderboard.refresh')
+    leaderboard_service.refresh(db, force=True)
+    step('stats.compact_score_buckets')
+    StatsService.compact_score_buckets(db, keep_days=30)
+
+    step('cleanup.cleanup_rooms')
+    CleanupService.cleanup_rooms(db, hours_old=24, chunk_size=10)
+
+
+def record_statements():
+    """Start recording statements; returns the list of (step, statement, parameters) and the step setter"""
+    statements = []
+    current = ['setup']
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if executemany:
+            parameters = parameters[0]
+        statements.append((current[0], statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+
+    def step(name):
+        current[0] = name
+
+    return statements, step
+
+
+def check(statements, show_plans: bool) -> Tuple[int, int]:
+    """EXPLAIN every distinct statement; returns how many were checked and how many failed"""
+    failures = 0
+    seen = set()
+    with engine.connect() as connection:
+        for step, statement, parameters in statements:
+            if statement in seen or not statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'INSERT')):
+                continue
+            seen.add(statement)
+            plan = [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            if not plan:
+                continue  # a plain INSERT ... VALUES reads no table
+            problems = []
+            for detail in plan:
+                match = SCAN.match(detail)
+                if not match or detail.endswith(('CONSTANT ROW', 'CONSTANT ROWS')):
+                    continue
+                table, index = match.groups()
+                if index is None:
+                    problems.append(f"scans {table} without an index")
+                elif FULL_PASSES.get(step) != index:
+                    problems.append(f"reads all of {index}")
+            failures += bool(problems)
+            sql = ' '.join(statement.split())
+            if problems:
+                print(f"❌ {step}: {'; '.join(problems)}\n   {sql}")
+            elif show_plans:
+                print(f"✅ {step}: {sql}")
+            if problems or show_plans:
+                for detail in plan:
+                    print(f"     {detail}")
+    return len(seen), failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that every service query uses an index")
+    parser.add_argument('--plans', action='store_true', help="Print every query and its plan")
+    args = parser.parse_args()
+
+    run_migrations()
+    db = SessionLocal()
+    try:
+        seed(db)
+        statements, step = record_statements()
+        exercise(db, step)
+    finally:
+        db.close()
+
+    checked, failures = check(statements, args.plans)
+    if failures:
+        print(f"❌ {failures} of {checked} queries do not use an index")
+        sys.exit(1)
+    print(f"✅ All {checked} queries use an index")
+
+
+if __name__ == "__main__":
+    main()
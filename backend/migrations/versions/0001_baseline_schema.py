@@ -0,0 +1,147 @@
+"""baseline schema
+
+The schema the app used to create with Base.metadata.create_all. Databases
+created that way have some or all of these tables already (older ones miss
+the newer tables and indexes), so a table is only created when it is
+missing and every index with IF NOT EXISTS. Existing databases therefore
+need no `alembic stamp`: upgrading them just adds what they lack.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 08:44:00.163323
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def create_table(name, *columns):
+    # Offline (--sql) there is no database to look at: emit every table
+    if op.get_context().as_sql or not sa.inspect(op.get_bind()).has_table(name):
+        op.create_table(name, *columns)
+
+
+def create_index(name, table, columns, **kwargs):
+    op.create_index(name, table, columns, if_not_exists=True, **kwargs)
+
+
+def upgrade():
+    create_table('users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_index('ix_users_id', 'users', ['id'])
+    create_index('ix_users_username', 'users', ['username'], unique=True)
+    create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    create_table('game_rooms',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('room_code', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('is_private', sa.Boolean(), nullable=True),
+        sa.Column('password', sa.String(), nullable=True),
+        sa.Column('max_players', sa.Integer(), nullable=True),
+        sa.Column('current_players', sa.Integer(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('current_word', sa.String(), nullable=True),
+        sa.Column('current_drawer_id', sa.Integer(), nullable=True),
+        sa.Column('round_number', sa.Integer(), nullable=True),
+        sa.Column('max_rounds', sa.Integer(), nullable=True),
+        sa.Column('time_limit', sa.Integer(), nullable=True),
+        sa.Column('game_started', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_index('ix_game_rooms_id', 'game_rooms', ['id'])
+    create_index('ix_game_rooms_room_code', 'game_rooms', ['room_code'], unique=True)
+
+    create_table('game_sessions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('session_token', sa.String(), nullable=False),
+        sa.Column('is_ready', sa.Boolean(), nullable=True),
+        sa.Column('score', sa.Integer(), nullable=True),
+        sa.Column('joined_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('left_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['room_id'], ['game_rooms.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_index('ix_game_sessions_id', 'game_sessions', ['id'])
+    create_index('ix_game_sessions_session_token', 'game_sessions', ['session_token'], unique=True)
+    create_index('ix_game_sessions_room_id_left_at', 'game_sessions', ['room_id', 'left_at'])
+    create_index('ix_game_sessions_open_user_room', 'game_sessions', ['user_id', 'room_id'],
+                 sqlite_where=sa.text('left_at IS NULL'), postgresql_where=sa.text('left_at IS NULL'))
+    create_index('ix_game_sessions_closed_left_at', 'game_sessions', ['left_at'],
+                 sqlite_where=sa.text('left_at IS NOT NULL'), postgresql_where=sa.text('left_at IS NOT NULL'))
+
+    create_table('player_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('games_played', sa.Integer(), nullable=True),
+        sa.Column('games_won', sa.Integer(), nullable=True),
+        sa.Column('total_score', sa.Integer(), nullable=True),
+        sa.Column('words_guessed', sa.Integer(), nullable=True),
+        sa.Column('words_drawn', sa.Integer(), nullable=True),
+        sa.Column('average_score', sa.Integer(), nullable=True),
+        sa.Column('total_play_time', sa.Integer(), nullable=True),
+        sa.Column('last_played', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id')
+    )
+    create_index('ix_player_stats_id', 'player_stats', ['id'])
+
+    create_table('score_buckets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('score', sa.Integer(), nullable=False),
+        sa.Column('games_played', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'day', name='uq_score_buckets_user_day')
+    )
+    create_index('ix_score_buckets_id', 'score_buckets', ['id'])
+    create_index('ix_score_buckets_day', 'score_buckets', ['day'])
+
+    create_table('game_session_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Integer(), nullable=False),
+        sa.Column('joined_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('left_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_index('ix_game_session_archive_user_id', 'game_session_archive', ['user_id'])
+
+    create_table('session_totals',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('sessions', sa.Integer(), nullable=False),
+        sa.Column('seconds_in_rooms', sa.Integer(), nullable=False),
+        sa.Column('total_score', sa.Integer(), nullable=False),
+        sa.Column('last_left_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    for table in ('session_totals', 'game_session_archive', 'score_buckets', 'player_stats',
+                  'game_sessions', 'game_rooms', 'users'):
+        op.drop_table(table)
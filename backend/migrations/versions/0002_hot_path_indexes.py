@@ -0,0 +1,41 @@
+"""hot path indexes
+
+Indexes for the queries that run on every refresh or cleanup pass:
+
+- game_rooms (is_private, is_active, current_players): room directory load
+- game_rooms (is_active, created_at): cleanup of full and old inactive rooms
+- game_rooms (updated_at): room directory refresh
+- player_stats (total_score DESC, user_id): leaderboard load in rank order
+- player_stats (last_played): leaderboard refresh
+
+game_sessions (room_id, left_at) and the open-session index on
+(user_id, room_id) are part of the baseline.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 08:44:27.693499
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_game_rooms_public_listing', 'game_rooms', ['is_private', 'is_active', 'current_players'])
+    op.create_index('ix_game_rooms_active_created_at', 'game_rooms', ['is_active', 'created_at'])
+    op.create_index('ix_game_rooms_updated_at', 'game_rooms', ['updated_at'])
+    op.create_index('ix_player_stats_total_score', 'player_stats', [sa.text('total_score DESC'), 'user_id'])
+    op.create_index('ix_player_stats_last_played', 'player_stats', ['last_played'])
+
+
+def downgrade():
+    op.drop_index('ix_player_stats_last_played', table_name='player_stats')
+    op.drop_index('ix_player_stats_total_score', table_name='player_stats')
+    op.drop_index('ix_game_rooms_updated_at', table_name='game_rooms')
+    op.drop_index('ix_game_rooms_active_created_at', table_name='game_rooms')
+    op.drop_index('ix_game_rooms_public_listing', table_name='game_rooms')
@@ -12,8 +12,8 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
 
 from app.socket_server import start_socket_server
-from app.websocket_bridge import start_websocket_bridge
-import asyncio
+from app.websocket_bridge import start_websocket_bridge_workers
+from app.config import settings
 
 def run_socket_server():
     """Run the Python socket server in a separate thread"""
@@ -22,8 +22,8 @@ def run_socket_server():
 
 def run_websocket_bridge():
     """Run the WebSocket bridge"""
-    print("🌉 Starting WebSocket Bridge...")
-    asyncio.run(start_websocket_bridge())
+    print(f"🌉 Starting WebSocket Bridge ({settings.BRIDGE_WORKERS} worker(s))...")
+    start_websocket_bridge_workers(settings.BRIDGE_WORKERS)
 
 def main():
     """Start both services"""
@@ -1,5 +1,5 @@
 import React, { useRef, useEffect, useState, useCallback } from 'react';
-import { Palette, Eraser, RotateCcw, Settings } from 'lucide-react';
+import { Palette, Eraser, RotateCcw, Settings, Undo2, Redo2 } from 'lucide-react';
 import useGameStore from '../store/gameStore';
 import useAuthStore from '../store/authStore';
 
@@ -10,6 +10,7 @@ const DrawingCanvas = ({ width = 800, height = 600 }) => {
   const [lastY, setLastY] = useState(0);
   const [currentStroke, setCurrentStroke] = useState([]);
   const [lastDrawingDataLength, setLastDrawingDataLength] = useState(0);
+  const [keyframeImage, setKeyframeImage] = useState(null);
 
   const { user } = useAuthStore();
   const {
@@ -17,6 +18,7 @@ const DrawingCanvas = ({ width = 800, height = 600 }) => {
     brushColor,
     brushSize,
     drawingData,
+    canvasKeyframe,
     addDrawingData,
     sendDrawData,
     currentDrawer,
@@ -24,6 +26,8 @@ const DrawingCanvas = ({ width = 800, height = 600 }) => {
     gameState,
     clearDrawing,
     sendClearCanvas,
+    sendUndoStroke,
+    sendRedoStroke,
   } = useGameStore();
 
   // Check if current user is the drawer
@@ -47,21 +51,32 @@ const DrawingCanvas = ({ width = 800, height = 600 }) => {
   // Clear canvas when game starts new round or drawing data is cleared
   useEffect(() => {
     if (isGameActive && gameState?.current_round) {
-      clearCanvas();
+      blankCanvas();
       clearDrawing();
     }
   }, [gameState?.current_round, isGameActive]);
 
-  // Clear canvas when drawing data is cleared
+  // Decode the keyframe image from the last canvas snapshot
   useEffect(() => {
-    if (drawingData.length === 0 && isGameActive) {
-      clearCanvas();
+    if (!canvasKeyframe) {
+      setKeyframeImage(null);
+      return;
     }
-  }, [drawingData.length, isGameActive]);
+    const image = new Image();
+    image.onload = () => setKeyframeImage(image);
+    image.src = canvasKeyframe;
+  }, [canvasKeyframe]);
+
+  // Clear canvas when drawing data is cleared (or the last stroke was undone)
+  useEffect(() => {
+    if (drawingData.length === 0 && !keyframeImage && isGameActive) {
+      blankCanvas();
+    }
+  }, [drawingData.length, keyframeImage, isGameActive]);
 
   // Improved drawing data processing - redraw entire canvas for proper synchronization
   useEffect(() => {
-    if (drawingData.length > 0) {
+    if (drawingData.length > 0 || keyframeImage) {
       const canvas = canvasRef.current;
       const ctx = canvas.getContext('2d');
       
@@ -69,6 +84,11 @@ const DrawingCanvas = ({ width = 800, height = 600 }) => {
       ctx.fillStyle = 'white';
       ctx.fillRect(0, 0, width, height);
       
+      // Strokes before the keyframe are already in the image
+      if (keyframeImage) {
+        ctx.drawImage(keyframeImage, 0, 0, width, height);
+      }
+      
       // Group drawing data by user to handle strokes properly
       const strokesByUser = {};
       
@@ -123,7 +143,7 @@ const DrawingCanvas = ({ width = 800, height = 600 }) => {
       
       setLastDrawingDataLength(drawingData.length);
     }
-  }, [drawingData, width, height]);
+  }, [drawingData, keyframeImage, width, height]);
 
   const getMousePos = useCallback((e) => {
     const canvas = canvasRef.current;
@@ -237,18 +257,23 @@ const DrawingCanvas = ({ width = 800, height = 600 }) => {
     setCurrentStroke([]);
   }, [isGameActive, isCurrentDrawer, lastX, lastY, brushColor, brushSize, sendDrawData, addDrawingData, user]);
 
-  const clearCanvas = useCallback(() => {
+  // Wipe the local canvas only
+  const blankCanvas = useCallback(() => {
     const canvas = canvasRef.current;
     const ctx = canvas.getContext('2d');
     ctx.fillStyle = 'white';
     ctx.fillRect(0, 0, width, height);
     setLastDrawingDataLength(0);
+  }, [width, height]);
+
+  const clearCanvas = useCallback(() => {
+    blankCanvas();
     
     // Send clear canvas request to server
     if (isGameActive && isCurrentDrawer) {
       sendClearCanvas();
     }
-  }, [width, height, isGameActive, isCurrentDrawer, sendClearCanvas]);
+  }, [blankCanvas, isGameActive, isCurrentDrawer, sendClearCanvas]);
 
   // Mouse events
   const handleMouseDown = useCallback((e) => {
@@ -376,6 +401,23 @@ const DrawingCanvas = ({ width = 800, height = 600 }) => {
               <span className="text-xs font-semibold text-slate-700 min-w-[20px]">{brushSize}</span>
             </div>
             
+            <div className="flex gap-2">
+              <button
+                onClick={sendUndoStroke}
+                className="flex-1 flex items-center justify-center gap-1 px-3 py-2 bg-slate-100 text-slate-700 text-sm font-semibold rounded-xl hover:bg-slate-200 transition-all duration-200"
+              >
+                <Undo2 className="w-4 h-4" />
+                Undo
+              </button>
+              <button
+                onClick={sendRedoStroke}
+                className="flex-1 flex items-center justify-center gap-1 px-3 py-2 bg-slate-100 text-slate-700 text-sm font-semibold rounded-xl hover:bg-slate-200 transition-all duration-200"
+              >
+                <Redo2 className="w-4 h-4" />
+                Redo
+              </button>
+            </div>
+            
             <button
               onClick={clearCanvas}
               className="flex items-center justify-center gap-2 px-3 py-2 bg-gradient-to-r from-red-500 to-pink-500 text-white text-sm font-semibold rounded-xl hover:from-red-600 hover:to-pink-600 transition-all duration-200 shadow-lg hover:shadow-xl"
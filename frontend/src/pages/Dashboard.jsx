@@ -19,6 +19,7 @@ import toast from 'react-hot-toast';
 import useAuthStore from '../store/authStore';
 import useGameStore from '../store/gameStore';
 import { roomsAPI } from '../utils/api';
+import socketManager from '../utils/socket';
 import Button from '../components/Button';
 import Input from '../components/Input';
 
@@ -39,6 +40,37 @@ const Dashboard = () => {
 
   useEffect(() => {
     fetchRooms();
+
+    // Keep the list current from the lobby feed instead of polling
+    socketManager.connect(localStorage.getItem('token'));
+    socketManager.subscribeLobby();
+
+    const listed = (room) => ({ ...room, is_active: true });
+    const handleLobbySnapshot = (message) => {
+      setRooms(message.rooms.map(listed));
+    };
+    const handleRoomAdded = (message) => {
+      setRooms((current) => [...current.filter((room) => room.id !== message.room.id), listed(message.room)]);
+    };
+    const handleRoomUpdated = ({ type, room_id, ...changes }) => {
+      setRooms((current) => current.map((room) => (room.id === room_id ? { ...room, ...changes } : room)));
+    };
+    const handleRoomRemoved = (message) => {
+      setRooms((current) => current.filter((room) => room.id !== message.room_id));
+    };
+
+    socketManager.on('lobby_snapshot', handleLobbySnapshot);
+    socketManager.on('room_added', handleRoomAdded);
+    socketManager.on('room_updated', handleRoomUpdated);
+    socketManager.on('room_removed', handleRoomRemoved);
+
+    return () => {
+      socketManager.unsubscribeLobby();
+      socketManager.off('lobby_snapshot', handleLobbySnapshot);
+      socketManager.off('room_added', handleRoomAdded);
+      socketManager.off('room_updated', handleRoomUpdated);
+      socketManager.off('room_removed', handleRoomRemoved);
+    };
   }, []);
 
   const fetchRooms = async () => {
@@ -83,6 +83,12 @@ const GameRoom = () => {
     handlePlayersUpdate,
     handleDrawData,
     handleGameState,
+    handleStatePatch,
+    handleStrokeStarted,
+    handleStrokeUndone,
+    handleStrokeRedone,
+    handleCanvasSnapshot,
+    handleDrawBatch,
   } = useGameStore();
 
   const [isReady, setIsReady] = useState(false);
@@ -94,11 +100,25 @@ const GameRoom = () => {
 
   const handleAuthenticatedEvent = useCallback((data) => {
     handleAuthenticated(data);
+    if (data.resuming) {
+      // Reconnected: the socket manager is resuming the held seat
+      console.log('Authentication successful, resuming room session...');
+      return;
+    }
     // Join room after successful authentication
     console.log('Authentication successful, joining room...');
     joinRoom(parseInt(roomId));
   }, [handleAuthenticated, joinRoom, roomId]);
 
+  const handleResumedEvent = useCallback((data) => {
+    handleRoomJoined(data);
+  }, [handleRoomJoined]);
+
+  const handleResumeFailedEvent = useCallback(() => {
+    // Seat expired while we were away, join like a new player
+    joinRoom(parseInt(roomId));
+  }, [joinRoom, roomId]);
+
   const handleRoomJoinedEvent = useCallback((data) => {
     handleRoomJoined(data);
     toast.success('Joined room successfully!');
@@ -194,6 +214,30 @@ const GameRoom = () => {
     console.log('Game state update:', data);
   }, [handleGameState]);
 
+  const handleStatePatchEvent = useCallback((data) => {
+    handleStatePatch(data);
+  }, [handleStatePatch]);
+
+  const handleStrokeStartedEvent = useCallback((data) => {
+    handleStrokeStarted(data);
+  }, [handleStrokeStarted]);
+
+  const handleStrokeUndoneEvent = useCallback((data) => {
+    handleStrokeUndone(data);
+  }, [handleStrokeUndone]);
+
+  const handleStrokeRedoneEvent = useCallback((data) => {
+    handleStrokeRedone(data);
+  }, [handleStrokeRedone]);
+
+  const handleCanvasSnapshotEvent = useCallback((data) => {
+    handleCanvasSnapshot(data);
+  }, [handleCanvasSnapshot]);
+
+  const handleDrawBatchEvent = useCallback((data) => {
+    handleDrawBatch(data);
+  }, [handleDrawBatch]);
+
   // Game controls
   const handleStartGame = () => {
     startGame();
@@ -257,6 +301,8 @@ const GameRoom = () => {
     socketManager.on('socket_connected', handleSocketConnectedEvent);
     socketManager.on('authenticated', handleAuthenticatedEvent);
     socketManager.on('room_joined', handleRoomJoinedEvent);
+    socketManager.on('resumed', handleResumedEvent);
+    socketManager.on('resume_failed', handleResumeFailedEvent);
     socketManager.on('player_joined', handlePlayerJoinedEvent);
     socketManager.on('player_left', handlePlayerLeftEvent);
     socketManager.on('chat_message', handleChatMessageEvent);
@@ -269,8 +315,14 @@ const GameRoom = () => {
     socketManager.on('time_update', handleTimeUpdateEvent);
     socketManager.on('word_assigned', handleWordAssignedEvent);
     socketManager.on('game_state', handleGameStateEvent);
+    socketManager.on('state_patch', handleStatePatchEvent);
     socketManager.on('canvas_cleared', handleCanvasClearedEvent);
     socketManager.on('draw_data', handleDrawDataEvent);
+    socketManager.on('stroke_started', handleStrokeStartedEvent);
+    socketManager.on('stroke_undone', handleStrokeUndoneEvent);
+    socketManager.on('stroke_redone', handleStrokeRedoneEvent);
+    socketManager.on('canvas_snapshot', handleCanvasSnapshotEvent);
+    socketManager.on('draw_batch', handleDrawBatchEvent);
     socketManager.on('room_deleted', handleRoomDeletedEvent);
     socketManager.on('players_update', handlePlayersUpdateEvent);
 
@@ -292,6 +344,8 @@ const GameRoom = () => {
       socketManager.off('socket_connected', handleSocketConnectedEvent);
       socketManager.off('authenticated', handleAuthenticatedEvent);
       socketManager.off('room_joined', handleRoomJoinedEvent);
+      socketManager.off('resumed', handleResumedEvent);
+      socketManager.off('resume_failed', handleResumeFailedEvent);
       socketManager.off('player_joined', handlePlayerJoinedEvent);
       socketManager.off('player_left', handlePlayerLeftEvent);
       socketManager.off('chat_message', handleChatMessageEvent);
@@ -304,8 +358,14 @@ const GameRoom = () => {
       socketManager.off('time_update', handleTimeUpdateEvent);
       socketManager.off('word_assigned', handleWordAssignedEvent);
       socketManager.off('game_state', handleGameStateEvent);
+      socketManager.off('state_patch', handleStatePatchEvent);
       socketManager.off('canvas_cleared', handleCanvasClearedEvent);
       socketManager.off('draw_data', handleDrawDataEvent);
+      socketManager.off('stroke_started', handleStrokeStartedEvent);
+      socketManager.off('stroke_undone', handleStrokeUndoneEvent);
+      socketManager.off('stroke_redone', handleStrokeRedoneEvent);
+      socketManager.off('canvas_snapshot', handleCanvasSnapshotEvent);
+      socketManager.off('draw_batch', handleDrawBatchEvent);
       socketManager.off('room_deleted', handleRoomDeletedEvent);
       socketManager.off('players_update', handlePlayersUpdateEvent);
     };
@@ -318,6 +378,8 @@ const GameRoom = () => {
     handleSocketConnectedEvent,
     handleAuthenticatedEvent,
     handleRoomJoinedEvent,
+    handleResumedEvent,
+    handleResumeFailedEvent,
     handlePlayerJoinedEvent,
     handlePlayerLeftEvent,
     handleChatMessageEvent,
@@ -330,8 +392,14 @@ const GameRoom = () => {
     handleTimeUpdateEvent,
     handleWordAssignedEvent,
     handleGameStateEvent,
+    handleStatePatchEvent,
     handleCanvasClearedEvent,
     handleDrawDataEvent,
+    handleStrokeStartedEvent,
+    handleStrokeUndoneEvent,
+    handleStrokeRedoneEvent,
+    handleCanvasSnapshotEvent,
+    handleDrawBatchEvent,
     handleRoomDeletedEvent,
     handlePlayersUpdateEvent,
   ]);
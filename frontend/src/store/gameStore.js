@@ -1,6 +1,40 @@
 import { create } from 'zustand';
 import socketManager from '../utils/socket';
 
+// Local countdown towards the server's round deadline (replaces per-second time updates)
+let countdownTimer = null;
+
+const stopCountdown = () => {
+  if (countdownTimer) {
+    clearInterval(countdownTimer);
+    countdownTimer = null;
+  }
+};
+
+// Expand strokes sent as [x, y] point pairs (canvas_snapshot, draw_batch) into drawing points
+const strokesToPoints = (strokes, firstTimestamp, step) => {
+  let timestamp = firstTimestamp;
+  const points = [];
+  (strokes || []).forEach((stroke) => {
+    const base = {
+      user_id: stroke.user_id,
+      stroke_id: stroke.id,
+      color: stroke.color,
+      brush_size: stroke.brush_size,
+    };
+    stroke.points.forEach(([x, y], index) => {
+      points.push({ ...base, x, y, is_drawing: true, is_first_point: index === 0, timestamp });
+      timestamp += step;
+    });
+    if (stroke.complete && stroke.points.length > 0) {
+      const [x, y] = stroke.points[stroke.points.length - 1];
+      points.push({ ...base, x, y, is_drawing: false, timestamp });
+      timestamp += step;
+    }
+  });
+  return points;
+};
+
 const useGameStore = create((set, get) => ({
   // Room state
   currentRoom: null,
@@ -21,6 +55,11 @@ const useGameStore = create((set, get) => ({
 
   // Drawing state
   drawingData: [],
+  undoneStrokes: {}, // stroke_id -> points, kept for redo
+  canvasKeyframe: null, // PNG data URL under the strokes (from canvas_snapshot)
+  pendingLocalStrokes: [], // own strokes waiting for their server stroke_id
+  localStrokeIds: {}, // local stroke key -> server stroke_id
+  nextLocalStroke: 1,
   brushColor: '#000000',
   brushSize: 2,
   isDrawingMode: false,
@@ -52,6 +91,7 @@ const useGameStore = create((set, get) => ({
   },
 
   leaveRoom: () => {
+    stopCountdown();
     socketManager.leaveRoom();
     set({
       currentRoom: null,
@@ -137,14 +177,123 @@ const useGameStore = create((set, get) => ({
     set({ timeRemaining: time });
   },
 
+  // Count down locally to a server round deadline (server monotonic seconds)
+  syncRoundDeadline: (roundDeadline) => {
+    stopCountdown();
+    if (roundDeadline === undefined || roundDeadline === null) {
+      return;
+    }
+    const localDeadline = socketManager.serverTimeToLocal(roundDeadline);
+    const tick = () => {
+      const remaining = Math.max(0, Math.ceil((localDeadline - Date.now()) / 1000));
+      set({ timeRemaining: remaining });
+      if (remaining === 0) {
+        stopCountdown();
+      }
+    };
+    tick();
+    countdownTimer = setInterval(tick, 250);
+  },
+
   addDrawingData: (data) => {
+    set((state) => {
+      // Own points are tagged with a local stroke key until the server sends the stroke_id
+      let { nextLocalStroke, pendingLocalStrokes } = state;
+      if (data.is_first_point) {
+        pendingLocalStrokes = [...pendingLocalStrokes, nextLocalStroke];
+        nextLocalStroke += 1;
+      }
+      const localStroke = nextLocalStroke - 1;
+      const strokeId = state.localStrokeIds[localStroke];
+      return {
+        drawingData: [
+          ...state.drawingData,
+          { ...data, local_stroke: localStroke, ...(strokeId !== undefined && { stroke_id: strokeId }) },
+        ],
+        nextLocalStroke,
+        pendingLocalStrokes,
+      };
+    });
+  },
+
+  clearDrawing: () => {
+    set({ drawingData: [], undoneStrokes: {}, canvasKeyframe: null, pendingLocalStrokes: [], localStrokeIds: {} });
+  },
+
+  sendUndoStroke: () => {
+    const { isSocketConnected } = get();
+    if (isSocketConnected) {
+      socketManager.undoStroke();
+    }
+  },
+
+  sendRedoStroke: () => {
+    const { isSocketConnected } = get();
+    if (isSocketConnected) {
+      socketManager.redoStroke();
+    }
+  },
+
+  // The server assigned an id to the stroke we started drawing
+  handleStrokeStarted: (data) => {
+    set((state) => {
+      const [localStroke, ...pendingLocalStrokes] = state.pendingLocalStrokes;
+      if (localStroke === undefined) return {};
+      return {
+        pendingLocalStrokes,
+        localStrokeIds: { ...state.localStrokeIds, [localStroke]: data.stroke_id },
+        drawingData: state.drawingData.map((point) =>
+          point.local_stroke === localStroke ? { ...point, stroke_id: data.stroke_id } : point
+        ),
+      };
+    });
+  },
+
+  handleStrokeUndone: (data) => {
+    const { drawingData, canvasKeyframe } = get();
+    if (canvasKeyframe && !drawingData.some((point) => point.stroke_id === data.stroke_id)) {
+      // The stroke is baked into our keyframe image: fetch the drawing again
+      socketManager.syncCanvas();
+      return;
+    }
     set((state) => ({
-      drawingData: [...state.drawingData, data],
+      drawingData: state.drawingData.filter((point) => point.stroke_id !== data.stroke_id),
+      undoneStrokes: {
+        ...state.undoneStrokes,
+        [data.stroke_id]: state.drawingData.filter((point) => point.stroke_id === data.stroke_id),
+      },
     }));
   },
 
-  clearDrawing: () => {
-    set({ drawingData: [] });
+  handleStrokeRedone: (data) => {
+    const { undoneStrokes } = get();
+    const points = undoneStrokes[data.stroke_id];
+    if (!points) {
+      // Undone before we joined: fetch the current drawing instead
+      socketManager.syncCanvas();
+      return;
+    }
+    const { [data.stroke_id]: _, ...remaining } = undoneStrokes;
+    set((state) => ({
+      drawingData: [...state.drawingData, ...points],
+      undoneStrokes: remaining,
+    }));
+  },
+
+  // Full drawing for late joiners: optional keyframe image plus visible strokes with [x, y] point pairs
+  handleCanvasSnapshot: (data) => {
+    const drawingData = strokesToPoints(data.strokes, 0, 1);
+    const canvasKeyframe = data.keyframe ? `data:image/png;base64,${data.keyframe.png}` : null;
+    set({ drawingData, undoneStrokes: {}, canvasKeyframe });
+  },
+
+  // Whole strokes uploaded in one go (POST /games/{room_id}/strokes)
+  handleDrawBatch: (data) => {
+    // Fractional steps keep the batch in order after everything drawn so far
+    const points = strokesToPoints(data.strokes, Date.now(), 0.001);
+    set((state) => ({
+      drawingData: [...state.drawingData, ...points],
+    }));
   },
 
   sendClearCanvas: () => {
@@ -276,6 +425,7 @@ const useGameStore = create((set, get) => ({
   },
 
   resetGameState: () => {
+    stopCountdown();
     set({
       gameState: null,
       isGameActive: false,
@@ -364,10 +514,13 @@ const useGameStore = create((set, get) => ({
   },
 
   handleRoundStarted: (data) => {
+    get().syncRoundDeadline(data.round_deadline);
     set({
       currentRound: data.round,
       timeRemaining: data.time_remaining,
       drawingData: [], // Clear drawing data for new round
+      undoneStrokes: {},
+      canvasKeyframe: null,
       guessedPlayers: [], // Reset guessed players for new round
       guessProgress: { guessed: 0, total: 0 }, // Reset guess progress
     });
@@ -417,6 +570,7 @@ const useGameStore = create((set, get) => ({
   },
 
   handleRoundEnded: (data) => {
+    stopCountdown();
     set((state) => {
       // Show round end popup only if it's the final round
       const isFinalRound = data.round >= state.totalRounds;
@@ -445,6 +599,7 @@ const useGameStore = create((set, get) => ({
   },
 
   handleGameEnded: (data) => {
+    stopCountdown();
     set((state) => {
       // Show game end popup with final scores
       const gameData = {
@@ -465,15 +620,21 @@ const useGameStore = create((set, get) => ({
   },
 
   handleTimeUpdate: (data) => {
-    set({ timeRemaining: data.time_remaining });
+    if (data.round_deadline !== undefined) {
+      // Periodic resync frame: restart the local countdown against the deadline
+      get().syncRoundDeadline(data.round_deadline);
+    } else {
+      set({ timeRemaining: data.time_remaining });
+    }
     console.log('Time update:', data.time_remaining);
   },
 
   handleCanvasCleared: (data) => {
-    set({ drawingData: [] });
+    set({ drawingData: [], undoneStrokes: {}, canvasKeyframe: null });
   },
 
   handleRoomDeleted: (data) => {
+    stopCountdown();
     set({
       currentRoom: null,
       players: [],
@@ -499,8 +660,33 @@ const useGameStore = create((set, get) => ({
     }
   },
 
+  // Handle incremental game state updates (only the changed fields are present)
+  handleStatePatch: (data) => {
+    const changes = data.changes || {};
+    if ('round_deadline' in changes) {
+      get().syncRoundDeadline(changes.round_deadline);
+    }
+    set((state) => {
+      const update = {
+        gameState: { ...state.gameState, ...changes },
+      };
+      if ('game_started' in changes) update.isGameActive = changes.game_started;
+      if ('current_round' in changes) update.currentRound = changes.current_round;
+      if ('max_rounds' in changes) update.totalRounds = changes.max_rounds;
+      if ('players' in changes) update.players = changes.players;
+      if ('current_drawer_id' in changes) {
+        update.currentDrawer = changes.current_drawer_id;
+        update.isDrawing = changes.current_drawer_id !== null && changes.current_drawer_id === socketManager.userId;
+      }
+      return update;
+    });
+  },
+
   // Handle incoming game state updates
   handleGameState: (data) => {
+    if (data.round_deadline) {
+      get().syncRoundDeadline(data.round_deadline);
+    }
     set((state) => ({
       gameState: { ...state.gameState, ...data },
       isGameActive: data.game_started !== undefined ? data.game_started : state.isGameActive,
@@ -8,6 +8,14 @@ class SocketManager {
     this.reconnectDelay = 1000;
     this.reconnectTimer = null;
     this.messageQueue = [];
+    this.clockOffset = 0; // server_time - local time, in seconds
+    this.clockRtt = null; // round trip of the best clock sample, in seconds
+    this.userId = null;
+    this.stateSeq = null; // last applied room state version
+    this.resumeToken = null; // issued on room_joined, lets a reconnect resume the seat
+    this.roomSeq = null; // room stream frame up to which every frame was received
+    this.seqAhead = new Set(); // frames received past roomSeq (control frames overtake draw frames)
+    this.lobbySubscribed = false; // re-subscribe to the lobby feed after a reconnect
   }
 
   connect(token) {
@@ -33,13 +41,19 @@ class SocketManager {
         // Authenticate after connection
         if (token) {
           console.log('Authenticating with token...');
+          this.clockRtt = null;
           this.sendMessage({
             type: 'authenticate',
-            token: token
+            token: token,
+            client_time: Date.now() / 1000
           });
         } else {
           console.log('No token provided for authentication');
         }
+
+        if (this.lobbySubscribed) {
+          this.sendMessage({ type: 'subscribe_lobby' });
+        }
       };
 
       this.socket.onclose = (event) => {
@@ -95,6 +109,9 @@ class SocketManager {
     
     this.isConnected = false;
     this.connectionAttempts = 0;
+    this.resumeToken = null;
+    this.roomSeq = null;
+    this.seqAhead = new Set();
     console.log('🔌 Disconnected from socket server');
   }
 
@@ -123,8 +140,134 @@ class SocketManager {
     }
   }
 
+  // Estimate the server clock offset from a request/response pair, keeping the lowest-RTT sample
+  updateClockOffset(message) {
+    if (message.client_time === undefined || message.client_time === null || message.server_time === undefined) {
+      return;
+    }
+    const now = Date.now() / 1000;
+    const rtt = now - message.client_time;
+    if (this.clockRtt === null || rtt <= this.clockRtt) {
+      this.clockRtt = rtt;
+      this.clockOffset = message.server_time - (message.client_time + rtt / 2);
+    }
+  }
+
+  // Convert a server timestamp (seconds) to a local Date.now()-style timestamp (ms)
+  serverTimeToLocal(serverTime) {
+    return (serverTime - this.clockOffset) * 1000;
+  }
+
+  // Count a room frame; false if it was already received
+  receiveRoomFrame(seq) {
+    if (seq <= this.roomSeq || this.seqAhead.has(seq)) {
+      return false;
+    }
+    this.seqAhead.add(seq);
+    this.advanceRoomSeq();
+    return true;
+  }
+
+  // Everything up to seq has been received or is covered by a snapshot
+  coverRoomSeq(seq) {
+    this.roomSeq = Math.max(this.roomSeq || 0, seq);
+    this.seqAhead.forEach((received) => {
+      if (received <= this.roomSeq) {
+        this.seqAhead.delete(received);
+      }
+    });
+    this.advanceRoomSeq();
+  }
+
+  advanceRoomSeq() {
+    while (this.seqAhead.has(this.roomSeq + 1)) {
+      this.roomSeq += 1;
+      this.seqAhead.delete(this.roomSeq);
+    }
+  }
+
+  resumeSession() {
+    if (!this.resumeToken) {
+      return false;
+    }
+    console.log('🔁 Resuming room session from frame', this.roomSeq);
+    this.sendMessage({
+      type: 'resume',
+      resume_token: this.resumeToken,
+      last_seq: this.roomSeq
+    });
+    return true;
+  }
+
+  requestStateResync() {
+    this.sendMessage({
+      type: 'resync_state'
+    });
+  }
+
+  requestTimeSync() {
+    this.sendMessage({
+      type: 'time_sync',
+      client_time: Date.now() / 1000
+    });
+  }
+
   handleMessage(message) {
     const messageType = message.type;
+
+    if (messageType === 'authenticated' || messageType === 'time_sync') {
+      this.updateClockOffset(message);
+    }
+    if (messageType === 'authenticated') {
+      this.userId = message.user_id;
+      // After a dropped connection, resume the room session instead of rejoining
+      message.resuming = this.resumeSession();
+    }
+
+    // Track the room stream position for session resumption
+    if (messageType === 'room_joined') {
+      this.resumeToken = message.resume_token || null;
+      this.roomSeq = message.seq !== undefined ? message.seq : null;
+      this.seqAhead = new Set();
+    } else if (messageType === 'resumed') {
+      // Without a replay, the snapshot that follows covers everything up to message.seq;
+      // with one, the replayed frames fill the gaps
+      if (message.replayed === null) {
+        this.coverRoomSeq(message.seq);
+      }
+    } else if (messageType === 'resume_failed') {
+      this.resumeToken = null;
+      this.roomSeq = null;
+      this.seqAhead = new Set();
+    } else if (messageType === 'canvas_snapshot') {
+      // Every earlier frame was sent before the snapshot or is covered by it
+      if (message.seq !== undefined && this.roomSeq !== null) {
+        this.coverRoomSeq(message.seq);
+      }
+    } else if (message.seq !== undefined && this.roomSeq !== null) {
+      if (!this.receiveRoomFrame(message.seq)) {
+        return; // Already received: replayed after a resume
+      }
+    }
+    if (messageType === 'frame_skipped') {
+      return; // Our own action, only there to keep the stream position contiguous
+    }
+
+    // State patches must apply in order; on a gap, ask for a full snapshot instead
+    if (messageType === 'game_state' && message.state_seq !== undefined) {
+      this.stateSeq = message.state_seq;
+    } else if (messageType === 'state_patch') {
+      if (this.stateSeq !== null && message.state_seq <= this.stateSeq) {
+        return; // Already covered by a newer snapshot
+      }
+      if (this.stateSeq === null || message.state_seq !== this.stateSeq + 1) {
+        console.warn('⚠️ Missed state patch, requesting resync');
+        this.stateSeq = null;
+        this.requestStateResync();
+        return;
+      }
+      this.stateSeq = message.state_seq;
+    }
     
     // Emit the message to all listeners
     this.emit(messageType, message);
@@ -133,6 +276,10 @@ class SocketManager {
     switch (messageType) {
       case 'authenticated':
         console.log('✅ Authentication successful:', message);
+        // Take a second clock sample in case the first one was delayed by auth
+        this.requestTimeSync();
+        break;
+      case 'time_sync':
         break;
       case 'error':
         console.error('❌ Server error:', message.message);
@@ -152,6 +299,9 @@ class SocketManager {
       case 'draw_data':
         console.log('🎨 Received draw data:', message);
         break;
+      case 'draw_batch':
+        console.log('🎨 Received draw batch:', message.strokes?.length, 'strokes');
+        break;
       case 'chat_message':
         console.log('💬 Received chat message:', message);
         break;
@@ -185,6 +335,18 @@ class SocketManager {
       case 'game_state':
         console.log('🎮 Game state update:', message);
         break;
+      case 'state_patch':
+        console.log('🎮 Game state patch:', message);
+        break;
+      case 'resumed':
+        console.log('🔁 Session resumed:', message);
+        break;
+      case 'resume_failed':
+        console.warn('⚠️ Session resume failed:', message.message);
+        break;
+      case 'player_reconnected':
+        console.log('👤 Player reconnected:', message);
+        break;
       case 'time_update':
         console.log('⏰ Time update:', message);
         break;
@@ -194,12 +356,28 @@ class SocketManager {
       case 'canvas_cleared':
         console.log('🧹 Canvas cleared:', message);
         break;
+      case 'canvas_snapshot':
+        console.log('🖼️ Canvas snapshot:', message.strokes?.length, 'strokes');
+        break;
+      case 'stroke_started':
+      case 'stroke_undone':
+      case 'stroke_redone':
+        console.log('✏️ Stroke update:', message);
+        break;
       case 'room_deleted':
         console.log('🗑️ Room deleted:', message);
         break;
       case 'players_update':
         console.log('👥 Players updated:', message);
         break;
+      case 'lobby_snapshot':
+        console.log('🏠 Lobby snapshot:', message.rooms?.length, 'rooms');
+        break;
+      case 'room_added':
+      case 'room_updated':
+      case 'room_removed':
+        console.log('🏠 Lobby update:', message);
+        break;
       default:
         console.log('❓ Unknown message type:', messageType, message);
     }
@@ -230,6 +408,10 @@ class SocketManager {
   }
 
   leaveRoom() {
+    this.stateSeq = null;
+    this.resumeToken = null;
+    this.roomSeq = null;
+    this.seqAhead = new Set();
     this.sendMessage({
       type: 'leave_room'
     });
@@ -241,6 +423,24 @@ class SocketManager {
     });
   }
 
+  // Lobby: one room list snapshot, then room_added / room_updated / room_removed deltas
+  subscribeLobby() {
+    this.lobbySubscribed = true;
+    this.sendMessage({
+      type: 'subscribe_lobby'
+    });
+  }
+
+  unsubscribeLobby() {
+    if (!this.lobbySubscribed) {
+      return;
+    }
+    this.lobbySubscribed = false;
+    this.sendMessage({
+      type: 'unsubscribe_lobby'
+    });
+  }
+
   // Game management
   startGame() {
     this.sendMessage({
@@ -281,6 +481,25 @@ class SocketManager {
     });
   }
 
+  undoStroke() {
+    this.sendMessage({
+      type: 'undo_stroke'
+    });
+  }
+
+  redoStroke() {
+    this.sendMessage({
+      type: 'redo_stroke'
+    });
+  }
+
+  // Ask for the full current drawing (e.g. after a redo of a stroke we never received)
+  syncCanvas() {
+    this.sendMessage({
+      type: 'sync_canvas'
+    });
+  }
+
   // Chat and guessing
   sendChatMessage(message) {
     this.sendMessage({